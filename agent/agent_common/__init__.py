@@ -0,0 +1 @@
+"""Shared runtime components for the detective agency agent servers."""
@@ -0,0 +1,364 @@
+"""Priority-aware admission control in front of the A2A request handler."""
+
+import asyncio
+import heapq
+import itertools
+import json
+import re
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from a2a.types import Task
+from google.adk.agents import Agent
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+from opentelemetry import trace
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from aigency.utils.logger import get_logger
+
+from agent_common.callbacks import add_callback
+from agent_common.deadline import REQUEST_BODY_SCOPE_KEY, read_body, replay_body
+from agent_common.executor import current_artifact_metadata
+from agent_common.metrics import REGISTRY
+
+logger = get_logger()
+
+PRIORITIES = ("critical", "high", "medium", "low")
+DEFAULT_PRIORITY = "medium"
+
+# JSON-RPC methods that start work on the model; the others are answered directly
+ADMITTED_METHODS = {"message/send", "message/stream"}
+
+CASE_ID_PATTERN = re.compile(r"\bCASE-\d+\b", re.IGNORECASE)
+
+# Key of the priority of a request in the A2A message metadata, sent on to the
+# remote agents it is delegated to like the deadline
+PRIORITY_METADATA_KEY = "priority"
+# Key of the case priorities an agent learned in the metadata of its answer
+CASE_PRIORITIES_METADATA_KEY = "case_priorities"
+
+# Priority of the request being processed, when it was sent or its cases are known
+current_priority: ContextVar[Optional[str]] = ContextVar("current_priority", default=None)
+
+ADMISSION_REQUESTS = REGISTRY.counter(
+    "admission_requests_total", "Requests by priority and admission result", ("priority", "result")
+)
+ADMISSION_QUEUE_DEPTH = REGISTRY.gauge("admission_queue_depth", "Requests waiting for a slot")
+ADMISSION_ACTIVE = REGISTRY.gauge("admission_active_requests", "Requests being processed")
+ADMISSION_WAIT_SECONDS = REGISTRY.histogram(
+    "admission_wait_seconds", "Time requests waited for a slot", ("priority",)
+)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be queued."""
+
+
+class CasePriorities:
+    """Priorities of the cases seen in tool results, to classify requests about them.
+
+    Agents calling the case MCP server learn them from its results. The
+    priorities learned during a request are returned in the metadata of the
+    answer, so an agent that only delegates, such as the manager, learns them
+    from the answers of its remote agents.
+    """
+
+    def __init__(self):
+        self.priorities: Dict[str, str] = {}
+
+    @staticmethod
+    def _record(case_id: Any, priority: Any, learned: Dict[str, str]) -> None:
+        if isinstance(case_id, str) and priority in PRIORITIES:
+            learned[case_id.upper()] = priority
+
+    def _learn(self, value: Any, learned: Dict[str, str]) -> None:
+        if isinstance(value, dict):
+            reported = value.get(CASE_PRIORITIES_METADATA_KEY)
+            if isinstance(reported, dict):
+                for case_id, priority in reported.items():
+                    self._record(case_id, priority, learned)
+            self._record(value.get("case_id") or value.get("id"), value.get("priority"), learned)
+            for item in value.values():
+                self._learn(item, learned)
+        elif isinstance(value, list):
+            for item in value:
+                self._learn(item, learned)
+
+    def after_tool(
+        self,
+        tool: BaseTool,
+        args: Dict[str, Any],
+        tool_context: ToolContext,
+        tool_response: Any,
+    ) -> None:
+        """Record the priority of every case found in a tool result."""
+        learned: Dict[str, str] = {}
+        if isinstance(tool_response, Task):
+            # The answer of a remote agent to send_message
+            for artifact in tool_response.artifacts or []:
+                self._learn(artifact.metadata, learned)
+        elif isinstance(tool_response, dict):
+            self._learn(tool_response.get("structuredContent"), learned)
+            for item in tool_response.get("content") or []:
+                if isinstance(item, dict) and item.get("type") == "text":
+                    try:
+                        self._learn(json.loads(item.get("text", "")), learned)
+                    except ValueError:
+                        continue
+            # The answers of the remote agents to send_messages_parallel
+            self._learn(tool_response.get("results"), learned)
+        if not learned:
+            return
+
+        self.priorities.update(learned)
+        metadata = current_artifact_metadata.get()
+        if metadata is not None:
+            metadata.setdefault(CASE_PRIORITIES_METADATA_KEY, {}).update(learned)
+
+    def classify(self, text: str) -> Optional[str]:
+        """Return the highest priority of the known cases mentioned in a text."""
+        found = [
+            self.priorities[case_id.upper()]
+            for case_id in CASE_ID_PATTERN.findall(text)
+            if case_id.upper() in self.priorities
+        ]
+        return min(found, key=PRIORITIES.index) if found else None
+
+
+class AdmissionController:
+    """Bounded priority queue in front of a fixed number of processing slots.
+
+    Requests are admitted by priority class and then arrival order, skipping
+    clients that already use `max_per_client` slots. When the queue is full a
+    request is rejected, unless it outranks the lowest queued request, which is
+    then rejected in its place.
+
+    Attributes:
+        max_concurrent (int): Requests processed at the same time.
+        max_queue (int): Requests allowed to wait for a slot.
+        max_per_client (int): Slots a single client can use at the same time.
+    """
+
+    def __init__(self, max_concurrent: int = 8, max_queue: int = 64, max_per_client: int = 4):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_per_client = max_per_client
+
+        self._active = 0
+        self._per_client: Dict[str, int] = {}
+        # (priority rank, arrival, client, future)
+        self._waiting: List[Tuple[int, int, str, asyncio.Future]] = []
+        self._arrivals = itertools.count()
+
+    def _can_run(self, client: str) -> bool:
+        return (
+            self._active < self.max_concurrent
+            and self._per_client.get(client, 0) < self.max_per_client
+        )
+
+    def _start(self, client: str) -> None:
+        self._active += 1
+        self._per_client[client] = self._per_client.get(client, 0) + 1
+        ADMISSION_ACTIVE.set(self._active)
+
+    def _dispatch(self) -> None:
+        # Wake the best waiting requests whose client has a free slot
+        skipped = []
+        while self._waiting and self._active < self.max_concurrent:
+            entry = heapq.heappop(self._waiting)
+            rank, arrival, client, future = entry
+            if future.done():
+                continue
+            if self._per_client.get(client, 0) >= self.max_per_client:
+                skipped.append(entry)
+                continue
+            self._start(client)
+            future.set_result(None)
+        for entry in skipped:
+            heapq.heappush(self._waiting, entry)
+        ADMISSION_QUEUE_DEPTH.set(len(self._waiting))
+
+    async def acquire(self, client: str, priority: str) -> None:
+        """Wait for a processing slot.
+
+        Args:
+            client (str): Identifier of the calling client.
+            priority (str): Priority class of the request.
+
+        Raises:
+            AdmissionRejected: If the queue is full.
+        """
+        rank = PRIORITIES.index(priority)
+        if not self._waiting and self._can_run(client):
+            self._start(client)
+            return
+
+        if len(self._waiting) >= self.max_queue:
+            lowest = max(self._waiting)
+            if lowest[0] <= rank:
+                raise AdmissionRejected("The request queue is full")
+            self._waiting.remove(lowest)
+            heapq.heapify(self._waiting)
+            lowest[3].set_exception(AdmissionRejected("Displaced by a higher priority request"))
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (rank, next(self._arrivals), client, future)
+        heapq.heappush(self._waiting, entry)
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The client went away: give back the slot or the place in the queue
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self.release(client)
+            elif entry in self._waiting:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                ADMISSION_QUEUE_DEPTH.set(len(self._waiting))
+            raise
+
+    def release(self, client: str) -> None:
+        """Free the slot of a finished request and admit the next ones."""
+        self._active -= 1
+        self._per_client[client] -= 1
+        if not self._per_client[client]:
+            del self._per_client[client]
+        ADMISSION_ACTIVE.set(self._active)
+        self._dispatch()
+
+
+def _text_parts(message: Dict[str, Any]) -> str:
+    return " ".join(
+        part.get("text", "") for part in message.get("parts") or [] if isinstance(part, dict)
+    )
+
+
+class AdmissionMiddleware:
+    """ASGI middleware admitting A2A message requests through an AdmissionController.
+
+    The priority of a request is the highest of the `priority` of the message
+    or request metadata and the priorities of the known cases its text
+    mentions, medium if there is none. Unless it is the default, it is set in
+    current_priority while the request is processed, and sent on in the
+    metadata of the messages delegated to remote agents. Clients are identified by the X-Client-Id header or their address. Rejected
+    requests get a 429 response with a Retry-After header.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: AdmissionController,
+        case_priorities: CasePriorities,
+        retry_after_seconds: int = 5,
+    ):
+        self.app = app
+        self.controller = controller
+        self.case_priorities = case_priorities
+        self.retry_after_seconds = retry_after_seconds
+
+    def _classify(self, request: Dict[str, Any]) -> Optional[str]:
+        params = request.get("params") or {}
+        message = params.get("message") or {}
+        found = [
+            metadata[PRIORITY_METADATA_KEY]
+            for metadata in (message.get("metadata"), params.get("metadata"))
+            if isinstance(metadata, dict) and metadata.get(PRIORITY_METADATA_KEY) in PRIORITIES
+        ]
+        case_priority = self.case_priorities.classify(_text_parts(message))
+        if case_priority is not None:
+            found.append(case_priority)
+        return min(found, key=PRIORITIES.index) if found else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        # Behind a CancellationMiddleware the body is in the scope and the
+        # receive channel still replays it; otherwise it is read here
+        body = scope.get(REQUEST_BODY_SCOPE_KEY)
+        if body is None:
+            body = await read_body(receive)
+            if body is None:
+                return
+            receive = replay_body(body, receive)
+
+        try:
+            request = json.loads(body)
+        except ValueError:
+            request = None
+        if not isinstance(request, dict) or request.get("method") not in ADMITTED_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        classified = self._classify(request)
+        priority = classified or DEFAULT_PRIORITY
+        headers = dict(scope.get("headers") or [])
+        client = headers.get(b"x-client-id", b"").decode() or (scope.get("client") or ("unknown",))[0]
+
+        started = time.perf_counter()
+        try:
+            await self.controller.acquire(client, priority)
+        except AdmissionRejected as e:
+            ADMISSION_REQUESTS.inc(priority=priority, result="rejected")
+            trace.get_current_span().set_attributes({"a2a.priority": priority, "a2a.rejected": True})
+            logger.warning(f"Rejected {priority} request from {client}: {e}")
+            response = JSONResponse(
+                {
+                    "jsonrpc": "2.0",
+                    "id": request.get("id"),
+                    "error": {"code": -32000, "message": str(e)},
+                },
+                status_code=429,
+                headers={"Retry-After": str(self.retry_after_seconds)},
+            )
+            await response(scope, receive, send)
+            return
+
+        waited = time.perf_counter() - started
+        ADMISSION_REQUESTS.inc(priority=priority, result="admitted")
+        ADMISSION_WAIT_SECONDS.observe(waited, priority=priority)
+        trace.get_current_span().set_attributes(
+            {"a2a.method": request["method"], "a2a.priority": priority, "a2a.queue_wait_seconds": waited}
+        )
+        token = current_priority.set(classified)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_priority.reset(token)
+            self.controller.release(client)
+
+
+def add_admission_control(app: ASGIApp, agent: Agent, config: Optional[Dict[str, Any]]) -> ASGIApp:
+    """Wrap an A2A application with admission control as set in the runtime settings.
+
+    Args:
+        app (ASGIApp): The A2A application.
+        agent (Agent): The agent served by the application, whose tool results
+            teach the case priorities.
+        config (Optional[Dict[str, Any]]): The `admission` runtime settings, with
+            the optional `max_concurrent`, `max_queue`, `max_per_client` and
+            `retry_after_seconds` keys.
+
+    Returns:
+        ASGIApp: The wrapped application, or the same one if not configured.
+    """
+    if not config:
+        return app
+
+    case_priorities = CasePriorities()
+    add_callback(agent, "after_tool_callback", case_priorities.after_tool)
+    controller = AdmissionController(
+        max_concurrent=config.get("max_concurrent", 8),
+        max_queue=config.get("max_queue", 64),
+        max_per_client=config.get("max_per_client", 4),
+    )
+    return AdmissionMiddleware(
+        app,
+        controller,
+        case_priorities,
+        retry_after_seconds=config.get("retry_after_seconds", 5),
+    )
@@ -0,0 +1,146 @@
+"""A2A application of an agent, built from its config file.
+
+Imported in the background by agent_common.bootstrap once the server listens.
+"""
+
+import functools
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from a2a.server.apps import A2AStarletteApplication
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.types import AgentCard
+from google.adk.agents import Agent
+from starlette.types import ASGIApp
+
+from aigency.agents.generator import AgentA2AGenerator
+from aigency.schemas.aigency_config import AigencyConfig
+from aigency.utils.config_service import ConfigService
+from aigency.utils.logger import get_logger
+
+from agent_common.admission import add_admission_control
+from agent_common.bootstrap import cache_dir
+from agent_common.config import load_runtime_config
+from agent_common.context import attach_context_compaction
+from agent_common.deadline import CancellationMiddleware, attach_deadline_tracking
+from agent_common.delegation import add_parallel_delegation
+from agent_common.executor import AgencyExecutor
+from agent_common.http_pool import ConnectionPool, attach_connection_pool, build_connection_pool
+from agent_common.llm_cache import attach_llm_cache
+from agent_common.metrics import metrics_endpoint
+from agent_common.reload import ConfigReloader
+from agent_common.task_store import build_task_store
+from agent_common.tool_cache import attach_tool_cache
+from agent_common.tool_manifest import attach_tool_manifest
+from agent_common.tracing import TracingMiddleware, agent_tracing_config, setup_tracing
+
+
+def create_bound_agent(
+    agent_config: AigencyConfig,
+    pool: ConnectionPool,
+    runtime_config: Dict[str, Any],
+    streaming: bool,
+) -> Agent:
+    """Create the agent of a config with its remote agents and tools bound.
+
+    Args:
+        agent_config (AigencyConfig): The agent configuration.
+        pool (ConnectionPool): Pool of the remote agent and MCP connections.
+        runtime_config (Dict[str, Any]): The runtime settings of the agent.
+        streaming (bool): Whether the updates of remote agents are forwarded.
+
+    Returns:
+        Agent: The agent, without the callbacks of the serving process.
+    """
+    agent = AgentA2AGenerator.create_agent(agent_config=agent_config)
+    attach_connection_pool(agent, pool, forward_updates=streaming)
+    # After the pool, whose client factory the rebuilt toolsets keep
+    attach_tool_manifest(agent, cache_dir(), runtime_config.get("tool_manifest"))
+    add_parallel_delegation(agent, runtime_config.get("delegation"))
+    return agent
+
+
+def build_app(config_path: str) -> Tuple[ASGIApp, AgentCard, Callable[[], Awaitable[None]]]:
+    """Build the A2A application of the agent described by a config file.
+
+    Called from the event loop of the server, which then also runs the watcher
+    reloading the agent when the file changes.
+
+    Args:
+        config_path (str): Path to the agent_config.yaml file.
+
+    Returns:
+        Tuple[ASGIApp, AgentCard, Callable[[], Awaitable[None]]]: The ASGI
+            application serving the agent, its agent card, and the coroutine
+            function releasing its resources when the server shuts down.
+    """
+    config_service = ConfigService(config_file=config_path)
+    agent_config = config_service.config
+    runtime_config = load_runtime_config(config_path)
+    workers = (runtime_config.get("server") or {}).get("workers", 1)
+    # Before the agent is created, so ADK records its spans with our provider
+    setup_tracing(
+        agent_tracing_config(
+            agent_config.metadata.name, agent_config.observability, runtime_config.get("tracing")
+        )
+    )
+
+    agent_card = AgentA2AGenerator.build_agent_card(agent_config=agent_config)
+    # Streams when the card declares it, unless the runtime settings turn it off
+    streaming = (runtime_config.get("streaming") or {}).get(
+        "enabled", bool(agent_card.capabilities.streaming)
+    )
+
+    pool = build_connection_pool(runtime_config.get("http"))
+    build_agent = functools.partial(
+        create_bound_agent,
+        pool=pool,
+        runtime_config=runtime_config,
+        streaming=streaming,
+    )
+    agent = build_agent(agent_config)
+    attach_tool_cache(agent, runtime_config.get("tool_cache"))
+    # Compaction runs first so the response cache keys on the compacted request
+    attach_context_compaction(agent, runtime_config.get("context"))
+    attach_llm_cache(agent, runtime_config.get("llm_cache"))
+    attach_deadline_tracking(agent)
+    executor = AgentA2AGenerator.build_executor(agent=agent, agent_card=agent_card)
+    executor = AgencyExecutor(
+        runner=executor.runner,
+        card=agent_card,
+        default_deadline_seconds=(runtime_config.get("deadline") or {}).get("default_seconds"),
+        streaming=streaming,
+    )
+    request_handler = DefaultRequestHandler(
+        agent_executor=executor,
+        task_store=build_task_store(runtime_config.get("task_store"), workers),
+    )
+    server = A2AStarletteApplication(
+        agent_card=agent_card,
+        http_handler=request_handler,
+    )
+    get_logger().info(f"Server object created: {server}")
+    reload_config = runtime_config.get("reload") or {}
+    reloader = None
+    if reload_config.get("enabled", False):
+        reloader = ConfigReloader(
+            config_path,
+            executor,
+            server,
+            build_agent,
+            runtime_config,
+            pool,
+            interval_seconds=reload_config.get("interval_seconds", 2.0),
+            retire_after_seconds=executor.default_deadline_seconds or 120.0,
+        )
+        reloader.start()
+
+    async def shutdown() -> None:
+        if reloader is not None:
+            reloader.stop()
+        await pool.aclose()
+
+    app = server.build()
+    app.add_route("/metrics", metrics_endpoint, methods=["GET"])
+    app = add_admission_control(app, agent, runtime_config.get("admission"))
+    # Outermost, so the admission wait is recorded on the request span
+    return TracingMiddleware(CancellationMiddleware(app), agent_config.metadata.name), agent_card, shutdown
@@ -0,0 +1,308 @@
+"""Agent card served as soon as an agent server starts.
+
+The entry points of the agents only import this module, which stays light: the
+server listens at once and answers agent card requests from a cache, while the
+agent and its heavy dependencies (aigency, ADK, a2a, the model SDKs) are
+imported and built in the background. Other requests, messages included, wait
+until it is ready, and so does the card when nothing is cached.
+"""
+
+import asyncio
+import hashlib
+import importlib
+import importlib.metadata
+import json
+import os
+import signal
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import uvicorn
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from aigency.utils.logger import Logger, get_logger
+
+from agent_common.config import load_runtime_config
+from agent_common.logs import setup_logging
+
+LOGGER_CONFIG = {
+    "log_level": "DEBUG",
+    "log_format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    "logger_name": "aigency",
+}
+
+# Worker processes find the agent configuration through this variable
+CONFIG_PATH_ENV = "AGENT_CONFIG_PATH"
+# Directory of the startup cache and of the MCP tool manifest
+CACHE_DIR_ENV = "AGENT_CACHE_DIR"
+
+# Response header naming the worker process that served a request, with several workers
+WORKER_HEADER = b"x-agent-worker"
+
+CARD_PATHS = ("/.well-known/agent-card.json", "/.well-known/agent.json")
+# Upgrading them can change the card built from the same config
+CARD_PACKAGES = ("aigency", "a2a-sdk")
+
+
+def configure_logging(runtime_config: Dict[str, Any], worker: Optional[str] = None) -> None:
+    """Move the logging of this process to the logging pipeline.
+
+    The handlers that Logger attached to the aigency logger are replaced by the
+    pipeline, keeping its level unless the `logging` settings override it.
+
+    A worker process writes to a log file of its own, named after the worker,
+    e.g. agent.worker-1234.log next to agent.log: every file is rotated by a
+    single process, which a file shared by several processes would not be.
+
+    Args:
+        runtime_config (Dict[str, Any]): The runtime settings of the agent.
+        worker (Optional[str]): Name of this worker process, if there are several.
+    """
+    config = dict(runtime_config.get("logging") or {})
+    if worker is not None and config.get("file"):
+        root, extension = os.path.splitext(config["file"])
+        config["file"] = f"{root}.{worker}{extension}"
+    config["levels"] = {
+        LOGGER_CONFIG["logger_name"]: LOGGER_CONFIG["log_level"],
+        **(config.get("levels") or {}),
+    }
+    setup_logging(config)
+
+
+def cache_dir() -> str:
+    """Return the directory of the startup cache, from AGENT_CACHE_DIR."""
+    return os.getenv(CACHE_DIR_ENV) or os.path.join(tempfile.gettempdir(), "detective_aigency")
+
+
+def _cache_path(config_path: str) -> str:
+    name = hashlib.sha256(os.path.abspath(config_path).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir(), f"boot-{name}.json")
+
+
+def _config_key(config_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(config_path, "rb") as file:
+        digest.update(file.read())
+    for package in CARD_PACKAGES:
+        digest.update(importlib.metadata.version(package).encode())
+    return digest.hexdigest()
+
+
+def load_boot_cache(config_path: str) -> Optional[Dict[str, Any]]:
+    """Return the cached startup data of a config file, if it is still valid.
+
+    Args:
+        config_path (str): Path to the agent_config.yaml file.
+
+    Returns:
+        Optional[Dict[str, Any]]: The `runtime` settings and the agent `card`
+            saved by the last successful start with the same config file and
+            package versions, or None.
+    """
+    try:
+        with open(_cache_path(config_path), "r", encoding="utf-8") as file:
+            entry = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entry, dict) or entry.get("key") != _config_key(config_path):
+        return None
+    return entry
+
+
+def save_boot_cache(config_path: str, runtime_config: Dict[str, Any], card: Dict[str, Any]) -> None:
+    """Save the startup data of a config file once its agent was built.
+
+    Args:
+        config_path (str): Path to the agent_config.yaml file.
+        runtime_config (Dict[str, Any]): Its runtime settings.
+        card (Dict[str, Any]): Its agent card, as served.
+    """
+    path = _cache_path(config_path)
+    entry = {"key": _config_key(config_path), "runtime": runtime_config, "card": card}
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(entry, file)
+        os.replace(temporary, path)
+    except OSError as e:
+        get_logger().warning(f"Could not write the startup cache {path}: {e}")
+
+
+async def _send_json(send: Send, status: int, body: bytes) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class LazyAgentApp:
+    """ASGI application building the agent in the background after the server starts.
+
+    Until the agent is built, agent card requests are answered from the startup
+    cache and the other requests wait. The heavy modules are imported in a
+    thread, so the event loop keeps answering meanwhile. If the build fails,
+    waiting requests get a 503 and the process terminates itself with SIGTERM,
+    so that it exits with a failure status and is restarted. On shutdown the
+    resources of the agent, such as its pooled connections, are released.
+
+    Attributes:
+        config_path (str): Path to the agent_config.yaml file.
+        runtime_config (Dict[str, Any]): The runtime settings of the agent.
+        worker (Optional[str]): Name of this worker process, sent in the
+            x-agent-worker header of every response, when there are several.
+        error (Optional[Exception]): Why the agent could not be built.
+    """
+
+    def __init__(
+        self,
+        config_path: str,
+        runtime_config: Dict[str, Any],
+        card: Optional[Dict[str, Any]] = None,
+        worker: Optional[str] = None,
+    ):
+        self.config_path = config_path
+        self.runtime_config = runtime_config
+        self.worker = worker
+        self.error: Optional[Exception] = None
+        self._card = card
+        self._card_body = None
+        if card is not None:
+            # Encoded as the A2A application encodes it
+            self._card_body = json.dumps(card, ensure_ascii=False, separators=(",", ":")).encode()
+        self._app: Optional[ASGIApp] = None
+        self._shutdown: Optional[Callable[[], Awaitable[None]]] = None
+        self._ready = asyncio.Event()
+        self._loading: Optional[asyncio.Task] = None
+
+    async def _load(self) -> None:
+        started = time.perf_counter()
+        try:
+            module = await asyncio.to_thread(importlib.import_module, "agent_common.app")
+            app, agent_card, self._shutdown = module.build_app(self.config_path)
+        except Exception as e:
+            self.error = e
+            get_logger().exception(f"Could not build the agent: {e}")
+            self._ready.set()
+            signal.raise_signal(signal.SIGTERM)
+            return
+
+        self._app = app
+        self._ready.set()
+        get_logger().info(f"Agent ready {time.perf_counter() - started:.2f}s after the server started")
+        card = agent_card.model_dump(mode="json", exclude_none=True, by_alias=True)
+        if card != self._card:
+            save_boot_cache(self.config_path, self.runtime_config, card)
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self._loading = asyncio.create_task(self._load())
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self._loading is not None:
+                    self._loading.cancel()
+                if self._shutdown is not None:
+                    try:
+                        await self._shutdown()
+                    except Exception as e:
+                        get_logger().warning(f"Could not release the resources of the agent: {e}")
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+
+        if self.worker is not None and scope["type"] == "http":
+            send = self._tag_worker(send)
+
+        if self._app is None:
+            if (
+                self._card_body is not None
+                and scope["type"] == "http"
+                and scope["method"] == "GET"
+                and scope["path"] in CARD_PATHS
+            ):
+                await _send_json(send, 200, self._card_body)
+                return
+            await self._ready.wait()
+            if self._app is None:
+                if scope["type"] == "http":
+                    await _send_json(send, 503, json.dumps({"error": "The agent failed to start"}).encode())
+                return
+        await self._app(scope, receive, send)
+
+    def _tag_worker(self, send: Send) -> Send:
+        worker = self.worker.encode()
+
+        async def tagged(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (WORKER_HEADER, worker)]}
+            await send(message)
+
+        return tagged
+
+
+def _boot(config_path: str, worker: Optional[str] = None) -> LazyAgentApp:
+    boot_cache = load_boot_cache(config_path)
+    runtime_config = boot_cache["runtime"] if boot_cache else load_runtime_config(config_path)
+    configure_logging(runtime_config, worker)
+    get_logger().info(
+        f"Starting from the cached agent card of {config_path}"
+        if boot_cache
+        else f"No startup cache for {config_path}, the card is served once the agent is built"
+    )
+    return LazyAgentApp(config_path, runtime_config, boot_cache and boot_cache["card"], worker)
+
+
+def create_app() -> ASGIApp:
+    """Application factory called by uvicorn in every worker process.
+
+    Returns:
+        ASGIApp: The application of the agent set in AGENT_CONFIG_PATH.
+    """
+    Logger(config=LOGGER_CONFIG)
+    return _boot(os.environ[CONFIG_PATH_ENV], worker=f"worker-{os.getpid()}")
+
+
+def serve(config_path: str, host: str = "0.0.0.0", port: int = 8080) -> None:
+    """Serve an agent with the number of workers set in its runtime settings.
+
+    With a single worker the application is served in this process. With more,
+    uvicorn forks workers that build their own application through create_app
+    and share the task store file.
+
+    Args:
+        config_path (str): Path to the agent_config.yaml file.
+        host (str): Interface to bind.
+        port (int): Port to bind.
+    """
+    app = _boot(config_path)
+    workers = (app.runtime_config.get("server") or {}).get("workers", 1)
+
+    # Without its own log config uvicorn logs through the pipeline
+    if workers <= 1:
+        uvicorn.run(app, host=host, port=port, log_config=None)
+        return
+
+    get_logger().info(f"Starting {workers} workers")
+    os.environ[CONFIG_PATH_ENV] = config_path
+    uvicorn.run(
+        "agent_common.bootstrap:create_app",
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers,
+        log_config=None,
+    )
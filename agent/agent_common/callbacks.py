@@ -0,0 +1,21 @@
+"""Helpers to extend the callbacks of agents built by aigency."""
+
+from typing import Any
+
+from google.adk.agents import Agent
+
+
+def add_callback(agent: Agent, field: str, callback: Any) -> None:
+    """Append a callback to an ADK agent callback field, keeping existing ones.
+
+    Args:
+        agent (Agent): The agent to extend.
+        field (str): Name of the callback field, e.g. "before_tool_callback".
+        callback (Any): The callback to run after the existing ones.
+    """
+    current = getattr(agent, field)
+    if current is None:
+        current = []
+    elif not isinstance(current, list):
+        current = [current]
+    setattr(agent, field, [*current, callback])
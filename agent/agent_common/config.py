@@ -0,0 +1,22 @@
+"""Runtime settings of the agent servers."""
+
+from typing import Any, Dict
+
+import yaml
+
+
+def load_runtime_config(config_path: str) -> Dict[str, Any]:
+    """Load the optional `runtime` section of an agent_config.yaml file.
+
+    The section holds settings of the serving process (task store, workers,
+    caches) that are not part of the agent definition parsed by aigency.
+
+    Args:
+        config_path (str): Path to the agent_config.yaml file.
+
+    Returns:
+        Dict[str, Any]: The runtime settings, empty if the section is missing.
+    """
+    with open(config_path, "r", encoding="utf-8") as file:
+        config = yaml.safe_load(file) or {}
+    return config.get("runtime") or {}
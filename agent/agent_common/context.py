@@ -0,0 +1,267 @@
+"""Compaction of long conversations into an investigation-state record."""
+
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+from google.adk.agents import Agent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from aigency.utils.logger import get_logger
+
+from agent_common.callbacks import add_callback
+from agent_common.metrics import REGISTRY
+
+logger = get_logger()
+
+STATE_KEY = "investigation_state"
+
+# Record identifiers used by the case and informant MCP servers
+RECORD_ID_PATTERN = re.compile(
+    r"\b(CASE|EVID|RPT|INF|INFO|MEET|CLUSTER)-[0-9A-F]+\b", re.IGNORECASE
+)
+ID_GROUPS = {"CASE": "case_ids", "INF": "informant_ids"}
+
+# Names, places and other entities are quoted in delegated tasks and answers
+QUOTED_PATTERN = re.compile(r"[\"'“‘]([^\"'”’\n]{3,60})[\"'”’]")
+
+DELEGATION_TOOLS = {"send_message", "send_messages_parallel"}
+
+MAX_IDS = 200
+MAX_ENTITIES = 50
+MAX_REQUESTS = 5
+MAX_DECISIONS = 10
+MAX_CONCLUSIONS = 3
+MAX_TEXT = 200
+
+CONTEXT_CHARS = REGISTRY.histogram(
+    "llm_request_context_chars",
+    "Characters of conversation sent to the model per call",
+    ("agent",),
+    buckets=(1000, 2000, 5000, 10000, 20000, 50000, 100000, 200000),
+)
+COMPACTED_TURNS = REGISTRY.counter(
+    "context_compacted_turns_total", "Conversation turns folded into the investigation state", ("agent",)
+)
+
+
+def _truncate(text: str, limit: int = MAX_TEXT) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+def _is_turn_start(content: types.Content) -> bool:
+    return content.role == "user" and any(part.text for part in content.parts or [])
+
+
+def split_turns(contents: List[types.Content]) -> List[List[types.Content]]:
+    """Split a conversation into turns, each starting with a user message.
+
+    Args:
+        contents (List[types.Content]): The conversation sent to the model.
+
+    Returns:
+        List[List[types.Content]]: The contents of every turn, in order.
+    """
+    turns: List[List[types.Content]] = []
+    for content in contents:
+        if not turns or _is_turn_start(content):
+            turns.append([])
+        turns[-1].append(content)
+    return turns
+
+
+def _content_chars(contents: List[types.Content]) -> int:
+    total = 0
+    for content in contents:
+        for part in content.parts or []:
+            if part.text:
+                total += len(part.text)
+            elif part.function_call:
+                total += len(json.dumps(part.function_call.args or {}, default=str))
+            elif part.function_response:
+                total += len(json.dumps(part.function_response.response or {}, default=str))
+    return total
+
+
+def new_state() -> Dict[str, Any]:
+    """Return an empty investigation-state record."""
+    return {
+        "folded_turns": 0,
+        "case_ids": [],
+        "informant_ids": [],
+        "other_ids": [],
+        "entities": [],
+        "requests": [],
+        "decisions": [],
+        "conclusions": [],
+    }
+
+
+def _add_unique(values: List[str], new_values: List[str], limit: int) -> None:
+    for value in new_values:
+        if value in values:
+            values.remove(value)
+        values.append(value)
+    del values[:-limit]
+
+
+def _response_text(response: Any) -> str:
+    # Results of the delegation tools carry the answer of the remote agent
+    if isinstance(response, dict):
+        if "agent_name" in response:
+            return str(response.get("result") or response.get("error", ""))
+        result = response.get("result", response)
+        if isinstance(result, dict):
+            texts = [
+                part.get("text", "")
+                for artifact in result.get("artifacts") or []
+                for part in artifact.get("parts") or []
+                if isinstance(part, dict)
+            ]
+            if any(texts):
+                return " ".join(texts)
+    return json.dumps(response, default=str)
+
+
+def fold_turn(state: Dict[str, Any], turn: List[types.Content]) -> None:
+    """Fold the facts of one conversation turn into an investigation-state record.
+
+    Args:
+        state (Dict[str, Any]): The record to update.
+        turn (List[types.Content]): The contents of the turn.
+    """
+    texts = []
+    for content in turn:
+        for part in content.parts or []:
+            if part.text and content.role == "user":
+                state["requests"].append(_truncate(part.text))
+                texts.append(part.text)
+            elif part.text:
+                state["conclusions"].append(_truncate(part.text))
+                texts.append(part.text)
+            elif part.function_call and part.function_call.name in DELEGATION_TOOLS:
+                args = part.function_call.args or {}
+                delegations = args.get("delegations") or [args]
+                for delegation in delegations:
+                    task = str(delegation.get("task", ""))
+                    state["decisions"].append(
+                        {"agent": delegation.get("agent_name"), "task": _truncate(task, 150)}
+                    )
+                    texts.append(task)
+            elif part.function_response and part.function_response.name in DELEGATION_TOOLS:
+                response = part.function_response.response or {}
+                results = response.get("results")
+                if not isinstance(results, list):
+                    results = [response]
+                for result in results:
+                    outcome = _response_text(result)
+                    agent = result.get("agent_name") if isinstance(result, dict) else None
+                    pending = [d for d in state["decisions"] if "outcome" not in d]
+                    for decision in reversed(pending):
+                        if agent is None or decision["agent"] == agent:
+                            decision["outcome"] = _truncate(outcome)
+                            break
+                    texts.append(outcome)
+
+    text = "\n".join(texts)
+    for match in RECORD_ID_PATTERN.finditer(text):
+        group = ID_GROUPS.get(match.group(1).upper(), "other_ids")
+        _add_unique(state[group], [match.group(0).upper()], MAX_IDS)
+    _add_unique(state["entities"], QUOTED_PATTERN.findall(text), MAX_ENTITIES)
+
+    del state["requests"][:-MAX_REQUESTS]
+    del state["decisions"][:-MAX_DECISIONS]
+    del state["conclusions"][:-MAX_CONCLUSIONS]
+    state["folded_turns"] += 1
+
+
+def render_state(state: Dict[str, Any]) -> str:
+    """Render an investigation-state record as a compact text for the model."""
+    lines = ["[Investigation state summarizing earlier turns of this conversation]"]
+    for key, label in (
+        ("case_ids", "Cases"),
+        ("informant_ids", "Informants"),
+        ("other_ids", "Other records"),
+        ("entities", "Entities"),
+    ):
+        if state[key]:
+            lines.append(f"{label}: {', '.join(state[key])}")
+    if state["requests"]:
+        lines.append("Earlier user requests:")
+        lines.extend(f"- {request}" for request in state["requests"])
+    if state["decisions"]:
+        lines.append("Delegations made:")
+        for decision in state["decisions"]:
+            line = f"- {decision['agent']}: {decision['task']}"
+            if decision.get("outcome"):
+                line += f" -> {decision['outcome']}"
+            lines.append(line)
+    if state["conclusions"]:
+        lines.append("Earlier answers:")
+        lines.extend(f"- {conclusion}" for conclusion in state["conclusions"])
+    return "\n".join(lines)
+
+
+class ContextCompactor:
+    """Keeps a fixed window of raw turns and folds older ones into a record.
+
+    Turns that leave the window are folded once into an investigation-state
+    record kept in the session state, so the work per model call does not grow
+    with the length of the session. The rendered record is prepended to the
+    first raw turn sent to the model.
+
+    Attributes:
+        window_turns (int): Number of most recent turns sent verbatim.
+    """
+
+    def __init__(self, window_turns: int = 4):
+        self.window_turns = window_turns
+
+    def before_model(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> None:
+        """Replace the turns outside the window with the investigation state."""
+        turns = split_turns(llm_request.contents)
+        cut = len(turns) - self.window_turns
+        if cut > 0:
+            state = dict(callback_context.state.get(STATE_KEY) or new_state())
+            if state["folded_turns"] > cut:
+                state = new_state()
+            folded = state["folded_turns"]
+            if folded < cut:
+                state = json.loads(json.dumps(state))
+                for turn in turns[folded:cut]:
+                    fold_turn(state, turn)
+                callback_context.state[STATE_KEY] = state
+                COMPACTED_TURNS.inc(cut - folded, agent=callback_context.agent_name)
+
+            kept = [content for turn in turns[cut:] for content in turn]
+            first = kept[0]
+            kept[0] = types.Content(
+                role=first.role,
+                parts=[types.Part(text=render_state(state)), *(first.parts or [])],
+            )
+            llm_request.contents = kept
+
+        CONTEXT_CHARS.observe(
+            _content_chars(llm_request.contents), agent=callback_context.agent_name
+        )
+        return None
+
+
+def attach_context_compaction(agent: Agent, config: Optional[Dict[str, Any]]) -> None:
+    """Compact the conversation sent to the model as set in the runtime settings.
+
+    Args:
+        agent (Agent): Agent created by AgentA2AGenerator.
+        config (Optional[Dict[str, Any]]): The `context` runtime settings, with
+            the optional `window_turns` key.
+    """
+    if not config:
+        return
+
+    compactor = ContextCompactor(window_turns=config.get("window_turns", 4))
+    add_callback(agent, "before_model_callback", compactor.before_model)
@@ -0,0 +1,328 @@
+"""Deadlines carried from the manager down to the MCP tools, and cancellation of abandoned work."""
+
+import asyncio
+import contextlib
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Set
+
+from google.adk.agents import Agent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+from opentelemetry import propagate
+from opentelemetry.context import Context
+from opentelemetry.propagators.composite import CompositePropagator
+from opentelemetry.propagators.textmap import (
+    CarrierT,
+    Getter,
+    Setter,
+    TextMapPropagator,
+    default_getter,
+    default_setter,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from aigency.utils.logger import get_logger
+
+from agent_common.callbacks import add_callback
+from agent_common.metrics import REGISTRY
+
+logger = get_logger()
+
+# Key of the remaining budget in the A2A message metadata and the MCP request _meta.
+# A relative budget is sent instead of a timestamp so clock skew between hosts
+# does not matter.
+DEADLINE_METADATA_KEY = "deadline_seconds"
+
+# Monotonic time by which the work of the current request must be done
+current_deadline: ContextVar[Optional[float]] = ContextVar("current_deadline", default=None)
+
+CANCELLED_EXECUTIONS = REGISTRY.counter(
+    "cancelled_executions_total", "Agent executions stopped before completion", ("agent", "reason")
+)
+CANCELLED_CALLS = REGISTRY.counter(
+    "cancelled_inflight_calls_total",
+    "Model and tool calls in flight when an execution was stopped",
+    ("agent", "kind"),
+)
+RECLAIMED_BUDGET = REGISTRY.counter(
+    "reclaimed_budget_seconds_total",
+    "Deadline budget left when executions were stopped",
+    ("agent", "reason"),
+)
+
+
+def remaining_seconds() -> Optional[float]:
+    """Return the time left before the current deadline, or None without a deadline."""
+    deadline = current_deadline.get()
+    if deadline is None:
+        return None
+    return max(deadline - time.monotonic(), 0.0)
+
+
+@contextlib.contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[Optional[float]]:
+    """Run a block under a deadline, never later than the current one.
+
+    Args:
+        seconds (Optional[float]): Budget of the block, or None to keep the
+            current deadline.
+
+    Yields:
+        Optional[float]: The remaining budget of the block.
+    """
+    deadline = current_deadline.get()
+    if seconds is not None:
+        own = time.monotonic() + seconds
+        deadline = own if deadline is None else min(deadline, own)
+    token = current_deadline.set(deadline)
+    try:
+        yield remaining_seconds()
+    finally:
+        current_deadline.reset(token)
+
+
+def budget_from_metadata(*metadatas: Optional[Dict[str, Any]]) -> Optional[float]:
+    """Read the budget sent by the caller in A2A message or request metadata.
+
+    Returns:
+        Optional[float]: The smallest budget found, or None.
+    """
+    budgets = []
+    for metadata in metadatas:
+        if not isinstance(metadata, dict):
+            continue
+        try:
+            budgets.append(float(metadata[DEADLINE_METADATA_KEY]))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return min(budgets) if budgets else None
+
+
+class DeadlinePropagator(TextMapPropagator):
+    """Writes the remaining budget into the carriers of outgoing calls.
+
+    ADK injects the global text map into the `_meta` of every MCP tool call,
+    so registering this propagator passes the budget on to the MCP servers.
+    """
+
+    def inject(
+        self, carrier: CarrierT, context: Optional[Context] = None, setter: Setter = default_setter
+    ) -> None:
+        remaining = remaining_seconds()
+        if remaining is not None:
+            setter.set(carrier, DEADLINE_METADATA_KEY, f"{remaining:.3f}")
+
+    def extract(
+        self, carrier: CarrierT, context: Optional[Context] = None, getter: Getter = default_getter
+    ) -> Context:
+        return context if context is not None else Context()
+
+    @property
+    def fields(self) -> Set[str]:
+        return {DEADLINE_METADATA_KEY}
+
+
+class ExecutionTracker:
+    """Model and tool calls of one agent execution: those in flight and the time spent in them.
+
+    Attributes:
+        model_started (Optional[float]): Start of the model call in flight.
+        tool_calls (Dict[str, float]): Start of every tool call in flight, by call id.
+        model_calls (int): Model calls finished.
+        model_seconds (float): Time spent waiting for the model.
+        tool_call_count (int): Tool calls finished.
+        tool_seconds (float): Time spent in tools, summed over parallel calls.
+    """
+
+    def __init__(self):
+        self.model_started: Optional[float] = None
+        self.tool_calls: Dict[str, float] = {}
+        self.model_calls = 0
+        self.model_seconds = 0.0
+        self.tool_call_count = 0
+        self.tool_seconds = 0.0
+
+
+current_execution: ContextVar[Optional[ExecutionTracker]] = ContextVar(
+    "current_execution", default=None
+)
+
+
+def record_stopped_execution(agent_name: str, reason: str) -> None:
+    """Count an execution stopped early and the calls it had in flight.
+
+    Args:
+        agent_name (str): Name of the agent whose execution stopped.
+        reason (str): `deadline`, `disconnect` or `cancel`.
+    """
+    CANCELLED_EXECUTIONS.inc(agent=agent_name, reason=reason)
+    remaining = remaining_seconds()
+    if remaining:
+        RECLAIMED_BUDGET.inc(remaining, agent=agent_name, reason=reason)
+    tracker = current_execution.get()
+    if tracker is not None:
+        if tracker.model_started is not None:
+            CANCELLED_CALLS.inc(agent=agent_name, kind="model")
+        if tracker.tool_calls:
+            CANCELLED_CALLS.inc(len(tracker.tool_calls), agent=agent_name, kind="tool")
+    logger.info(f"Execution of {agent_name} stopped: {reason}, {remaining or 0:.1f}s of budget left")
+
+
+def _before_model(callback_context: CallbackContext, llm_request: LlmRequest) -> None:
+    tracker = current_execution.get()
+    if tracker is not None:
+        tracker.model_started = time.monotonic()
+
+
+def _after_model(callback_context: CallbackContext, llm_response: LlmResponse) -> None:
+    tracker = current_execution.get()
+    if tracker is not None and not llm_response.partial and tracker.model_started is not None:
+        tracker.model_seconds += time.monotonic() - tracker.model_started
+        tracker.model_calls += 1
+        tracker.model_started = None
+
+
+def _before_tool(tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext) -> Optional[Dict[str, Any]]:
+    if remaining_seconds() == 0:
+        return {"error": "The deadline of this request has passed"}
+    tracker = current_execution.get()
+    if tracker is not None:
+        tracker.tool_calls[tool_context.function_call_id] = time.monotonic()
+    return None
+
+
+def _after_tool(
+    tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext, tool_response: Any
+) -> None:
+    tracker = current_execution.get()
+    if tracker is not None:
+        started = tracker.tool_calls.pop(tool_context.function_call_id, None)
+        if started is not None:
+            tracker.tool_seconds += time.monotonic() - started
+            tracker.tool_call_count += 1
+
+
+def attach_deadline_tracking(agent: Agent) -> None:
+    """Track the calls of an agent and pass deadlines on to its MCP tools.
+
+    Args:
+        agent (Agent): Agent created by AgentA2AGenerator.
+    """
+    add_callback(agent, "before_model_callback", _before_model)
+    add_callback(agent, "after_model_callback", _after_model)
+    add_callback(agent, "before_tool_callback", _before_tool)
+    add_callback(agent, "after_tool_callback", _after_tool)
+
+    textmap = propagate.get_global_textmap()
+    if DEADLINE_METADATA_KEY not in textmap.fields:
+        propagate.set_global_textmap(CompositePropagator([textmap, DeadlinePropagator()]))
+
+
+class RequestScope:
+    """Agent executions started by an HTTP request, cancelled if the client goes away."""
+
+    def __init__(self):
+        self.tasks: Set[asyncio.Task] = set()
+        self.disconnected = False
+
+    def add(self, task: asyncio.Task) -> None:
+        """Register the task executing the agent for this request."""
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def cancel(self) -> None:
+        """Cancel the executions still running."""
+        self.disconnected = True
+        for task in list(self.tasks):
+            task.cancel()
+
+
+current_request_scope: ContextVar[Optional[RequestScope]] = ContextVar(
+    "current_request_scope", default=None
+)
+
+
+# Key of the request body in the ASGI scope, so the middlewares behind the one
+# that read it do not buffer it again
+REQUEST_BODY_SCOPE_KEY = "agent_common.request_body"
+
+
+async def read_body(receive: Receive) -> Optional[bytes]:
+    """Read the whole body of a request.
+
+    Returns:
+        Optional[bytes]: The body, or None if the client disconnected first.
+    """
+    chunks = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        chunks.append(message.get("body", b""))
+        more_body = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+def replay_body(body: bytes, then: Receive) -> Receive:
+    """Receive channel giving the body once, then the messages of `then`."""
+    body_sent = False
+
+    async def replay() -> Message:
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await then()
+
+    return replay
+
+
+class CancellationMiddleware:
+    """ASGI middleware cancelling the agent executions of a request whose client disconnects.
+
+    The request body is read here and kept in the scope under
+    REQUEST_BODY_SCOPE_KEY. The application gets the body, then waits for the
+    disconnect seen by the watcher of the real receive channel.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        body = await read_body(receive)
+        if body is None:
+            return
+
+        request_scope = RequestScope()
+        disconnected = asyncio.Event()
+
+        async def wait_disconnect() -> Message:
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def watch() -> None:
+            while (await receive())["type"] != "http.disconnect":
+                continue
+            disconnected.set()
+            if request_scope.tasks:
+                logger.info("Client disconnected, cancelling its agent executions")
+            request_scope.cancel()
+
+        watcher = asyncio.create_task(watch())
+        token = current_request_scope.set(request_scope)
+        try:
+            await self.app(
+                {**scope, REQUEST_BODY_SCOPE_KEY: body}, replay_body(body, wait_disconnect), send
+            )
+        finally:
+            current_request_scope.reset(token)
+            watcher.cancel()
@@ -0,0 +1,196 @@
+"""Concurrent delegation of independent tasks to several remote agents."""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from a2a.types import Part, Task, TaskState, TextPart
+from google.adk.agents import Agent
+from google.adk.tools.tool_context import ToolContext
+from opentelemetry import trace
+
+from aigency.agents.communicator import Communicator
+from aigency.utils.logger import get_logger
+
+from agent_common.admission import CASE_PRIORITIES_METADATA_KEY
+from agent_common.deadline import deadline_scope
+from agent_common.executor import current_task_updater
+from agent_common.tracing import TRACER
+
+logger = get_logger()
+
+DEFAULT_TIMEOUT_SECONDS = 120
+
+
+def task_text(task: Task) -> str:
+    """Join the text parts of the artifacts of a task.
+
+    Args:
+        task (Task): A task returned by a remote agent.
+
+    Returns:
+        str: The text of its artifacts, one part per line.
+    """
+    texts = []
+    for artifact in task.artifacts or []:
+        for part in artifact.parts:
+            if isinstance(part.root, TextPart):
+                texts.append(part.root.text)
+    return "\n".join(texts)
+
+
+class ParallelDelegator:
+    """Sends several delegations through a Communicator at the same time.
+
+    Every delegation runs as its own asyncio task with the timeout of its agent,
+    capped by the deadline of the current request and sent along with it,
+    so the total latency is that of the slowest leg. Each result is published as
+    a working status update of the current A2A task as soon as it arrives.
+
+    Attributes:
+        communicator (Communicator): Connections to the remote agents.
+        timeout_seconds (float): Default timeout of a delegation.
+        agent_timeouts (Dict[str, float]): Timeouts of specific agents.
+    """
+
+    def __init__(
+        self,
+        communicator: Communicator,
+        timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+        agent_timeouts: Optional[Dict[str, float]] = None,
+    ):
+        self.communicator = communicator
+        self.timeout_seconds = timeout_seconds
+        self.agent_timeouts = agent_timeouts or {}
+
+    async def _delegate(
+        self, agent_name: str, task: str, tool_context: ToolContext
+    ) -> Dict[str, Any]:
+        timeout = self.agent_timeouts.get(agent_name, self.timeout_seconds)
+        started = time.perf_counter()
+        with TRACER.start_as_current_span(
+            f"delegate {agent_name}",
+            kind=trace.SpanKind.CLIENT,
+            attributes={"delegation.agent": agent_name},
+        ) as span:
+            try:
+                # The leg's budget is sent to the remote agent, capped by our own deadline
+                with deadline_scope(timeout) as remaining:
+                    response = await asyncio.wait_for(
+                        self.communicator.send_message(agent_name, task, tool_context),
+                        timeout=remaining,
+                    )
+            except asyncio.TimeoutError:
+                elapsed = time.perf_counter() - started
+                logger.warning(f"Delegation to '{agent_name}' timed out after {elapsed:.1f}s")
+                result = {"status": "timeout", "error": f"No answer within {elapsed:.1f} seconds"}
+            except Exception as e:
+                logger.error(f"Delegation to '{agent_name}' failed: {e}")
+                result = {"status": "error", "error": str(e)}
+            else:
+                if response is None:
+                    result = {"status": "error", "error": "The agent did not return a task"}
+                else:
+                    result = {"status": response.status.state.value, "result": task_text(response)}
+                    # The case priorities the remote agent learned, for the admission of later requests
+                    for artifact in response.artifacts or []:
+                        priorities = (artifact.metadata or {}).get(CASE_PRIORITIES_METADATA_KEY)
+                        if priorities:
+                            result.setdefault(CASE_PRIORITIES_METADATA_KEY, {}).update(priorities)
+
+            result["agent_name"] = agent_name
+            result["elapsed_seconds"] = round(time.perf_counter() - started, 2)
+            span.set_attributes(
+                {"delegation.status": result["status"], "delegation.elapsed_seconds": result["elapsed_seconds"]}
+            )
+        return result
+
+    async def send_messages_parallel(
+        self, delegations: List[Dict[str, str]], tool_context: ToolContext
+    ) -> Dict[str, Any]:
+        """Delegates independent tasks to several remote agents at the same time.
+
+        Use it instead of consecutive send_message calls when the tasks do not
+        depend on each other's results. Every task must be complete and
+        autonomous, exactly as for send_message. A leg that fails or times out
+        does not affect the others.
+
+        Args:
+            delegations: List of {"agent_name": ..., "task": ...}, at most one per agent.
+            tool_context: Context object containing the state and other information.
+
+        Returns:
+            The result of every delegation in the order they finished, each with
+            agent_name, status, result or error, and elapsed_seconds.
+        """
+        agent_names = [delegation.get("agent_name") for delegation in delegations]
+        if not delegations:
+            return {"error": "At least one delegation is required"}
+        if len(set(agent_names)) != len(agent_names):
+            return {"error": "Each agent can only receive one delegation per call"}
+        for delegation in delegations:
+            if not delegation.get("agent_name") or not delegation.get("task"):
+                return {"error": "Every delegation needs an agent_name and a task"}
+
+        logger.info(f"Delegating in parallel to {agent_names}")
+        updater = current_task_updater.get()
+        pending = [
+            asyncio.ensure_future(
+                self._delegate(delegation["agent_name"], delegation["task"], tool_context)
+            )
+            for delegation in delegations
+        ]
+
+        results = []
+        try:
+            for next_result in asyncio.as_completed(pending):
+                result = await next_result
+                results.append(result)
+                if updater is not None:
+                    text = result.get("result") or result.get("error", "")
+                    await updater.update_status(
+                        TaskState.working,
+                        message=updater.new_agent_message(
+                            [Part(root=TextPart(text=f"[{result['agent_name']}] {text}"))]
+                        ),
+                    )
+        finally:
+            for future in pending:
+                future.cancel()
+
+        # The slowest leg set the latency of the whole call
+        trace.get_current_span().set_attributes(
+            {
+                "delegation.critical_path_agent": results[-1]["agent_name"],
+                "delegation.critical_path_seconds": results[-1]["elapsed_seconds"],
+            }
+        )
+        return {"results": results}
+
+
+def add_parallel_delegation(agent: Agent, config: Optional[Dict[str, Any]]) -> None:
+    """Add the send_messages_parallel tool to an agent with remote agents.
+
+    Args:
+        agent (Agent): Agent created by AgentA2AGenerator.
+        config (Optional[Dict[str, Any]]): The `delegation` runtime settings, with
+            the optional `timeout_seconds` and `agent_timeouts` keys.
+    """
+    communicator = next(
+        (
+            tool.__self__
+            for tool in agent.tools
+            if isinstance(getattr(tool, "__self__", None), Communicator)
+        ),
+        None,
+    )
+    if communicator is None:
+        return
+
+    config = config or {}
+    delegator = ParallelDelegator(
+        communicator,
+        timeout_seconds=config.get("timeout_seconds", DEFAULT_TIMEOUT_SECONDS),
+        agent_timeouts=config.get("agent_timeouts"),
+    )
+    agent.tools.append(delegator.send_messages_parallel)
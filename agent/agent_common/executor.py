@@ -0,0 +1,303 @@
+"""A2A executor that streams the work of an agent and exposes its task to the agent tools."""
+
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Set
+
+from a2a.server.agent_execution.context import RequestContext
+from a2a.server.events.event_queue import EventQueue
+from a2a.server.tasks import TaskUpdater
+from a2a.types import AgentCard, DataPart, Message, Part, TaskState, TextPart
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.genai import types
+
+from aigency.agents.executor import DEFAULT_USER_ID, AgentA2AExecutor
+from aigency.utils.logger import get_logger
+from aigency.utils.utils import convert_a2a_part_to_genai, convert_genai_part_to_a2a
+
+from agent_common.deadline import (
+    ExecutionTracker,
+    budget_from_metadata,
+    current_execution,
+    current_request_scope,
+    deadline_scope,
+    record_stopped_execution,
+)
+from agent_common.metrics import REGISTRY
+from agent_common.tracing import TRACER
+
+logger = get_logger()
+
+TIME_TO_FIRST_TOKEN = REGISTRY.histogram(
+    "time_to_first_token_seconds",
+    "Time from the start of an execution to the first text sent to the client",
+    ("agent",),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0),
+)
+
+# Metadata of the streamed messages: `partial` marks a chunk of a model answer,
+# `event` a tool call or result, and `source_agent` an update forwarded from a remote agent
+PARTIAL_METADATA_KEY = "partial"
+EVENT_METADATA_KEY = "event"
+SOURCE_AGENT_METADATA_KEY = "source_agent"
+
+# Updater of the A2A task whose request is being processed, set for the tools it calls
+current_task_updater: ContextVar[Optional[TaskUpdater]] = ContextVar(
+    "current_task_updater", default=None
+)
+# Metadata of the artifact of that task, which tools and callbacks can add to
+current_artifact_metadata: ContextVar[Optional[Dict[str, Any]]] = ContextVar(
+    "current_artifact_metadata", default=None
+)
+
+
+def _has_text(parts: List[Part]) -> bool:
+    return any(isinstance(part.root, TextPart) and part.root.text for part in parts)
+
+
+class StreamingTaskUpdater(TaskUpdater):
+    """TaskUpdater recording when the first text of an execution reaches the client.
+
+    Attributes:
+        started (float): Start of the execution, from time.perf_counter().
+        first_text_seconds (Optional[float]): Time to the first text, once sent.
+    """
+
+    def __init__(self, event_queue: EventQueue, task_id: str, context_id: str, agent_name: str):
+        super().__init__(event_queue, task_id, context_id)
+        self.agent_name = agent_name
+        self.started = time.perf_counter()
+        self.first_text_seconds: Optional[float] = None
+
+    def _sent(self, parts: Optional[List[Part]]) -> None:
+        if self.first_text_seconds is None and parts and _has_text(parts):
+            self.first_text_seconds = time.perf_counter() - self.started
+            TIME_TO_FIRST_TOKEN.observe(self.first_text_seconds, agent=self.agent_name)
+
+    async def update_status(
+        self, state: TaskState, message: Optional[Message] = None, *args: Any, **kwargs: Any
+    ) -> None:
+        # Status messages of a finished task, such as a failure, are not answers
+        if message is not None and state == TaskState.working:
+            self._sent(message.parts)
+        await super().update_status(state, message, *args, **kwargs)
+
+    async def add_artifact(self, parts: List[Part], *args: Any, **kwargs: Any) -> None:
+        self._sent(parts)
+        await super().add_artifact(parts, *args, **kwargs)
+
+
+class AgencyExecutor(AgentA2AExecutor):
+    """AgentA2AExecutor that streams its work, lets tools publish progress and stops abandoned work.
+
+    With streaming, the model answers are requested as server-sent events and
+    every chunk is published as a working status message marked `partial`,
+    followed by the tool calls and results of the agent. The complete answer
+    is still the artifact of the task, and the task store keeps it only: the
+    chunks are streamed to the client without being stored. The time to the first text is recorded.
+
+    The task updater is stored in a context variable while the runner processes
+    a request, so a tool can send intermediate status messages to the client
+    before it returns, and so is the metadata of the artifact, which tools and
+    callbacks can add to.
+
+    Every execution runs under the deadline sent by the caller, or the default
+    one, and fails once it passes. Executions are cancelled, with their model
+    and tool calls, when the task is cancelled or the client disconnects.
+    Each execution is traced as a span holding its outcome and the time spent
+    in model and tool calls.
+
+    Attributes:
+        default_deadline_seconds (Optional[float]): Budget of requests that
+            come without one.
+        streaming (bool): Whether partial answers and tool events are published.
+    """
+
+    def __init__(
+        self,
+        runner: Runner,
+        card: AgentCard,
+        default_deadline_seconds: Optional[float] = None,
+        streaming: bool = False,
+    ):
+        super().__init__(runner=runner, card=card)
+        self.default_deadline_seconds = default_deadline_seconds
+        self.streaming = streaming
+        self._run_config = RunConfig(
+            streaming_mode=StreamingMode.SSE if streaming else StreamingMode.NONE
+        )
+        self._running: Set[str] = set()
+        # Running tasks whose cancellation was requested through tasks/cancel
+        self._cancel_requested: Set[str] = set()
+
+    def replace_runner(self, runner: Runner, card: AgentCard) -> None:
+        """Process the next requests with another runner.
+
+        Requests already being processed keep the runner they started with.
+
+        Args:
+            runner (Runner): Runner of the new version of the agent, sharing the
+                session service of the current one.
+            card (AgentCard): Agent card of the new version.
+        """
+        self.runner = runner
+        self._card = card
+
+    async def _process_request(
+        self,
+        new_message: types.Content,
+        session_id: str,
+        task_updater: TaskUpdater,
+    ) -> None:
+        session = await self._upsert_session(session_id)
+        self._active_sessions.add(session.id)
+        token = current_task_updater.set(task_updater)
+        metadata_token = current_artifact_metadata.set({})
+        try:
+            async for event in self.runner.run_async(
+                session_id=session.id,
+                user_id=DEFAULT_USER_ID,
+                new_message=new_message,
+                run_config=self._run_config,
+            ):
+                if event.is_final_response():
+                    parts = []
+                    if event.content:
+                        parts = [
+                            convert_genai_part_to_a2a(part)
+                            for part in event.content.parts
+                            if (part.text or part.file_data or part.inline_data)
+                        ]
+                    await task_updater.add_artifact(
+                        parts, metadata=current_artifact_metadata.get() or None
+                    )
+                    await task_updater.update_status(TaskState.completed, final=True)
+                    break
+                await self._publish_progress(event, task_updater)
+        finally:
+            current_artifact_metadata.reset(metadata_token)
+            current_task_updater.reset(token)
+            self._active_sessions.discard(session.id)
+
+    async def _publish_progress(self, event: Event, task_updater: TaskUpdater) -> None:
+        """Publish an intermediate event of the runner as a working status message."""
+        if event.get_function_calls() or event.get_function_responses():
+            # Streamed calls come again in the complete event that follows them
+            if not self.streaming or event.partial:
+                return
+            # The names only: arguments and results may be large or sensitive
+            parts = [
+                Part(root=DataPart(data={"tool_call": call.name}))
+                for call in event.get_function_calls()
+            ] + [
+                Part(root=DataPart(data={"tool_result": response.name}))
+                for response in event.get_function_responses()
+            ]
+            metadata = {EVENT_METADATA_KEY: "tool"}
+        else:
+            parts = [
+                convert_genai_part_to_a2a(part)
+                for part in (event.content.parts if event.content else [])
+                if part.text
+            ]
+            metadata = {PARTIAL_METADATA_KEY: True} if event.partial else None
+        if parts:
+            await task_updater.update_status(
+                TaskState.working,
+                message=task_updater.new_agent_message(parts, metadata=metadata),
+            )
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue):
+        request_scope = current_request_scope.get()
+        if request_scope is not None:
+            request_scope.add(asyncio.current_task())
+
+        budget = budget_from_metadata(context.message.metadata, context.metadata)
+        if budget is None:
+            budget = self.default_deadline_seconds
+
+        updater = StreamingTaskUpdater(
+            event_queue, context.task_id, context.context_id, self._card.name
+        )
+        tracker = ExecutionTracker()
+        token = current_execution.set(tracker)
+        self._running.add(context.task_id)
+        attributes = {
+            "agent.name": self._card.name,
+            "a2a.task_id": context.task_id,
+            "a2a.context_id": context.context_id,
+        }
+        if budget is not None:
+            attributes["deadline.budget_seconds"] = budget
+        with TRACER.start_as_current_span(f"execute {self._card.name}", attributes=attributes) as span:
+            outcome = "completed"
+            try:
+                with deadline_scope(budget) as remaining:
+                    deadline_timeout = asyncio.timeout(remaining)
+                    try:
+                        async with deadline_timeout:
+                            if not context.current_task:
+                                await updater.update_status(TaskState.submitted)
+                            await updater.update_status(TaskState.working)
+                            await self._process_request(
+                                types.UserContent(
+                                    parts=[convert_a2a_part_to_genai(part) for part in context.message.parts]
+                                ),
+                                context.context_id,
+                                updater,
+                            )
+                    except TimeoutError:
+                        # Only our deadline: a timeout raised by the work itself is an error
+                        if not deadline_timeout.expired():
+                            raise
+                        outcome = "deadline"
+                        record_stopped_execution(self._card.name, outcome)
+                        await updater.failed(
+                            message=updater.new_agent_message(
+                                [Part(root=TextPart(text=f"Deadline of {budget:g} seconds exceeded"))]
+                            )
+                        )
+                    except asyncio.CancelledError:
+                        if context.task_id in self._cancel_requested:
+                            outcome = "cancel"
+                            record_stopped_execution(self._card.name, outcome)
+                        elif request_scope is not None and request_scope.disconnected:
+                            outcome = "disconnect"
+                            record_stopped_execution(self._card.name, outcome)
+                            await updater.cancel()
+                        else:
+                            outcome = "cancelled"
+                            raise
+                        # The cancellation was ours: end normally so the event queue is closed
+                        asyncio.current_task().uncancel()
+            except BaseException:
+                if outcome == "completed":
+                    outcome = "error"
+                raise
+            finally:
+                # Where the time of the execution went, to read the critical path off the trace
+                span.set_attributes(
+                    {
+                        "agent.outcome": outcome,
+                        "agent.model_calls": tracker.model_calls,
+                        "agent.model_seconds": round(tracker.model_seconds, 6),
+                        "agent.tool_calls": tracker.tool_call_count,
+                        "agent.tool_seconds": round(tracker.tool_seconds, 6),
+                    }
+                )
+                if updater.first_text_seconds is not None:
+                    span.set_attribute("agent.time_to_first_token_seconds", updater.first_text_seconds)
+                current_execution.reset(token)
+                self._running.discard(context.task_id)
+                self._cancel_requested.discard(context.task_id)
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue):
+        """Mark a task as canceled; the request handler then cancels its execution."""
+        logger.info(f"Cancellation requested for task {context.task_id}")
+        if context.task_id in self._running:
+            self._cancel_requested.add(context.task_id)
+        updater = TaskUpdater(event_queue, context.task_id, context.context_id)
+        await updater.cancel()
@@ -0,0 +1,330 @@
+"""Pooled keep-alive HTTP connections for A2A delegations and MCP tool calls."""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Set
+
+import httpx
+from a2a.client.client import ClientConfig
+from a2a.client.client_factory import ClientFactory
+from a2a.server.tasks import TaskUpdater
+from a2a.types import AgentCard, Message, TaskState, TaskStatusUpdateEvent
+from google.adk.agents import Agent
+from google.adk.tools.mcp_tool.mcp_toolset import (
+    MCPToolset,
+    StreamableHTTPConnectionParams,
+)
+
+from aigency.agents.client import AgentClient
+from aigency.agents.communicator import Communicator
+from aigency.utils.logger import get_logger
+
+from agent_common.admission import PRIORITY_METADATA_KEY, current_priority
+from agent_common.deadline import DEADLINE_METADATA_KEY, remaining_seconds
+from agent_common.executor import SOURCE_AGENT_METADATA_KEY, current_task_updater
+from agent_common.tracing import inject_trace_context
+
+logger = get_logger()
+
+# Same defaults as the MCP SDK client: responses may be long-lived streams
+MCP_TIMEOUT = httpx.Timeout(30.0, read=300.0)
+A2A_TIMEOUT = 60
+
+
+class PooledTransport(httpx.AsyncBaseTransport):
+    """Transport routing every request to the connection pool of its origin.
+
+    Clients built on it share warm connections. Closing a client does not close
+    the pooled connections, which belong to the ConnectionPool.
+    """
+
+    def __init__(self, pool: "ConnectionPool"):
+        self.pool = pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        origin = (request.url.scheme, request.url.host, request.url.port)
+        try:
+            return await self.pool.transport(origin).handle_async_request(request)
+        except httpx.TransportError as e:
+            logger.warning(f"Connection to {request.url.host}:{request.url.port} failed: {e!r}")
+            raise
+
+    async def aclose(self) -> None:
+        # The pooled connections are closed by ConnectionPool.aclose
+        pass
+
+
+class ConnectionPool:
+    """Keep-alive connection pools per remote host, shared by all agent clients.
+
+    Idle connections are kept for `keepalive_expiry` seconds so that the hops of
+    consecutive requests reuse them. A pooled connection closed by the remote
+    side is detected and discarded before reuse, and failed connection attempts
+    are retried `connect_retries` times, so a restarted container is reconnected
+    to transparently.
+
+    Attributes:
+        limits (httpx.Limits): Connection limits of every remote.
+        connect_retries (int): Retries of a failed connection attempt.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 120.0,
+        connect_retries: int = 2,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.connect_retries = connect_retries
+        self._transports: Dict[tuple, httpx.AsyncHTTPTransport] = {}
+        self._shared = PooledTransport(self)
+
+    def transport(self, origin: tuple) -> httpx.AsyncHTTPTransport:
+        """Return the connection pool of an origin, creating it on first use.
+
+        Args:
+            origin (tuple): (scheme, host, port) of the remote.
+
+        Returns:
+            httpx.AsyncHTTPTransport: The pooled transport of the origin.
+        """
+        transport = self._transports.get(origin)
+        if transport is None:
+            transport = httpx.AsyncHTTPTransport(
+                limits=self.limits, retries=self.connect_retries
+            )
+            self._transports[origin] = transport
+        return transport
+
+    async def close_origins(self, origins: Iterable[tuple]) -> None:
+        """Close the connections of remotes that are no longer used.
+
+        Args:
+            origins (Iterable[tuple]): (scheme, host, port) of the remotes.
+        """
+        for origin in origins:
+            transport = self._transports.pop(origin, None)
+            if transport is not None:
+                await transport.aclose()
+
+    async def aclose(self) -> None:
+        """Close the connections of every remote, when the server shuts down."""
+        await self.close_origins(list(self._transports))
+
+    def client(self, **kwargs: Any) -> httpx.AsyncClient:
+        """Create an httpx client whose requests use the pooled connections.
+
+        Args:
+            **kwargs: Arguments of httpx.AsyncClient, except transport.
+
+        Returns:
+            httpx.AsyncClient: A client that can be closed without closing the pool.
+        """
+        return httpx.AsyncClient(transport=self._shared, **kwargs)
+
+    def mcp_client_factory(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[httpx.Timeout] = None,
+        auth: Optional[httpx.Auth] = None,
+    ) -> httpx.AsyncClient:
+        """httpx client factory for MCP streamable HTTP connections.
+
+        Args:
+            headers (Optional[Dict[str, str]]): Headers sent with every request.
+            timeout (Optional[httpx.Timeout]): Timeouts, MCP defaults if not set.
+            auth (Optional[httpx.Auth]): Authentication handler.
+
+        Returns:
+            httpx.AsyncClient: A client using the pooled connections.
+        """
+        kwargs: Dict[str, Any] = {"timeout": timeout or MCP_TIMEOUT}
+        if headers is not None:
+            kwargs["headers"] = headers
+        if auth is not None:
+            kwargs["auth"] = auth
+        return self.client(**kwargs)
+
+
+class PooledAgentClient(AgentClient):
+    """AgentClient sending its A2A requests through a ConnectionPool.
+
+    With `forward_updates`, the working status messages streamed by the remote
+    agent, such as partial answers and tool events, are republished on the
+    task being executed as they arrive, marked with the name of the remote
+    agent, so the client sees the work of the whole chain while it runs.
+    """
+
+    def __init__(self, agent_card: AgentCard, pool: ConnectionPool, forward_updates: bool = False):
+        """Initialize a pooled connection to a remote agent.
+
+        Args:
+            agent_card (AgentCard): The agent card of the remote agent.
+            pool (ConnectionPool): Pool providing the connections.
+            forward_updates (bool): Whether streamed updates are forwarded.
+        """
+        # The trace context goes with every request, so the remote spans join the caller's trace
+        self._httpx_client = pool.client(
+            timeout=A2A_TIMEOUT, event_hooks={"request": [inject_trace_context]}
+        )
+        self.card = agent_card
+        self.forward_updates = forward_updates
+
+        config = ClientConfig(httpx_client=self._httpx_client)
+        factory = ClientFactory(config=config)
+        self.agent_client = factory.create(agent_card)
+
+    async def send_message(self, message_request: Message) -> AsyncIterator[Any]:
+        """Send a message to the remote agent within the current deadline.
+
+        The remaining budget travels in the message metadata, with the priority
+        of the request being processed. When the budget runs out the request is
+        abandoned, which closes its connection and makes the remote agent
+        cancel the work.
+
+        Args:
+            message_request (Message): The message request to send to the remote agent.
+
+        Yields:
+            Any: The responses from the remote agent.
+        """
+        metadata = {}
+        remaining = remaining_seconds()
+        if remaining is not None:
+            metadata[DEADLINE_METADATA_KEY] = round(remaining, 3)
+        priority = current_priority.get()
+        if priority is not None:
+            metadata[PRIORITY_METADATA_KEY] = priority
+        if metadata:
+            message_request = message_request.model_copy(
+                update={"metadata": {**(message_request.metadata or {}), **metadata}}
+            )
+        updater = current_task_updater.get() if self.forward_updates else None
+        async with asyncio.timeout(remaining):
+            async for response in self.agent_client.send_message(message_request):
+                if updater is not None and isinstance(response, tuple):
+                    await self._forward(response[1], updater)
+                yield response
+
+    async def _forward(self, event: Any, updater: TaskUpdater) -> None:
+        if not isinstance(event, TaskStatusUpdateEvent) or event.status.state != TaskState.working:
+            return
+        message = event.status.message
+        if message is None or not message.parts:
+            return
+        # Updates forwarded by the remote agent keep the name of the agent they come from
+        metadata = {SOURCE_AGENT_METADATA_KEY: self.card.name, **(message.metadata or {})}
+        await updater.update_status(
+            TaskState.working, message=updater.new_agent_message(message.parts, metadata=metadata)
+        )
+
+
+def build_connection_pool(config: Optional[Dict[str, Any]]) -> ConnectionPool:
+    """Build the connection pool described by the `http` runtime settings.
+
+    Args:
+        config (Optional[Dict[str, Any]]): Settings with the optional
+            `max_connections`, `max_keepalive_connections`, `keepalive_expiry`
+            and `connect_retries` keys.
+
+    Returns:
+        ConnectionPool: The connection pool.
+    """
+    config = config or {}
+    return ConnectionPool(
+        max_connections=config.get("max_connections", 100),
+        max_keepalive_connections=config.get("max_keepalive_connections", 20),
+        keepalive_expiry=config.get("keepalive_expiry", 120.0),
+        connect_retries=config.get("connect_retries", 2),
+    )
+
+
+def url_origin(url: str) -> tuple:
+    """Return the (scheme, host, port) origin of a URL, as the pool keys it."""
+    parsed = httpx.URL(url)
+    return (parsed.scheme, parsed.host, parsed.port)
+
+
+def origins_of(agent: Agent) -> Set[tuple]:
+    """Return the origins of the remote agents and MCP servers an agent uses.
+
+    Args:
+        agent (Agent): Agent with a pool attached.
+
+    Returns:
+        Set[tuple]: (scheme, host, port) of every remote.
+    """
+    origins = set()
+    for tool in agent.tools:
+        communicator = getattr(tool, "__self__", None)
+        if isinstance(communicator, Communicator):
+            for connection in communicator.remote_agent_connections.values():
+                origins.add(url_origin(connection.get_agent().url))
+        elif isinstance(tool, MCPToolset) and hasattr(tool._connection_params, "url"):
+            origins.add(url_origin(tool._connection_params.url))
+    return origins
+
+
+# Closings scheduled on a running event loop, referenced until they are done
+_closing: Set[asyncio.Task] = set()
+
+
+def close_unused_client(client: httpx.AsyncClient) -> None:
+    """Close an httpx client from synchronous code, on or off an event loop.
+
+    On the thread of a running event loop the client is closed by a task of
+    that loop; anywhere else, such as the thread an agent is rebuilt in on a
+    reload, it is closed at once on an event loop of its own.
+
+    Args:
+        client (httpx.AsyncClient): A client no request is being sent with.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        asyncio.run(client.aclose())
+        return
+    task = loop.create_task(client.aclose())
+    _closing.add(task)
+    task.add_done_callback(_closing.discard)
+
+
+def attach_connection_pool(agent: Agent, pool: ConnectionPool, forward_updates: bool = False) -> None:
+    """Route the remote agent and MCP traffic of an agent through a pool.
+
+    Remote agent connections are replaced by PooledAgentClient instances, and
+    the httpx clients the replaced connections opened are closed. Streamable
+    HTTP MCP toolsets are rebuilt with the pool's client factory. The
+    MCP sessions themselves are kept open across requests by the toolsets.
+
+    Args:
+        agent (Agent): Agent created by AgentA2AGenerator.
+        pool (ConnectionPool): Pool providing the connections.
+        forward_updates (bool): Whether the updates streamed by remote agents
+            are forwarded to the client of the agent.
+    """
+    for index, tool in enumerate(agent.tools):
+        communicator = getattr(tool, "__self__", None)
+        if isinstance(communicator, Communicator):
+            connections = communicator.remote_agent_connections
+            for name, connection in connections.items():
+                connections[name] = PooledAgentClient(
+                    connection.get_agent(), pool, forward_updates=forward_updates
+                )
+                # AgentClient opens its own client, which the pooled one replaces
+                close_unused_client(connection._httpx_client)
+
+        elif isinstance(tool, MCPToolset):
+            params = tool._connection_params
+            if isinstance(params, StreamableHTTPConnectionParams):
+                agent.tools[index] = MCPToolset(
+                    connection_params=params.model_copy(
+                        update={"httpx_client_factory": pool.mcp_client_factory}
+                    )
+                )
+
+    logger.info(f"HTTP connection pool attached to {agent.name}")
@@ -0,0 +1,210 @@
+"""Opt-in on-disk cache of model responses keyed by the normalized request."""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from google.adk.agents import Agent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from aigency.utils.logger import get_logger
+
+from agent_common.callbacks import add_callback
+from agent_common.metrics import REGISTRY
+
+logger = get_logger()
+
+LLM_CACHE_REQUESTS = REGISTRY.counter(
+    "llm_cache_requests_total", "Model calls by response cache result", ("agent", "result")
+)
+
+# Request settings that do not change the generated response
+_IGNORED_CONFIG_FIELDS = {"tools", "system_instruction", "labels", "http_options"}
+
+
+def _normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _dump(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    return str(value)
+
+
+def _normalize_part(part: types.Part) -> Dict[str, Any]:
+    # Function call ids are generated per call and must not split the key
+    if part.text is not None:
+        return {"text": _normalize_text(part.text)}
+    if part.function_call is not None:
+        return {"call": part.function_call.name, "args": part.function_call.args}
+    if part.function_response is not None:
+        return {
+            "response": part.function_response.name,
+            "value": part.function_response.response,
+        }
+    return part.model_dump(mode="json", exclude_none=True)
+
+
+def request_key(llm_request: LlmRequest) -> str:
+    """Compute the cache key of a model request.
+
+    The key covers the model name, the normalized conversation, the system
+    instruction, the generation settings and a fingerprint of the declared
+    tools, so a change in any of them is a miss.
+
+    Args:
+        llm_request (LlmRequest): The request about to be sent to the model.
+
+    Returns:
+        str: Hex SHA-256 digest of the normalized request.
+    """
+    config = llm_request.config or types.GenerateContentConfig()
+    system = config.system_instruction
+    if isinstance(system, str):
+        system = _normalize_text(system)
+
+    payload = {
+        "model": llm_request.model,
+        "system": system,
+        "config": config.model_dump(mode="json", exclude_none=True, exclude=_IGNORED_CONFIG_FIELDS),
+        "tools": [
+            tool.model_dump(mode="json", exclude_none=True) for tool in config.tools or []
+        ],
+        "contents": [
+            {"role": content.role, "parts": [_normalize_part(part) for part in content.parts or []]}
+            for content in llm_request.contents
+        ],
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=_dump).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class LlmResponseCache:
+    """Model responses stored in a SQLite file, bounded in total size.
+
+    Only complete responses without errors are stored. Once the stored
+    responses exceed `max_bytes`, the least recently used ones are evicted.
+
+    Attributes:
+        path (str): Path of the SQLite database file.
+        max_bytes (int): Maximum total size of the stored responses.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+
+        # invocation id -> key of the model call waiting for its response
+        self._pending: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " used_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (used_at)")
+        (self._size,) = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        logger.info(f"LLM response cache opened at {path}")
+
+    def _read(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT data FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._db.execute(
+                    "UPDATE responses SET used_at = ? WHERE key = ?", (time.time(), key)
+                )
+        return row[0] if row else None
+
+    def _write(self, key: str, data: str) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, data, size, used_at) VALUES (?, ?, ?, ?)",
+                (key, data, len(data), time.time()),
+            )
+            self._size += len(data)
+            if self._size <= self.max_bytes:
+                return
+
+            # Other workers may share the file, so the size is recomputed
+            (self._size,) = self._db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            rows = self._db.execute(
+                "SELECT key, size FROM responses ORDER BY used_at ASC"
+            ).fetchall()
+            evicted = []
+            for old_key, size in rows:
+                if self._size <= self.max_bytes:
+                    break
+                evicted.append((old_key,))
+                self._size -= size
+            self._db.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    async def before_model(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        """Replay the stored response of an identical request."""
+        key = request_key(llm_request)
+        data = await asyncio.to_thread(self._read, key)
+        if data is None:
+            LLM_CACHE_REQUESTS.inc(agent=callback_context.agent_name, result="miss")
+            self._pending[callback_context.invocation_id] = key
+            return None
+
+        LLM_CACHE_REQUESTS.inc(agent=callback_context.agent_name, result="hit")
+        return LlmResponse.model_validate_json(data)
+
+    async def after_model(
+        self, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> None:
+        """Store a complete response of a request that missed the cache."""
+        if llm_response.partial:
+            return
+        key = self._pending.pop(callback_context.invocation_id, None)
+        if key is None or llm_response.error_code or not llm_response.content:
+            return
+
+        response = llm_response.model_copy(deep=True)
+        for part in response.content.parts or []:
+            if part.function_call is not None:
+                part.function_call.id = None
+        await asyncio.to_thread(
+            self._write, key, response.model_dump_json(exclude_none=True)
+        )
+
+
+def attach_llm_cache(agent: Agent, config: Optional[Dict[str, Any]]) -> None:
+    """Put a response cache in front of the model calls of an agent when enabled.
+
+    Args:
+        agent (Agent): Agent created by AgentA2AGenerator.
+        config (Optional[Dict[str, Any]]): The `llm_cache` runtime settings, with
+            `enabled`, `path` and the optional `max_mb` keys.
+    """
+    if not config or not config.get("enabled") or not config.get("path"):
+        return
+
+    cache = LlmResponseCache(
+        path=config["path"],
+        max_bytes=int(config.get("max_mb", 64) * 1024 * 1024),
+    )
+    add_callback(agent, "before_model_callback", cache.before_model)
+    add_callback(agent, "after_model_callback", cache.after_model)
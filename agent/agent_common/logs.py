@@ -0,0 +1,309 @@
+"""Logging pipeline: JSON lines, file rotation, DEBUG sampling and an optional writer thread.
+
+By default records are written by the logging call, which has the lowest tail
+latency on a fast disk. With `queue` on, they are queued and formatted and
+written by a single listener thread, so request handlers never block on a disk
+that stalls; on a single core that thread competes with the handlers for the
+interpreter, which costs latency when the disk is fast.
+This module only uses the standard library so the MCP servers can share it.
+"""
+
+import atexit
+import datetime
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Attributes every LogRecord has; the others come from `extra` and are kept as fields
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_listener: Optional["BatchingQueueListener"] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+# Handlers attached to the root logger when records are written by the logging call
+_direct_handlers: List[logging.Handler] = []
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, with `extra` values as fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "process": record.process,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SizeAndTimeRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotates the log file when it reaches a size or when an interval elapses.
+
+    Attributes:
+        interval_seconds (float): Age of the file that triggers a rotation, or 0
+            to rotate by size only.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        max_bytes: int = 50 * 1024 * 1024,
+        backup_count: int = 5,
+        interval_seconds: float = 0,
+    ):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        self.interval_seconds = interval_seconds
+        self._opened_at = time.time()
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.interval_seconds and time.time() - self._opened_at >= self.interval_seconds:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        self._opened_at = time.time()
+
+
+class DebugSampler(logging.Filter):
+    """Keeps one in every `every` DEBUG records of each logger.
+
+    Attributes:
+        every (int): Sampling period of the DEBUG records.
+    """
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = every
+        self._seen: Dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != logging.DEBUG:
+            return True
+        # A lost update under contention only shifts the sample
+        seen = self._seen.get(record.name, 0)
+        self._seen[record.name] = seen + 1
+        return seen % self.every == 0
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full.
+
+    Only the message arguments are merged in the calling thread; formatting
+    happens in the listener thread. Once `batch_size` records are queued the
+    listener is woken up, so a burst is written in small batches instead of
+    piling up until the next flush.
+
+    Attributes:
+        dropped (int): Records dropped because the writer fell behind.
+        batch_size (int): Queued records that wake up the listener.
+    """
+
+    def __init__(
+        self,
+        log_queue: queue.Queue,
+        wakeup: Optional[threading.Event] = None,
+        batch_size: int = 256,
+    ):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self.batch_size = batch_size
+        self._wakeup = wakeup
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+        if self._wakeup is not None and self.queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """Queue listener writing the queued records in batches.
+
+    It wakes up every `flush_interval` seconds, or earlier when the queue
+    handler sets `wakeup` because a batch is waiting. Waking up per record
+    would make every logging call hand the interpreter lock to the writer
+    thread; draining in batches keeps the callers running.
+
+    Attributes:
+        flush_interval (float): Longest time between two batches.
+        stop_timeout (float): Time stop() waits for room in a full queue.
+        wakeup (threading.Event): Set to write the queued records at once.
+    """
+
+    def __init__(
+        self,
+        log_queue: queue.Queue,
+        *handlers: logging.Handler,
+        flush_interval: float = 0.01,
+        stop_timeout: float = 5.0,
+    ):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.flush_interval = flush_interval
+        self.stop_timeout = stop_timeout
+        self.wakeup = threading.Event()
+        self._stopping = False
+
+    def enqueue_sentinel(self) -> None:
+        # A full queue must not make stop() fail: wait for the writer to make room.
+        # Should it not, the writer still stops once it has drained the queue.
+        self._stopping = True
+        self.wakeup.set()
+        try:
+            self.queue.put(self._sentinel, timeout=self.stop_timeout)
+        except queue.Full:
+            pass
+
+    def _monitor(self) -> None:
+        while True:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            for written in itertools.count(1):
+                try:
+                    record = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is self._sentinel:
+                    return
+                self.handle(record)
+                # Hand the interpreter back between chunks of a long batch
+                if written % 64 == 0:
+                    time.sleep(0)
+            if self._stopping:
+                return
+
+
+def setup_logging(config: Optional[Dict[str, Any]]) -> None:
+    """Route all logging of the process through the pipeline.
+
+    Every handler already attached to the root logger and to the configured
+    loggers is replaced, so records are written once by the pipeline. Calling
+    it again replaces the previous pipeline.
+
+    Args:
+        config (Optional[Dict[str, Any]]): The `logging` runtime settings, with
+            the optional keys `level`, `levels` (level per logger name),
+            `format` (`json` or `text`), `file`, `max_mb`, `rotate_hours`,
+            `backups`, `debug_sample_every` and `queue` (whether a writer
+            thread writes the records, off by default), and with the queue
+            `queue_size`, `flush_interval` and `batch_size`.
+    """
+    global _listener, _queue_handler
+
+    config = config or {}
+    shutdown_logging()
+
+    formatter = JsonFormatter() if config.get("format", "json") == "json" else logging.Formatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if config.get("file"):
+        os.makedirs(os.path.dirname(os.path.abspath(config["file"])), exist_ok=True)
+        handlers.append(
+            SizeAndTimeRotatingFileHandler(
+                config["file"],
+                max_bytes=int(config.get("max_mb", 50) * 1024 * 1024),
+                backup_count=config.get("backups", 5),
+                interval_seconds=config.get("rotate_hours", 24) * 3600,
+            )
+        )
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    sampler = None
+    if config.get("debug_sample_every", 1) > 1:
+        sampler = DebugSampler(config["debug_sample_every"])
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.setLevel(config.get("level", "INFO").upper())
+
+    if config.get("queue", False):
+        log_queue: queue.Queue = queue.Queue(maxsize=config.get("queue_size", 10000))
+        _listener = BatchingQueueListener(
+            log_queue, *handlers, flush_interval=config.get("flush_interval", 0.01)
+        )
+        _queue_handler = NonBlockingQueueHandler(
+            log_queue, wakeup=_listener.wakeup, batch_size=config.get("batch_size", 256)
+        )
+        if sampler is not None:
+            _queue_handler.addFilter(sampler)
+        root.addHandler(_queue_handler)
+    else:
+        for handler in handlers:
+            if sampler is not None:
+                handler.addFilter(sampler)
+            root.addHandler(handler)
+        _direct_handlers.extend(handlers)
+
+    for name, level in (config.get("levels") or {}).items():
+        module_logger = logging.getLogger(name)
+        for handler in list(module_logger.handlers):
+            module_logger.removeHandler(handler)
+            handler.close()
+        module_logger.setLevel(level.upper())
+        module_logger.propagate = True
+
+    if _listener is not None:
+        _listener.start()
+
+
+def env_config() -> Dict[str, Any]:
+    """Read the logging settings of a process from LOG_* environment variables.
+
+    Returns:
+        Dict[str, Any]: Settings for setup_logging, from LOG_LEVEL, LOG_FORMAT,
+            LOG_FILE, LOG_DEBUG_SAMPLE_EVERY and LOG_QUEUE.
+    """
+    return {
+        "level": os.getenv("LOG_LEVEL", "INFO"),
+        "format": os.getenv("LOG_FORMAT", "json"),
+        "file": os.getenv("LOG_FILE"),
+        "debug_sample_every": int(os.getenv("LOG_DEBUG_SAMPLE_EVERY", "1")),
+        "queue": os.getenv("LOG_QUEUE", "").lower() in ("1", "true", "yes"),
+    }
+
+
+def shutdown_logging() -> None:
+    """Flush the queued records and stop the writer thread, or close the direct handlers."""
+    global _listener, _queue_handler
+
+    for handler in _direct_handlers:
+        logging.getLogger().removeHandler(handler)
+        handler.close()
+    _direct_handlers.clear()
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        if _queue_handler.dropped:
+            sys.stderr.write(f"{_queue_handler.dropped} log records were dropped\n")
+    _listener = None
+    _queue_handler = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,217 @@
+"""Process-wide metrics of the agent and MCP servers in Prometheus text format."""
+
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+
+class Counter:
+    """Monotonic value per combination of label values.
+
+    Attributes:
+        name (str): Metric name.
+        documentation (str): Help text of the metric.
+        labelnames (Sequence[str]): Names of the labels.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Increase the value of a label combination.
+
+        Args:
+            amount (float): Amount to add.
+            **labels (str): Value of every label.
+        """
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Return the current value of a label combination."""
+        return self._values.get(self._key(labels), 0.0)
+
+    def labels(self, **labels: str) -> "BoundCounter":
+        """Return the value of a label combination, to update it without looking up its labels."""
+        return BoundCounter(self._values, self._key(labels))
+
+    def render(self) -> List[str]:
+        """Return the exposition lines of the metric."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for key, value in sorted(self._values.items()):
+            labels = ",".join(
+                f'{name}="{label}"' for name, label in zip(self.labelnames, key)
+            )
+            lines.append(f"{self.name}{{{labels}}} {value:g}" if labels else f"{self.name} {value:g}")
+        return lines
+
+
+class BoundCounter:
+    """Counter value of one label combination."""
+
+    __slots__ = ("_values", "_key")
+
+    def __init__(self, values: Dict[Tuple[str, ...], float], key: Tuple[str, ...]):
+        self._values = values
+        self._key = key
+        values.setdefault(key, 0.0)
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increase the value."""
+        self._values[self._key] += amount
+
+
+class Gauge(Counter):
+    """Value per combination of label values that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set the value of a label combination.
+
+        Args:
+            value (float): The new value.
+            **labels (str): Value of every label.
+        """
+        self._values[self._key(labels)] = value
+
+
+class Histogram(Counter):
+    """Distribution of observed values over cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = (0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0),
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [count per bucket and one for +Inf, sum]; buckets are
+        # made cumulative when rendered, so an observation updates one bucket
+        self._observations: Dict[Tuple[str, ...], list] = {}
+
+    def _observation(self, key: Tuple[str, ...]) -> list:
+        observation = self._observations.get(key)
+        if observation is None:
+            observation = [[0] * (len(self.buckets) + 1), 0.0]
+            self._observations[key] = observation
+        return observation
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record an observed value.
+
+        Args:
+            value (float): The observed value.
+            **labels (str): Value of every label.
+        """
+        observation = self._observation(self._key(labels))
+        observation[0][bisect_left(self.buckets, value)] += 1
+        observation[1] += value
+
+    def labels(self, **labels: str) -> "BoundHistogram":
+        """Return the distribution of a label combination, to record values without looking up its labels."""
+        return BoundHistogram(self.buckets, self._observation(self._key(labels)))
+
+    def render(self) -> List[str]:
+        """Return the exposition lines of the metric."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for key, (counts, total) in sorted(self._observations.items()):
+            labels = [f'{name}="{label}"' for name, label in zip(self.labelnames, key)]
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, None), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound is None else f"{bound:g}"
+                bucket_labels = ",".join([*labels, f'le="{le}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            suffix = f"{{{','.join(labels)}}}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {total:g}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+class BoundHistogram:
+    """Histogram distribution of one label combination."""
+
+    __slots__ = ("_buckets", "_observation")
+
+    def __init__(self, buckets: Tuple[float, ...], observation: list):
+        self._buckets = buckets
+        self._observation = observation
+
+    def observe(self, value: float) -> None:
+        """Record an observed value."""
+        observation = self._observation
+        observation[0][bisect_left(self._buckets, value)] += 1
+        observation[1] += value
+
+
+class MetricsRegistry:
+    """Collection of the metrics exposed by a process."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Counter] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def _register(self, metric: Counter) -> Counter:
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Return the counter with a name, creating it on first use."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Return the gauge with a name, creating it on first use."""
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Optional[Sequence[float]] = None,
+    ) -> Histogram:
+        """Return the histogram with a name, creating it on first use."""
+        if buckets is None:
+            return self._register(Histogram(name, documentation, labelnames))
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Register a function updating metrics, such as gauges of sizes, before every render."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Return all metrics in Prometheus text exposition format."""
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    """Serve the metrics of this process."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,209 @@
+"""In-process reload of the agent definition when its config file changes.
+
+The agent is rebuilt from the new config next to the running one, and swapped
+in for new requests; requests already running finish on the old version. The
+warm state of the process (task store, sessions, connection pool, caches and
+open MCP sessions) is kept across reloads.
+"""
+
+import asyncio
+import hashlib
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from a2a.server.apps import A2AStarletteApplication
+from google.adk.agents import Agent
+from google.adk.runners import Runner
+from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset
+
+from aigency.agents.generator import AgentA2AGenerator
+from aigency.schemas.aigency_config import AigencyConfig
+from aigency.utils.config_service import ConfigService
+from aigency.utils.logger import get_logger
+
+from agent_common.bootstrap import save_boot_cache
+from agent_common.config import load_runtime_config
+from agent_common.executor import AgencyExecutor
+from agent_common.http_pool import ConnectionPool, origins_of
+from agent_common.metrics import REGISTRY
+
+logger = get_logger()
+
+# Callbacks hold the caches and learned state attached to the running agent
+CALLBACK_FIELDS = (
+    "before_agent_callback",
+    "after_agent_callback",
+    "before_model_callback",
+    "after_model_callback",
+    "before_tool_callback",
+    "after_tool_callback",
+)
+
+CONFIG_RELOADS = REGISTRY.counter("config_reloads_total", "Reloads of the agent config by result", ("result",))
+
+
+def config_digest(config_path: str) -> str:
+    """Return the SHA-256 of the contents of a config file."""
+    with open(config_path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def carry_over_state(old: Agent, new: Agent) -> List[MCPToolset]:
+    """Move the warm state of an agent to its new version.
+
+    The new version gets the callbacks of the old one, with the tool result
+    cache, response cache, context compactor and learned case priorities they
+    hold, and reuses the MCP toolsets of the servers it still uses, with their
+    open sessions and tool lists.
+
+    Args:
+        old (Agent): The running version.
+        new (Agent): The version built from the new config.
+
+    Returns:
+        List[MCPToolset]: Toolsets of the old version no longer used by the new one.
+    """
+    for field in CALLBACK_FIELDS:
+        setattr(new, field, getattr(old, field))
+
+    toolsets = {
+        tool._connection_params.url: tool
+        for tool in old.tools
+        if isinstance(tool, MCPToolset) and hasattr(tool._connection_params, "url")
+    }
+    for index, tool in enumerate(new.tools):
+        if isinstance(tool, MCPToolset) and hasattr(tool._connection_params, "url"):
+            kept = toolsets.pop(tool._connection_params.url, None)
+            if kept is not None:
+                new.tools[index] = kept
+    return list(toolsets.values())
+
+
+class ConfigReloader:
+    """Watches the config file of an agent and swaps in a new version when it changes.
+
+    Only the agent definition is reloaded: model, instruction, skills, tools
+    and remote agents. The `runtime` settings of the serving process take
+    effect at the next restart. A config that does not load or build is
+    logged and the running version is kept.
+
+    Attributes:
+        config_path (str): Path to the agent_config.yaml file.
+        interval_seconds (float): Time between two checks of the file.
+        retire_after_seconds (float): Time the toolsets dropped by a reload are
+            kept open for the requests still running on the old version.
+    """
+
+    def __init__(
+        self,
+        config_path: str,
+        executor: AgencyExecutor,
+        server: A2AStarletteApplication,
+        build_agent: Callable[[AigencyConfig], Agent],
+        runtime_config: Dict[str, Any],
+        pool: ConnectionPool,
+        interval_seconds: float = 2.0,
+        retire_after_seconds: float = 120.0,
+    ):
+        """Initialize a reloader of a running agent.
+
+        Args:
+            config_path (str): Path to the agent_config.yaml file.
+            executor (AgencyExecutor): Executor running the agent.
+            server (A2AStarletteApplication): Application serving its card.
+            build_agent (Callable[[AigencyConfig], Agent]): Creates the agent of
+                a config with its tools bound, as at startup.
+            runtime_config (Dict[str, Any]): The runtime settings in effect.
+            pool (ConnectionPool): Pool of the remote agent and MCP connections.
+            interval_seconds (float): Time between two checks of the file.
+            retire_after_seconds (float): Time dropped toolsets are kept open.
+        """
+        self.config_path = config_path
+        self.executor = executor
+        self.server = server
+        self.build_agent = build_agent
+        self.runtime_config = runtime_config
+        self.pool = pool
+        self.interval_seconds = interval_seconds
+        self.retire_after_seconds = retire_after_seconds
+        self._digest = config_digest(config_path)
+        self._task: Optional[asyncio.Task] = None
+        self._retiring: Set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        """Start watching the config file, from the event loop of the server."""
+        self._task = asyncio.get_running_loop().create_task(self.watch())
+        logger.info(f"Watching {self.config_path} for changes every {self.interval_seconds}s")
+
+    def stop(self) -> None:
+        """Stop watching the config file and retiring the dropped connections."""
+        for task in (self._task, *self._retiring):
+            if task is not None:
+                task.cancel()
+
+    async def watch(self) -> None:
+        """Check the config file periodically and reload it when it changed."""
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                digest = config_digest(self.config_path)
+            except OSError:
+                # Editors may replace the file in several steps
+                continue
+            if digest != self._digest:
+                self._digest = digest
+                await self.reload()
+
+    async def reload(self) -> bool:
+        """Build the agent of the current config and swap it in for new requests.
+
+        Returns:
+            bool: Whether the new version is served.
+        """
+        try:
+            # Off the event loop: the manager fetches the cards of its remote agents
+            agent_config = await asyncio.to_thread(lambda: ConfigService(config_file=self.config_path).config)
+            agent = await asyncio.to_thread(self.build_agent, agent_config)
+            card = AgentA2AGenerator.build_agent_card(agent_config=agent_config)
+        except Exception as e:
+            CONFIG_RELOADS.inc(result="failed")
+            logger.error(f"Keeping the running version of the agent, the new config failed: {e}")
+            return False
+
+        current = self.executor.runner
+        retired = carry_over_state(current.agent, agent)
+        dropped = origins_of(current.agent) - origins_of(agent)
+        runner = Runner(
+            app_name=current.app_name,
+            agent=agent,
+            artifact_service=current.artifact_service,
+            session_service=current.session_service,
+            memory_service=current.memory_service,
+        )
+        # No await between the two, so a request sees either version as a whole
+        self.executor.replace_runner(runner, card)
+        self.server.agent_card = card
+        CONFIG_RELOADS.inc(result="applied")
+        logger.info(f"Reloaded {agent.name} from {self.config_path}")
+
+        if retired or dropped:
+            task = asyncio.create_task(self._retire(retired, dropped))
+            self._retiring.add(task)
+            task.add_done_callback(self._retiring.discard)
+        runtime_config = load_runtime_config(self.config_path)
+        if runtime_config != self.runtime_config:
+            logger.warning("The runtime settings changed, they take effect at the next restart")
+        save_boot_cache(
+            self.config_path, runtime_config, card.model_dump(mode="json", exclude_none=True, by_alias=True)
+        )
+        return True
+
+    async def _retire(self, toolsets: List[MCPToolset], origins: Set[tuple]) -> None:
+        # Requests still running on the old version end within their deadline
+        await asyncio.sleep(self.retire_after_seconds)
+        for toolset in toolsets:
+            try:
+                await toolset.close()
+            except Exception as e:
+                logger.warning(f"Could not close a retired MCP toolset: {e}")
+        # The pooled connections of the remotes the new version no longer calls
+        await self.pool.close_origins(origins)
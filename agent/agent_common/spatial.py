@@ -0,0 +1,213 @@
+"""Spatial index of points on the city map, for nearest-neighbour and radius queries.
+
+Coordinates are planar, in kilometres east (`x`) and north (`y`) of the city
+centre: at the scale of a city the curvature of the earth is negligible, so
+distances are Euclidean. This module only uses the standard library so the MCP
+servers can share it.
+"""
+
+import heapq
+import math
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Point = Tuple[float, float]
+
+# Fields of a cell: the square it covers, the ids of its four children once split, or its
+# points, each with the keys placed on it
+X0, Y0, SIZE, CHILDREN, POINTS = range(5)
+
+
+def point_of(coordinates: Any) -> Optional[Point]:
+    """Return the point of a `{"x": ..., "y": ...}` mapping, or None if it is not one."""
+    if not isinstance(coordinates, dict):
+        return None
+    x, y = coordinates.get("x"), coordinates.get("y")
+    for value in (x, y):
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            return None
+    return float(x), float(y)
+
+
+class QuadTree:
+    """Points in square cells that split in four when they hold too many points.
+
+    Cells are small where points are dense, such as the centre of a district,
+    and large where they are sparse, so a query reads about the same number of
+    points wherever it falls. Queries visit the cells closest first and stop as
+    soon as no unread cell can hold a closer point: their cost grows with the
+    number of points returned and the depth of the tree, not with its size.
+
+    Keys placed on the same point, such as informants placed at the centre of
+    their district, share one bucket: a cell splits on the number of distinct
+    points it holds, and a query reads a bucket only until it has enough keys
+    at that distance.
+
+    Cells are kept in a flat mapping by id rather than nested, so that a store
+    can persist and load them one by one. They are read with `get` and reached
+    with `[]` before they are changed, which lets a copy-on-write mapping tell
+    reads from changes.
+
+    Attributes:
+        capacity (int): Distinct points a cell holds before it splits.
+        points (Dict[str, Point]): Every indexed point, by key.
+        cells (Dict[int, list]): Every cell, by id.
+        root (int): Id of the cell covering all the others.
+    """
+
+    # Size of the first root, in km; the root grows when a point falls outside it
+    ROOT_SIZE = 64.0
+    # Cells holding equal or very close points stop splitting at this size
+    MIN_CELL_SIZE = 1e-4
+
+    def __init__(self, capacity: int = 16):
+        self.capacity = capacity
+        self.points: Dict[str, Point] = {}
+        self.cells: Dict[int, list] = {}
+        self.next_cell = 0
+        self.root = self._new_cell(-self.ROOT_SIZE / 2, -self.ROOT_SIZE / 2, self.ROOT_SIZE)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.points
+
+    def _new_cell(self, x0: float, y0: float, size: float) -> int:
+        cell_id = self.next_cell
+        self.next_cell += 1
+        self.cells[cell_id] = [x0, y0, size, None, {}]
+        return cell_id
+
+    @staticmethod
+    def _covers(node: list, point: Point) -> bool:
+        return (
+            node[X0] <= point[0] < node[X0] + node[SIZE]
+            and node[Y0] <= point[1] < node[Y0] + node[SIZE]
+        )
+
+    @staticmethod
+    def _child(node: list, point: Point) -> int:
+        half = node[SIZE] / 2
+        return node[CHILDREN][(point[0] >= node[X0] + half) + 2 * (point[1] >= node[Y0] + half)]
+
+    def _leaf(self, point: Point) -> int:
+        cell_id = self.root
+        node = self.cells.get(cell_id)
+        while node[CHILDREN] is not None:
+            cell_id = self._child(node, point)
+            node = self.cells.get(cell_id)
+        return cell_id
+
+    def _grow(self, point: Point) -> None:
+        # Double the root towards the point until it covers it
+        while not self._covers(self.cells.get(self.root), point):
+            root = self.cells.get(self.root)
+            size = root[SIZE]
+            x0 = root[X0] - size if point[0] < root[X0] else root[X0]
+            y0 = root[Y0] - size if point[1] < root[Y0] else root[Y0]
+            parent = self._new_cell(x0, y0, 2 * size)
+            self._split(parent, self.root)
+            self.root = parent
+
+    def _split(self, cell_id: int, keep: Optional[int] = None) -> None:
+        node = self.cells[cell_id]
+        half = node[SIZE] / 2
+        kept = self.cells.get(keep) if keep is not None else None
+        children = []
+        for dy in (0, 1):
+            for dx in (0, 1):
+                x0, y0 = node[X0] + dx * half, node[Y0] + dy * half
+                if kept is not None and kept[X0] == x0 and kept[Y0] == y0:
+                    children.append(keep)
+                else:
+                    children.append(self._new_cell(x0, y0, half))
+        node[CHILDREN] = children
+        points, node[POINTS] = node[POINTS], None
+        for point, keys in points.items():
+            self.cells[self._child(node, point)][POINTS][point] = keys
+        for child_id in children:
+            child = self.cells.get(child_id)
+            if child[CHILDREN] is None and len(child[POINTS]) > self.capacity and child[SIZE] > self.MIN_CELL_SIZE:
+                self._split(child_id)
+
+    def add(self, key: str, point: Point) -> None:
+        """Add a point, or move it if the key is already indexed."""
+        self.remove(key)
+        self._grow(point)
+        leaf_id = self._leaf(point)
+        leaf = self.cells[leaf_id]
+        leaf[POINTS].setdefault(point, {})[key] = None
+        self.points[key] = point
+        if len(leaf[POINTS]) > self.capacity and leaf[SIZE] > self.MIN_CELL_SIZE:
+            self._split(leaf_id)
+
+    def remove(self, key: str) -> None:
+        """Remove a point if the key is indexed."""
+        if key not in self.points:
+            return
+        point = self.points.pop(key)
+        points = self.cells[self._leaf(point)][POINTS]
+        del points[point][key]
+        if not points[point]:
+            del points[point]
+
+    @staticmethod
+    def _distance_to(node: list, x: float, y: float) -> float:
+        dx = max(node[X0] - x, 0.0, x - node[X0] - node[SIZE])
+        dy = max(node[Y0] - y, 0.0, y - node[Y0] - node[SIZE])
+        return math.hypot(dx, dy)
+
+    def nearest(
+        self,
+        point: Point,
+        k: int,
+        max_distance: Optional[float] = None,
+        accept: Optional[Callable[[str], bool]] = None,
+    ) -> List[Tuple[float, str]]:
+        """Return the k points closest to a point, closest first.
+
+        Args:
+            point (Point): The query point.
+            k (int): Maximum number of points returned.
+            max_distance (Optional[float]): Only points at most this far are
+                returned, if set.
+            accept (Optional[Callable[[str], bool]]): Only the keys it accepts
+                are returned, if set.
+
+        Returns:
+            List[Tuple[float, str]]: Distance and key of every point found.
+        """
+        if k <= 0 or not self.points:
+            return []
+        x, y = point
+        limit = math.inf if max_distance is None else max_distance
+
+        # Max-heap of the best k as (-distance, key), and cells to read closest first
+        best: List[Tuple[float, str]] = []
+        root = self.cells.get(self.root)
+        cells = [(self._distance_to(root, x, y), self.root, root)]
+        while cells:
+            cell_distance, _, node = heapq.heappop(cells)
+            if cell_distance > limit or (len(best) == k and cell_distance >= -best[0][0]):
+                break
+            if node[CHILDREN] is not None:
+                for child_id in node[CHILDREN]:
+                    child = self.cells.get(child_id)
+                    child_distance = self._distance_to(child, x, y)
+                    if child_distance <= limit:
+                        heapq.heappush(cells, (child_distance, child_id, child))
+                continue
+            for (px, py), keys in node[POINTS].items():
+                distance = math.hypot(px - x, py - y)
+                if distance > limit:
+                    continue
+                for key in keys:
+                    if len(best) == k and distance >= -best[0][0]:
+                        break
+                    if accept is not None and not accept(key):
+                        continue
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, key))
+                    else:
+                        heapq.heapreplace(best, (-distance, key))
+        return sorted((-distance, key) for distance, key in best)
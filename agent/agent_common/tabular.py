@@ -0,0 +1,62 @@
+"""Columnar encoding of the list results of the MCP tools.
+
+A list of records is sent as its column names, once, and one array of values
+per record, instead of an object repeating every key in every record. The
+rows are read straight from the stored records, without building a dict per
+row. This module only uses the standard library so the MCP servers can share it.
+"""
+
+import operator
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+RESPONSE_FORMATS = ("rows", "columns")
+
+
+def check_response_format(response_format: str) -> Optional[Dict[str, Any]]:
+    """Return the error result of an unknown response format, or None if valid."""
+    if response_format in RESPONSE_FORMATS:
+        return None
+    return {
+        "error": f"Response format '{response_format}' not valid. Valid formats: {', '.join(RESPONSE_FORMATS)}"
+    }
+
+
+def row_getter(columns: Sequence[str]) -> Callable[[Mapping[str, Any]], Tuple[Any, ...]]:
+    """Return a function reading the values of columns from a record, in order.
+
+    Missing keys read as None, at the cost of a slower path for that record.
+
+    Args:
+        columns (Sequence[str]): Keys of the values, in column order.
+
+    Returns:
+        Callable[[Mapping[str, Any]], Tuple[Any, ...]]: The row of a record.
+    """
+    get = operator.itemgetter(*columns)
+    single = len(columns) == 1
+
+    def row(record: Mapping[str, Any]) -> Tuple[Any, ...]:
+        try:
+            values = get(record)
+        except KeyError:
+            return tuple(record.get(column) for column in columns)
+        return (values,) if single else values
+
+    return row
+
+
+def columnar(columns: Sequence[str], records: Iterable[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Encode records as a table of columns and rows.
+
+    Args:
+        columns (Sequence[str]): Keys of the records to send, in column order.
+        records (Iterable[Mapping[str, Any]]): The records, e.g. a filtered
+            iteration over a store.
+
+    Returns:
+        Dict[str, Any]: `columns`, `rows` (one array of values per record) and
+            `count`.
+    """
+    row = row_getter(columns)
+    rows = [row(record) for record in records]
+    return {"columns": list(columns), "rows": rows, "count": len(rows)}
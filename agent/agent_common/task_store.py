@@ -0,0 +1,268 @@
+"""Bounded, SQLite-backed A2A task store shared by the agent servers."""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from a2a.server.tasks import InMemoryTaskStore, TaskStore
+from a2a.types import Message, Task, TaskState
+
+from aigency.utils.logger import get_logger
+
+from agent_common.executor import PARTIAL_METADATA_KEY
+
+logger = get_logger()
+
+FINISHED_STATES = {
+    TaskState.completed,
+    TaskState.canceled,
+    TaskState.failed,
+    TaskState.rejected,
+}
+
+
+class BoundedTaskStore(TaskStore):
+    """Task store with a SQLite file as durable tier and an in-memory LRU hot tier.
+
+    Tasks survive process restarts because every save is written to SQLite.
+    Memory stays bounded because only the `hot_tasks` most recently used tasks
+    are kept in memory. The file stays bounded by evicting tasks not updated
+    for `ttl_seconds` and, above `max_tasks`, the oldest tasks, finished ones
+    first. Finished tasks are compacted to their last `history_limit` messages
+    when they are saved.
+
+    Chunks of a streamed answer, marked `partial`, reach the client but are not
+    stored: a save whose status is such a chunk is skipped, and the chunks the
+    task manager moved to the history are removed from it. Otherwise every chunk
+    would rewrite the whole task, at a cost quadratic in the length of the
+    answer, which is saved whole as the artifact of the task.
+
+    When the file is `shared` by several worker processes, a task in the hot
+    tier is only used if its update time still matches the one in SQLite, so
+    any worker can serve follow-up requests for a task updated by another.
+
+    Attributes:
+        path (str): Path of the SQLite database file.
+        max_tasks (int): Maximum number of tasks kept in the database.
+        ttl_seconds (float): Time after its last update when a task expires.
+        hot_tasks (int): Number of tasks kept in memory.
+        history_limit (int): Messages kept in the history of finished tasks.
+        eviction_interval (int): Number of saves between eviction passes.
+        shared (bool): Whether other processes write to the same file.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_tasks: int = 10000,
+        ttl_seconds: float = 7 * 24 * 3600,
+        hot_tasks: int = 256,
+        history_limit: int = 20,
+        eviction_interval: int = 100,
+        shared: bool = False,
+    ):
+        self.path = path
+        self.max_tasks = max_tasks
+        self.ttl_seconds = ttl_seconds
+        self.hot_tasks = hot_tasks
+        self.history_limit = history_limit
+        self.eviction_interval = eviction_interval
+        self.shared = shared
+
+        self._hot: OrderedDict[str, tuple[Task, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._saves = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " id TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " finished INTEGER NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS tasks_eviction ON tasks (finished, updated_at)"
+        )
+        logger.info(f"Task store opened at {path}")
+
+    # --- Hot tier ---
+
+    def _remember(self, task: Task, updated_at: float) -> None:
+        with self._lock:
+            self._hot[task.id] = (task, updated_at)
+            self._hot.move_to_end(task.id)
+            while len(self._hot) > self.hot_tasks:
+                self._hot.popitem(last=False)
+
+    def _recall(self, task_id: str) -> Optional[tuple[Task, float]]:
+        with self._lock:
+            entry = self._hot.get(task_id)
+            if entry is not None:
+                self._hot.move_to_end(task_id)
+            return entry
+
+    def _forget(self, *task_ids: str) -> None:
+        with self._lock:
+            for task_id in task_ids:
+                self._hot.pop(task_id, None)
+
+    # --- Durable tier ---
+
+    def _write(self, task_id: str, data: str, finished: bool, updated_at: float) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO tasks (id, data, finished, updated_at) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(id) DO UPDATE SET data = excluded.data,"
+                " finished = excluded.finished, updated_at = excluded.updated_at",
+                (task_id, data, int(finished), updated_at),
+            )
+            self._saves += 1
+            evict = self._saves % self.eviction_interval == 0
+
+        if evict:
+            self._evict()
+
+    def _read(self, task_id: str) -> Optional[tuple[str, float]]:
+        with self._lock:
+            return self._db.execute(
+                "SELECT data, updated_at FROM tasks WHERE id = ?", (task_id,)
+            ).fetchone()
+
+    def _version(self, task_id: str) -> Optional[float]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT updated_at FROM tasks WHERE id = ?", (task_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _remove(self, task_id: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    def _evict(self) -> None:
+        """Delete expired tasks and, above the size limit, the oldest tasks."""
+        with self._lock:
+            expired = self._db.execute(
+                "DELETE FROM tasks WHERE updated_at < ? RETURNING id",
+                (time.time() - self.ttl_seconds,),
+            ).fetchall()
+            (count,) = self._db.execute("SELECT COUNT(*) FROM tasks").fetchone()
+            overflow = []
+            if count > self.max_tasks:
+                overflow = self._db.execute(
+                    "DELETE FROM tasks WHERE id IN ("
+                    " SELECT id FROM tasks ORDER BY finished DESC, updated_at ASC LIMIT ?)"
+                    " RETURNING id",
+                    (count - self.max_tasks,),
+                ).fetchall()
+            if expired or overflow:
+                self._db.execute("PRAGMA incremental_vacuum")
+
+        evicted = [row[0] for row in expired + overflow]
+        self._forget(*evicted)
+        if evicted:
+            logger.info(f"Task store evicted {len(evicted)} tasks")
+
+    @staticmethod
+    def _is_partial(message: Optional[Message]) -> bool:
+        return message is not None and bool((message.metadata or {}).get(PARTIAL_METADATA_KEY))
+
+    def _compact(self, task: Task) -> Task:
+        if task.history and len(task.history) > self.history_limit:
+            return task.model_copy(update={"history": task.history[-self.history_limit :]})
+        return task
+
+    # --- TaskStore interface ---
+
+    async def save(self, task: Task) -> None:
+        """Save or update a task in both tiers.
+
+        Args:
+            task (Task): The task to save.
+        """
+        if task.history and any(self._is_partial(message) for message in task.history):
+            # In place: the task manager keeps adding to this task
+            task.history = [message for message in task.history if not self._is_partial(message)]
+        if task.status.state == TaskState.working and self._is_partial(task.status.message):
+            return
+        finished = task.status.state in FINISHED_STATES
+        if finished:
+            task = self._compact(task)
+        updated_at = time.time()
+        self._remember(task, updated_at)
+        await asyncio.to_thread(
+            self._write, task.id, task.model_dump_json(), finished, updated_at
+        )
+
+    async def get(self, task_id: str) -> Task | None:
+        """Retrieve a task, loading it into the hot tier if needed.
+
+        Args:
+            task_id (str): The ID of the task.
+
+        Returns:
+            Task | None: The task, or None if it does not exist or has expired.
+        """
+        entry = self._recall(task_id)
+        if entry is not None and self.shared:
+            version = await asyncio.to_thread(self._version, task_id)
+            if version != entry[1]:
+                self._forget(task_id)
+                entry = None
+        if entry is None:
+            row = await asyncio.to_thread(self._read, task_id)
+            if row is None:
+                return None
+            entry = (Task.model_validate_json(row[0]), row[1])
+            self._remember(*entry)
+
+        task, updated_at = entry
+        if updated_at < time.time() - self.ttl_seconds:
+            await self.delete(task_id)
+            return None
+        return task
+
+    async def delete(self, task_id: str) -> None:
+        """Delete a task from both tiers.
+
+        Args:
+            task_id (str): The ID of the task.
+        """
+        self._forget(task_id)
+        await asyncio.to_thread(self._remove, task_id)
+
+
+def build_task_store(config: Optional[Dict[str, Any]], workers: int = 1) -> TaskStore:
+    """Build the task store described by the `task_store` runtime settings.
+
+    Args:
+        config (Optional[Dict[str, Any]]): Settings with `path` and the optional
+            `max_tasks`, `ttl_hours`, `hot_tasks` and `history_limit` keys.
+        workers (int): Number of worker processes sharing the store.
+
+    Returns:
+        TaskStore: A BoundedTaskStore, or an InMemoryTaskStore if no path is set.
+    """
+    if not config or not config.get("path"):
+        logger.warning("No task store path configured, tasks are kept in memory")
+        if workers > 1:
+            logger.warning("In-memory tasks are not shared between workers")
+        return InMemoryTaskStore()
+
+    return BoundedTaskStore(
+        path=config["path"],
+        max_tasks=config.get("max_tasks", 10000),
+        ttl_seconds=config.get("ttl_hours", 168) * 3600,
+        hot_tasks=config.get("hot_tasks", 256),
+        history_limit=config.get("history_limit", 20),
+        shared=workers > 1,
+    )
@@ -0,0 +1,209 @@
+"""TTL cache of read-only MCP tool results, invalidated by mutating tools."""
+
+import copy
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from google.adk.agents import Agent
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+
+from aigency.utils.logger import get_logger
+
+from agent_common.callbacks import add_callback
+from agent_common.metrics import REGISTRY
+
+logger = get_logger()
+
+CACHE_REQUESTS = REGISTRY.counter(
+    "tool_cache_requests_total", "Read-only tool calls by cache result", ("tool", "result")
+)
+CACHE_SAVED_SECONDS = REGISTRY.counter(
+    "tool_cache_saved_seconds_total", "Tool execution time saved by cache hits", ("tool",)
+)
+CACHE_INVALIDATIONS = REGISTRY.counter(
+    "tool_cache_invalidations_total", "Cache entries dropped by mutating tools", ("tool",)
+)
+CACHE_ENTRIES = REGISTRY.gauge("tool_cache_entries", "Tool results currently cached")
+
+
+def is_error_response(response: Any) -> bool:
+    """Tell whether an MCP tool response carries an error.
+
+    Args:
+        response (Any): The tool response as returned to the model.
+
+    Returns:
+        bool: True for failed calls and for tool results with an error key.
+    """
+    if not isinstance(response, dict):
+        return False
+    if response.get("isError") or "error" in response:
+        return True
+    structured = response.get("structuredContent")
+    if isinstance(structured, dict):
+        return "error" in structured or is_error_response(structured.get("result"))
+    for item in response.get("content") or []:
+        if isinstance(item, dict) and item.get("type") == "text":
+            try:
+                result = json.loads(item.get("text", ""))
+            except ValueError:
+                continue
+            if isinstance(result, dict) and "error" in result:
+                return True
+    return False
+
+
+class ToolResultCache:
+    """LRU cache of read-only tool results with a time to live.
+
+    Results are keyed by tool name and arguments. When a mutating tool succeeds,
+    the cached results of the read-only tools it affects are dropped. A cached
+    result is affected if it agrees with the mutation on every argument they
+    share, e.g. get_case_details(case_id="C1") after update_case_status(case_id="C1"),
+    or if they share no argument at all, e.g. search_cases_by_status.
+
+    A rule given as `{"tool": name, "match_args": false}` instead of a name drops
+    every cached result of the tool, for results that depend on more than the
+    arguments they share with the mutation, e.g. the availability of a slot at
+    any location or neighbouring time.
+
+    Attributes:
+        read_only_tools (set): Names of the tools whose results are cached.
+        invalidated_by (Dict[str, Dict[str, bool]]): Read-only tools affected by
+            every mutating tool, with whether arguments are matched.
+        ttl_seconds (float): Time a result stays valid.
+        max_entries (int): Maximum number of cached results.
+    """
+
+    def __init__(
+        self,
+        read_only_tools: Iterable[str],
+        invalidated_by: Optional[Dict[str, List[Union[str, Dict[str, Any]]]]] = None,
+        ttl_seconds: float = 300.0,
+        max_entries: int = 1024,
+    ):
+        self.read_only_tools = set(read_only_tools)
+        # mutating tool -> {affected tool: whether arguments are matched}
+        self.invalidated_by: Dict[str, Dict[str, bool]] = {}
+        for mutation, rules in (invalidated_by or {}).items():
+            affected = self.invalidated_by.setdefault(mutation, {})
+            for rule in rules:
+                if isinstance(rule, str):
+                    affected[rule] = True
+                else:
+                    affected[rule["tool"]] = rule.get("match_args", True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        # key -> (tool name, arguments, response, expiry time, execution seconds)
+        self._entries: OrderedDict[Tuple[str, str], tuple] = OrderedDict()
+        # function call id -> (key, start time) of the calls being executed
+        self._calls: Dict[str, Tuple[Tuple[str, str], float]] = {}
+
+    @staticmethod
+    def _key(tool_name: str, args: Dict[str, Any]) -> Tuple[str, str]:
+        return tool_name, json.dumps(args, sort_keys=True, default=str)
+
+    def before_tool(
+        self, tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext
+    ) -> Optional[Dict[str, Any]]:
+        """Answer a read-only tool call from the cache when possible."""
+        if tool.name not in self.read_only_tools:
+            return None
+
+        key = self._key(tool.name, args)
+        entry = self._entries.get(key)
+        if entry is not None and entry[3] > time.monotonic():
+            self._entries.move_to_end(key)
+            CACHE_REQUESTS.inc(tool=tool.name, result="hit")
+            CACHE_SAVED_SECONDS.inc(entry[4], tool=tool.name)
+            return copy.deepcopy(entry[2])
+
+        CACHE_REQUESTS.inc(tool=tool.name, result="miss")
+        self._calls[tool_context.function_call_id] = (key, time.monotonic())
+        return None
+
+    def after_tool(
+        self,
+        tool: BaseTool,
+        args: Dict[str, Any],
+        tool_context: ToolContext,
+        tool_response: Any,
+    ) -> None:
+        """Store the result of a read-only tool or apply a mutation's invalidations."""
+        call = self._calls.pop(tool_context.function_call_id, None)
+        if is_error_response(tool_response):
+            return
+
+        if call is not None:
+            key, started = call
+            now = time.monotonic()
+            self._entries[key] = (
+                tool.name,
+                args,
+                copy.deepcopy(tool_response),
+                now + self.ttl_seconds,
+                now - started,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            CACHE_ENTRIES.set(len(self._entries))
+
+        elif tool.name in self.invalidated_by:
+            self.invalidate(tool.name, args)
+
+    def invalidate(self, tool_name: str, args: Dict[str, Any]) -> int:
+        """Drop the cached results affected by a mutating tool call.
+
+        Args:
+            tool_name (str): Name of the mutating tool.
+            args (Dict[str, Any]): Arguments of the call.
+
+        Returns:
+            int: Number of dropped results.
+        """
+        affected = self.invalidated_by.get(tool_name, {})
+        stale = [
+            key
+            for key, (name, cached_args, *_) in self._entries.items()
+            if name in affected
+            and (
+                not affected[name]
+                or all(args[arg] == cached_args[arg] for arg in args.keys() & cached_args.keys())
+            )
+        ]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            CACHE_INVALIDATIONS.inc(len(stale), tool=tool_name)
+            CACHE_ENTRIES.set(len(self._entries))
+        return len(stale)
+
+
+def attach_tool_cache(agent: Agent, config: Optional[Dict[str, Any]]) -> None:
+    """Cache the read-only tool results of an agent as set in its runtime settings.
+
+    Args:
+        agent (Agent): Agent created by AgentA2AGenerator.
+        config (Optional[Dict[str, Any]]): The `tool_cache` runtime settings, with
+            `read_only_tools` and the optional `invalidated_by`, `ttl_seconds`
+            and `max_entries` keys. `invalidated_by` maps every mutating tool
+            to the read-only tools it affects, as names or as
+            `{"tool": name, "match_args": false}` rules.
+    """
+    if not config or not config.get("read_only_tools"):
+        return
+
+    cache = ToolResultCache(
+        read_only_tools=config["read_only_tools"],
+        invalidated_by=config.get("invalidated_by"),
+        ttl_seconds=config.get("ttl_seconds", 300.0),
+        max_entries=config.get("max_entries", 1024),
+    )
+    add_callback(agent, "before_tool_callback", cache.before_tool)
+    add_callback(agent, "after_tool_callback", cache.after_tool)
+    logger.info(f"Caching results of {sorted(cache.read_only_tools)}")
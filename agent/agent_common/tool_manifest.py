@@ -0,0 +1,161 @@
+"""Tool-schema manifest of the MCP servers, persisted and refreshed in the background."""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from google.adk.agents import Agent
+from google.adk.tools.mcp_tool.mcp_toolset import (
+    MCPToolset,
+    StreamableHTTPConnectionParams,
+)
+from mcp.types import Tool
+
+from aigency.utils.logger import get_logger
+
+logger = get_logger()
+
+MANIFEST_FILE = "mcp_tools.json"
+
+
+class ToolManifest:
+    """Tool lists of MCP servers, by server URL, kept in a JSON file.
+
+    The file survives restarts, so a new process knows the tool schemas of its
+    MCP servers without asking them.
+
+    Attributes:
+        path (str): Path of the manifest file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as file:
+                    self._entries = json.load(file)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def tools(self, url: str) -> Optional[List[Tool]]:
+        """Return the tools last listed by a server, or None if it is unknown."""
+        entry = self._load().get(url)
+        if entry is None:
+            return None
+        try:
+            return [Tool.model_validate(tool) for tool in entry["tools"]]
+        except (KeyError, ValueError) as e:
+            logger.warning(f"Ignoring the manifest of {url}: {e}")
+            return None
+
+    def save(self, url: str, tools: List[Tool]) -> None:
+        """Record the tools listed by a server, replacing the file atomically."""
+        entries = self._load()
+        entries[url] = {
+            "listed_at": time.time(),
+            "tools": [tool.model_dump(mode="json", by_alias=True, exclude_none=True) for tool in tools],
+        }
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            temporary = f"{self.path}.{os.getpid()}.tmp"
+            with open(temporary, "w", encoding="utf-8") as file:
+                json.dump(entries, file)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write the tool manifest {self.path}: {e}")
+
+
+class ManifestMCPToolset(MCPToolset):
+    """MCPToolset that lists the tools of its server once per refresh interval.
+
+    The tool list is kept in memory for `refresh_seconds`. When it expires, or
+    when the process starts, the list of the manifest is used at once and the
+    server is listed again in the background, so no model turn waits for a
+    tools/list round trip except the very first one of a new server.
+
+    It overrides private methods of MCPToolset, so google-adk is pinned in the
+    agent image requirements; check them again when upgrading it.
+    """
+
+    def __init__(self, *, manifest: ToolManifest, refresh_seconds: float, **kwargs: Any):
+        """Initialize a toolset backed by a manifest.
+
+        Args:
+            manifest (ToolManifest): Manifest shared by the toolsets of the agent.
+            refresh_seconds (float): Time a tool list is used before it is
+                listed again.
+            **kwargs: Arguments of MCPToolset.
+        """
+        super().__init__(tool_list_cache_ttl_seconds=refresh_seconds, **kwargs)
+        self._manifest = manifest
+        self._url = self._connection_params.url
+        self._refresh: Optional[asyncio.Task] = None
+
+    def _read_tool_list_cache(self, cache_key: Optional[str]) -> Optional[List[Tool]]:
+        tools = super()._read_tool_list_cache(cache_key)
+        # Only the tools seen without per-request headers are shared through the manifest
+        if tools is not None or cache_key != self._tool_list_cache_key({}):
+            return tools
+        tools = self._manifest.tools(self._url)
+        if tools is not None and (self._refresh is None or self._refresh.done()):
+            self._refresh = asyncio.create_task(self._refresh_tools(cache_key))
+        return tools
+
+    def _write_tool_list_cache(self, cache_key: Optional[str], mcp_tools: List[Tool]) -> None:
+        super()._write_tool_list_cache(cache_key, mcp_tools)
+        if cache_key is not None and cache_key == self._tool_list_cache_key({}):
+            self._manifest.save(self._url, mcp_tools)
+
+    async def _refresh_tools(self, cache_key: str) -> None:
+        try:
+            result = await self._execute_with_session(
+                lambda session: session.list_tools(),
+                "Failed to refresh the tools of the MCP server",
+                headers={},
+            )
+        except Exception as e:
+            # The manifest keeps serving, the next expiry tries again
+            logger.warning(f"Could not refresh the tools of {self._url}: {e}")
+            return
+        self._write_tool_list_cache(cache_key, result.tools)
+        logger.info(f"Refreshed {len(result.tools)} tools of {self._url}")
+
+    async def close(self) -> None:
+        if self._refresh is not None:
+            self._refresh.cancel()
+        await super().close()
+
+
+def attach_tool_manifest(agent: Agent, cache_dir: str, config: Optional[Dict[str, Any]]) -> None:
+    """Serve the MCP tool lists of an agent from a manifest in a cache directory.
+
+    Streamable HTTP MCP toolsets are rebuilt as ManifestMCPToolset instances
+    with the same connection parameters, so this runs after the connection pool
+    is attached.
+
+    Args:
+        agent (Agent): Agent created by AgentA2AGenerator.
+        cache_dir (str): Directory of the manifest file.
+        config (Optional[Dict[str, Any]]): The `tool_manifest` runtime settings,
+            with the optional `enabled` and `refresh_seconds` keys.
+    """
+    config = config or {}
+    if not config.get("enabled", True):
+        return
+
+    manifest = ToolManifest(os.path.join(cache_dir, MANIFEST_FILE))
+    for index, tool in enumerate(agent.tools):
+        if isinstance(tool, MCPToolset) and isinstance(tool._connection_params, StreamableHTTPConnectionParams):
+            agent.tools[index] = ManifestMCPToolset(
+                manifest=manifest,
+                refresh_seconds=config.get("refresh_seconds", 300),
+                connection_params=tool._connection_params,
+            )
+
+    logger.info(f"MCP tool manifest of {agent.name} at {manifest.path}")
@@ -0,0 +1,141 @@
+"""Per-tool metrics and spans of the MCP servers, metrics served on /metrics next to /mcp."""
+
+import functools
+import time
+from typing import Any, Callable, Dict, Sized
+
+from mcp.server.fastmcp import FastMCP
+from mcp.types import CallToolRequest, CallToolResult, TextContent
+from opentelemetry import trace
+
+from agent_common.metrics import REGISTRY, metrics_endpoint
+from agent_common.tracing import TRACER, extract_context, tracing_enabled
+
+TOOL_CALLS = REGISTRY.counter("mcp_tool_calls_total", "MCP tool calls", ("tool",))
+TOOL_ERRORS = REGISTRY.counter(
+    "mcp_tool_errors_total",
+    "MCP tool calls that raised or returned an error",
+    ("tool", "kind"),
+)
+TOOL_DURATION = REGISTRY.histogram(
+    "mcp_tool_duration_seconds",
+    "Time spent in MCP tool functions",
+    ("tool",),
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+TOOL_RESPONSE_SIZE = REGISTRY.histogram(
+    "mcp_tool_response_characters",
+    "Length of the text content returned by MCP tool calls",
+    ("tool",),
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+STORE_RECORDS = REGISTRY.gauge("mcp_store_records", "Records in the MCP server stores", ("store",))
+
+
+def _timed(name: str, fn: Callable[..., Any], is_async: bool) -> Callable[..., Any]:
+    # Metrics of the tool are looked up once here, so a call only pays for
+    # two clock reads and a few list updates
+    calls = TOOL_CALLS.labels(tool=name)
+    error_results = TOOL_ERRORS.labels(tool=name, kind="error_result")
+    exceptions = TOOL_ERRORS.labels(tool=name, kind="exception")
+    duration = TOOL_DURATION.labels(tool=name)
+    clock = time.perf_counter
+
+    if is_async:
+
+        @functools.wraps(fn)
+        async def timed_async(*args, **kwargs):
+            started = clock()
+            try:
+                result = await fn(*args, **kwargs)
+            except BaseException:
+                exceptions.inc()
+                raise
+            finally:
+                duration.observe(clock() - started)
+                calls.inc()
+            if result.__class__ is dict and "error" in result:
+                error_results.inc()
+            return result
+
+        return timed_async
+
+    @functools.wraps(fn)
+    def timed(*args, **kwargs):
+        started = clock()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException:
+            exceptions.inc()
+            raise
+        finally:
+            duration.observe(clock() - started)
+            calls.inc()
+        if result.__class__ is dict and "error" in result:
+            error_results.inc()
+        return result
+
+    return timed
+
+
+def instrument_tools(mcp: FastMCP, stores: Dict[str, Sized]) -> None:
+    """Record metrics of every tool registered on a server and serve them on /metrics.
+
+    Calls, errors and the time spent in each tool function are recorded on
+    every call. The length of the text content of every response is recorded
+    once FastMCP has serialized it, and the size of every store is read when
+    the metrics are scraped. When tracing is enabled, every call is also
+    recorded as a span joining the trace of the caller. Call this after the
+    last `@mcp.tool()` and after setup_tracing.
+
+    Errors are counted by kind: `exception` when the tool raised, and
+    `error_result` when it returned a dict with an `error` key.
+
+    Args:
+        mcp (FastMCP): The server whose tools are instrumented.
+        stores (Dict[str, Sized]): Stores of the server by name, e.g. {"cases": CASES_DB}.
+    """
+    for tool in mcp._tool_manager.list_tools():
+        tool.fn = _timed(tool.name, tool.fn, tool.is_async)
+
+    handlers = mcp._mcp_server.request_handlers
+    call_tool = handlers[CallToolRequest]
+    sizes = {}
+
+    async def call_tool_with_size(request: CallToolRequest):
+        response = await call_tool(request)
+        result = response.root
+        if isinstance(result, CallToolResult):
+            name = request.params.name
+            size = sizes.get(name)
+            if size is None:
+                size = sizes[name] = TOOL_RESPONSE_SIZE.labels(tool=name)
+            characters = sum(
+                len(block.text) for block in result.content if isinstance(block, TextContent)
+            )
+            size.observe(characters)
+            span = trace.get_current_span()
+            span.set_attribute("mcp.response.characters", characters)
+            if result.isError:
+                span.set_status(trace.StatusCode.ERROR)
+        return response
+
+    async def traced_call_tool(request: CallToolRequest):
+        # The caller sends its trace context in the _meta of the request
+        meta = request.params.meta
+        with TRACER.start_as_current_span(
+            f"tools/call {request.params.name}",
+            context=extract_context(meta.model_dump(exclude_none=True) if meta else None),
+            kind=trace.SpanKind.SERVER,
+            attributes={"mcp.tool.name": request.params.name},
+        ):
+            return await call_tool_with_size(request)
+
+    handlers[CallToolRequest] = traced_call_tool if tracing_enabled() else call_tool_with_size
+
+    def collect_store_sizes() -> None:
+        for store, records in stores.items():
+            STORE_RECORDS.set(len(records), store=store)
+
+    REGISTRY.add_collector(collect_store_sizes)
+    mcp.custom_route("/metrics", methods=["GET"])(metrics_endpoint)
@@ -0,0 +1,186 @@
+"""OpenTelemetry tracing of the agents and MCP servers, exported to Phoenix.
+
+Trace context travels in the W3C `traceparent` header of A2A requests and in
+the `_meta` of MCP tool calls, so the spans of one investigation, from the
+manager down to the store operations of the MCP servers, form a single trace.
+"""
+
+import functools
+import logging
+import os
+from typing import Any, Callable, Dict, Mapping, Optional
+
+import httpx
+from opentelemetry import propagate, trace
+from opentelemetry.context import Context
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Shared with the MCP servers, which do not have aigency
+logger = logging.getLogger(__name__)
+
+TRACER = trace.get_tracer("detective_aigency")
+
+# ADK records prompts and model answers in its spans unless told otherwise
+CAPTURE_CONTENT_ENV = "ADK_CAPTURE_MESSAGE_CONTENT_IN_SPANS"
+
+_enabled = False
+
+
+def tracing_enabled() -> bool:
+    """Tell whether spans of this process are exported."""
+    return _enabled
+
+
+def setup_tracing(config: Dict[str, Any]) -> bool:
+    """Export the spans of this process over OTLP/HTTP.
+
+    Tracing stays disabled, and spans cost next to nothing, when no endpoint is
+    set, when `enabled` is false or when the OTLP exporter is not installed.
+
+    Args:
+        config (Dict[str, Any]): Settings with the keys `endpoint` (OTLP traces
+            URL, e.g. http://phoenix:6006/v1/traces), `service_name`, and the
+            optional `enabled`, `sample_ratio` and `capture_content`.
+
+    Returns:
+        bool: Whether tracing was enabled.
+    """
+    global _enabled
+
+    if _enabled or not config.get("endpoint") or not config.get("enabled", True):
+        return _enabled
+
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    except ImportError:
+        logger.warning("opentelemetry-exporter-otlp-proto-http is not installed, tracing disabled")
+        return False
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    os.environ.setdefault(CAPTURE_CONTENT_ENV, str(bool(config.get("capture_content", False))).lower())
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": config.get("service_name", "unknown")}),
+        # Remote parents decide, so a trace is either complete or absent
+        sampler=ParentBased(TraceIdRatioBased(float(config.get("sample_ratio", 1.0)))),
+    )
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=config["endpoint"])))
+    trace.set_tracer_provider(provider)
+    _enabled = True
+    logger.info(f"Exporting traces of {config.get('service_name')} to {config['endpoint']}")
+    return True
+
+
+def env_tracing_config() -> Dict[str, Any]:
+    """Read the tracing settings of a process from environment variables.
+
+    Returns:
+        Dict[str, Any]: Settings for setup_tracing, from
+            OTEL_EXPORTER_OTLP_TRACES_ENDPOINT, OTEL_SERVICE_NAME and
+            OTEL_TRACES_SAMPLER_ARG.
+    """
+    return {
+        "endpoint": os.getenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT"),
+        "service_name": os.getenv("OTEL_SERVICE_NAME", "unknown"),
+        "sample_ratio": float(os.getenv("OTEL_TRACES_SAMPLER_ARG", "1.0")),
+    }
+
+
+def agent_tracing_config(service_name: str, observability: Any, runtime_config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the tracing settings of an agent.
+
+    Args:
+        service_name (str): Name of the agent.
+        observability (Any): The `observability` section parsed by aigency,
+            whose Phoenix host and port receive the spans.
+        runtime_config (Optional[Dict[str, Any]]): The `tracing` runtime
+            settings, with the optional `enabled`, `sample_ratio` and
+            `capture_content` keys.
+
+    Returns:
+        Dict[str, Any]: Settings for setup_tracing.
+    """
+    config = {"service_name": service_name, **(runtime_config or {})}
+    phoenix = getattr(getattr(observability, "monitoring", None), "phoenix", None)
+    if phoenix is not None:
+        config.setdefault("endpoint", f"http://{phoenix.host}:{phoenix.port}/v1/traces")
+    return config
+
+
+def traced(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator recording every call of a function as a span.
+
+    The function is returned unchanged when tracing is not enabled at the time
+    it is decorated, so hot internal functions cost nothing without tracing.
+
+    Args:
+        name (str): Name of the spans.
+
+    Returns:
+        Callable: The decorator.
+    """
+
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        if not _enabled:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with TRACER.start_as_current_span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+async def inject_trace_context(request: httpx.Request) -> None:
+    """httpx request hook sending the current trace context with a request."""
+    propagate.inject(request.headers)
+
+
+def extract_context(carrier: Optional[Mapping[str, Any]]) -> Context:
+    """Return the trace context sent by a caller in headers or MCP `_meta`."""
+    return propagate.extract({key: str(value) for key, value in (carrier or {}).items()})
+
+
+class TracingMiddleware:
+    """ASGI middleware starting a server span, child of the caller's, for every POST request.
+
+    The span is current while the request is processed, so the agent execution
+    and everything it calls are recorded under it. Inner middlewares add their
+    own attributes to it, such as the time spent waiting for admission.
+    """
+
+    def __init__(self, app: ASGIApp, service_name: str):
+        self.app = app
+        self.service_name = service_name
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or not _enabled:
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope.get("headers") or []}
+        status = {}
+
+        async def send_with_status(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        with TRACER.start_as_current_span(
+            f"A2A {self.service_name}",
+            context=extract_context(headers),
+            kind=trace.SpanKind.SERVER,
+            attributes={
+                "http.request.method": "POST",
+                "url.path": scope["path"],
+                "a2a.client_id": headers.get("x-client-id", ""),
+            },
+        ) as span:
+            await self.app(scope, receive, send_with_status)
+            if "code" in status:
+                span.set_attribute("http.response.status_code", status["code"])
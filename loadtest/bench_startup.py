@@ -0,0 +1,244 @@
+"""Startup-time benchmark of the three agents.
+
+Starts every agent from its entry point several times and measures, from the
+moment the process is spawned, when it serves its agent card and when its
+first message/send request completes. That request is sent as soon as the card
+is served and waits until the agent is built. It is answered by the scripted
+stand-in model of the load test, without latency, and the manager's goes
+through a sub-agent and its MCP server. The first run of every agent starts
+with an empty startup cache (cold cache), the following ones reuse the cache
+written by the previous run (warm cache). The MCP servers are started once,
+and the sub-agents before the manager, which reads their cards while it is
+built.
+
+Usage:
+    python loadtest/bench_startup.py --runs 5 --output startup.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import statistics
+import subprocess
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+from run import (
+    AGENT_DIR,
+    MANAGER,
+    MCP_SERVERS,
+    SUB_AGENTS,
+    assign_ports,
+    serve_in_process,
+    start_process,
+    wait_ready,
+    write_agent_config,
+)
+from stub_model import ScriptedModel, build_app
+
+CARD_PATH = "/.well-known/agent-card.json"
+
+# Message sent to every agent; each one answers it with a tool call
+MESSAGES = {
+    "case_agent": "What is the status of CASE-003?",
+    "informant_agent": "Find informants specialized in drug trafficking",
+    MANAGER: "What is the status of CASE-003?",
+}
+
+
+async def wait_for(client: httpx.AsyncClient, url: str, process: subprocess.Popen, timeout: float) -> float:
+    """Poll a URL until it answers 200 and return the monotonic time it did.
+
+    Raises:
+        RuntimeError: If the process exits or the URL does not answer in time.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"The process serving {url} exited with status {process.returncode}")
+        try:
+            if (await client.get(url)).status_code == 200:
+                return time.monotonic()
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.01)
+    raise RuntimeError(f"{url} did not answer within {timeout}s")
+
+
+async def send_until_completed(
+    client: httpx.AsyncClient, url: str, text: str, process: subprocess.Popen, timeout: float
+) -> float:
+    """Send message/send requests until one completes and return the monotonic time it did.
+
+    Raises:
+        RuntimeError: If the process exits or no request completes in time.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"The process serving {url} exited with status {process.returncode}")
+        payload = {
+            "jsonrpc": "2.0",
+            "id": uuid.uuid4().hex,
+            "method": "message/send",
+            "params": {
+                "message": {
+                    "role": "user",
+                    "parts": [{"kind": "text", "text": text}],
+                    "messageId": uuid.uuid4().hex,
+                }
+            },
+        }
+        try:
+            response = await client.post(url, json=payload)
+            result = response.json().get("result") or {}
+            if (result.get("status") or {}).get("state") == "completed":
+                return time.monotonic()
+        except (httpx.HTTPError, ValueError):
+            pass
+        await asyncio.sleep(0.01)
+    raise RuntimeError(f"No message/send to {url} completed within {timeout}s")
+
+
+async def start_agent(
+    name: str, source: str, env: Dict[str, str], port: int, log_dir: str, timeout: float
+) -> Tuple[subprocess.Popen, Dict[str, float]]:
+    """Start an agent and time its card and its first answered message from the spawn."""
+    started = time.monotonic()
+    process, _ = start_process(name, f"{source}/__main__.py", env, log_dir)
+    base = f"http://127.0.0.1:{port}"
+    async with httpx.AsyncClient(timeout=2) as client:
+        card = await wait_for(client, base + CARD_PATH, process, timeout)
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        message = await send_until_completed(client, base + "/", MESSAGES[name], process, timeout)
+    return process, {"card_seconds": card - started, "first_message_seconds": message - started}
+
+
+def stop(processes: List[subprocess.Popen]) -> None:
+    """Interrupt the processes and wait for them to exit."""
+    for process in processes:
+        process.send_signal(signal.SIGINT)
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+async def bench(args: argparse.Namespace) -> Dict[str, Any]:
+    """Start the agents `args.runs` times and collect their startup times."""
+    ports = assign_ports(args.base_port)
+    # No proxies here: the agents reach the sub-agents and MCP servers directly
+    for name in [*SUB_AGENTS, *MCP_SERVERS]:
+        ports[name + "_proxy"] = ports[name]
+    out_dir = args.work_dir or tempfile.mkdtemp(prefix="bench-startup-")
+    os.makedirs(out_dir, exist_ok=True)
+
+    model, model_task = await serve_in_process(build_app(ScriptedModel(latency_ms=0, jitter_ms=0)), ports["model"])
+    base_env = {
+        **os.environ,
+        "PYTHONPATH": AGENT_DIR,
+        "GOOGLE_GENAI_USE_VERTEXAI": "FALSE",
+        "GOOGLE_API_KEY": "bench",
+        "GEMINI_API_KEY": "bench",
+        "GOOGLE_GEMINI_BASE_URL": f"http://127.0.0.1:{ports['model']}",
+        "LOG_LEVEL": "WARNING",
+        "INFORMANT_SERVER_URL": f"http://127.0.0.1:{ports['informant_mcp']}",
+    }
+
+    agents = [(name, source) for name, (source, _) in SUB_AGENTS.items()] + [(MANAGER, "agent/" + MANAGER)]
+    envs = {}
+    for name, source in agents:
+        cache_dir = os.path.join(out_dir, name, "cache")
+        envs[name] = {
+            **base_env,
+            "PORT": str(ports[name]),
+            "AGENT_CONFIG_PATH": write_agent_config(name, source, out_dir, ports),
+            "AGENT_CACHE_DIR": cache_dir,
+        }
+        if os.path.isdir(cache_dir):
+            for file in os.listdir(cache_dir):
+                os.remove(os.path.join(cache_dir, file))
+
+    samples: Dict[str, Dict[str, List[float]]] = {name: {} for name, _ in agents}
+    servers = []
+    try:
+        for name, script in MCP_SERVERS.items():
+            env = {**base_env, "PORT": str(ports[name])}
+            env.pop("INFORMANT_DATA_DIR", None)
+            process, log_path = start_process(name, script, env, out_dir)
+            servers.append(process)
+            await wait_ready(f"http://127.0.0.1:{ports[name]}/mcp", process, log_path)
+
+        for run in range(args.runs):
+            mode = "cold_cache" if run == 0 else "warm_cache"
+            processes = []
+            try:
+                for name, source in agents:
+                    process, times = await start_agent(name, source, envs[name], ports[name], out_dir, args.timeout)
+                    processes.append(process)
+                    for metric, seconds in times.items():
+                        samples[name].setdefault(f"{mode}_{metric}", []).append(seconds)
+            finally:
+                stop(processes)
+    finally:
+        stop(servers)
+        model.should_exit = True
+        await model_task
+
+    return {
+        "config": vars(args),
+        "agents": {
+            name: {
+                metric: {
+                    "median": round(statistics.median(values), 3),
+                    "min": round(min(values), 3),
+                    "max": round(max(values), 3),
+                    "runs": len(values),
+                }
+                for metric, values in metrics.items()
+            }
+            for name, metrics in samples.items()
+        },
+        "work_dir": out_dir,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Print the median startup times of every agent."""
+    columns = [
+        "cold_cache_card_seconds",
+        "cold_cache_first_message_seconds",
+        "warm_cache_card_seconds",
+        "warm_cache_first_message_seconds",
+    ]
+    print(f"{'agent':<26}" + "".join(f"{column.replace('_seconds', ''):>28}" for column in columns))
+    for name, metrics in report["agents"].items():
+        cells = [metrics.get(column, {}).get("median") for column in columns]
+        print(f"{name:<26}" + "".join(f"{'-' if cell is None else f'{cell:.3f}s':>28}" for cell in cells))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="starts of every agent, the first with an empty cache")
+    parser.add_argument("--timeout", type=float, default=90.0, help="seconds an agent has to start")
+    parser.add_argument("--base-port", type=int, default=18180, help="first of the 10 ports used")
+    parser.add_argument("--work-dir", help="directory for configs, caches and logs (default: a temporary one)")
+    parser.add_argument("--output", help="write the report as JSON to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(bench(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,540 @@
+"""Microbenchmarks of every MCP tool of the case and informant servers.
+
+Each server is loaded with a synthetic dataset from datagen.py. Every tool
+registered with `@mcp.tool()` is then timed twice: called directly as a
+Python function in this process, and called through an MCP client over the
+streamable-http transport against the server running in a subprocess. Both
+modes send the same seeded sequence of arguments. The case tools that call the
+informant server get one with the same dataset, started for the run unless
+INFORMANT_SERVER_URL is set.
+
+Tools with a `response_format` parameter are also called through the MCP
+server in process with each format, to compare the time to build and encode
+their results and the size of the results sent to the client.
+
+Results are written as JSON and can be compared with a saved baseline; the
+command exits with status 1 when a tool got slower than the threshold.
+
+Usage:
+    python loadtest/bench_tools.py --size 100000 --output bench.json
+    python loadtest/bench_tools.py --size 100000 --baseline bench.json --threshold 0.2
+"""
+
+import argparse
+import asyncio
+import contextlib
+import datetime
+import functools
+import importlib.util
+import inspect
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVERS = {
+    "case": os.path.join(ROOT, "mcp", "mcp_case_management", "server.py"),
+    "informant": os.path.join(ROOT, "mcp", "mcp_informant_management", "server.py"),
+}
+
+# Day the dataset and the arguments are relative to, fixed for the whole run
+TODAY = datetime.date.today()
+
+
+def load_server(name: str, size: int, seed: int) -> Any:
+    """Import a server module and add the synthetic dataset to its stores.
+
+    The informant server keeps its data in memory: INFORMANT_DATA_DIR is
+    ignored so the benchmark never writes to a real data directory.
+
+    Returns:
+        Any: The server module.
+    """
+    import datagen
+
+    os.environ.pop("INFORMANT_DATA_DIR", None)
+    path = SERVERS[name]
+    sys.path.insert(0, os.path.dirname(path))
+    sys.path.insert(0, os.path.join(ROOT, "agent"))
+    spec = importlib.util.spec_from_file_location(f"{name}_server", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    populate = datagen.populate_case_server if name == "case" else datagen.populate_informant_server
+    populate(module, size, seed, TODAY)
+    return module
+
+
+class ArgumentFactory:
+    """Seeded arguments for every tool, valid against the synthetic dataset.
+
+    Arguments depend only on the seed, the tool and the iteration, so the
+    direct and streamable-http runs send the same calls.
+    """
+
+    def __init__(self, size: int, seed: int):
+        import datagen
+
+        self.datagen = datagen
+        self.seed = seed
+        case_sizes = datagen.table_sizes(datagen.CASE_TABLES, size)
+        informant_sizes = datagen.table_sizes(datagen.INFORMANT_TABLES, size)
+        self.cases = case_sizes["cases"]
+        # Every case has at least one item of evidence
+        self.evidence = case_sizes["cases"]
+        self.informants = informant_sizes["informants"]
+        self.information = informant_sizes["information"]
+
+    def _id(self, prefix: str, count: int, rng: random.Random) -> str:
+        return f"{prefix}-{self.datagen.FIRST_ID + rng.randrange(count):03d}"
+
+    def _future_day(self, days: int) -> str:
+        # Past the generated schedule, so bookings never meet a generated meeting
+        return (TODAY + datetime.timedelta(days=self.datagen.SCHEDULE_HORIZON_DAYS + days)).strftime("%Y-%m-%d")
+
+    def _free_slot(self, iteration: int) -> Dict[str, str]:
+        # One slot per iteration, so every booking succeeds
+        times = self.datagen.MEETING_TIMES
+        return {"date": self._future_day(1 + iteration // len(times)), "time": times[iteration % len(times)]}
+
+    def arguments(self, tool: str, iteration: int) -> Dict[str, Any]:
+        """Return the arguments of one call of a tool.
+
+        Raises:
+            KeyError: If the tool has no arguments defined here.
+        """
+        rng = random.Random(f"{self.seed}|{tool}|{iteration}")
+        d = self.datagen
+        builders: Dict[str, Callable[[], Dict[str, Any]]] = {
+            # Case management
+            "get_case_details": lambda: {"case_id": self._id("CASE", self.cases, rng)},
+            "search_cases_by_type": lambda: {"case_type": rng.choice(list(d.CASE_TYPES))},
+            "search_cases_by_status": lambda: {"status": rng.choice(list(d.CASE_STATUSES))},
+            "get_evidence_details": lambda: {"evidence_id": self._id("EVID", self.evidence, rng)},
+            "analyze_evidence": lambda: {
+                "evidence_id": self._id("EVID", self.evidence, rng),
+                "analysis_type": rng.choice(["forensic", "digital", "financial", "psychological"]),
+            },
+            "create_case_report": lambda: {
+                "case_id": self._id("CASE", self.cases, rng),
+                "findings": "Suspect identified through fingerprints",
+                "recommendations": "Request an arrest warrant",
+            },
+            "get_case_status": lambda: {"case_id": self._id("CASE", self.cases, rng)},
+            "get_case_dossier": lambda: {"case_id": self._id("CASE", self.cases, rng)},
+            "find_informants_near": lambda: {
+                "case_id": self._id("CASE", self.cases, rng),
+                "radius_km": rng.choice([0.5, 1.0, 2.0]),
+            },
+            "update_case_status": lambda: {
+                "case_id": self._id("CASE", self.cases, rng),
+                "new_status": rng.choice(list(d.CASE_STATUSES)),
+                "notes": "Status reviewed",
+            },
+            # Informant management
+            "register_new_informant": lambda: {
+                "code_name": f"Bench {self.seed}-{iteration}",
+                "specialty": rng.choice(list(d.SPECIALTIES)),
+                "reliability_level": rng.choice(list(d.RELIABILITY_LEVELS)),
+                "contact_method": rng.choice(list(d.CONTACT_METHODS)),
+            },
+            "schedule_informant_meeting": lambda: {
+                "informant_id": self._id("INF", self.informants, rng),
+                **self._free_slot(iteration),
+                "location": rng.choice(d.SAFE_LOCATIONS),
+                "purpose": "Routine check-in",
+            },
+            "check_meeting_availability": lambda: {
+                "date": (TODAY + datetime.timedelta(days=rng.randint(1, d.SCHEDULE_HORIZON_DAYS))).strftime("%Y-%m-%d"),
+                "time": rng.choice(d.MEETING_TIMES),
+                "location": rng.choice(d.SAFE_LOCATIONS),
+            },
+            "schedule_meetings_batch": lambda: {
+                "requests": [
+                    {"informant_id": self._id("INF", self.informants, rng), "purpose": "Routine check-in"}
+                    for _ in range(10)
+                ],
+                # A window of its own per batch, after the single bookings
+                "date_window": {
+                    "start": self._future_day(10000 + iteration * 31),
+                    "end": self._future_day(10000 + iteration * 31 + 30),
+                },
+            },
+            "find_informants_by_specialty": lambda: {"specialty": rng.choice(list(d.SPECIALTIES))},
+            "get_informant_profile": lambda: {"informant_id": self._id("INF", self.informants, rng)},
+            "nearest_safe_locations": lambda: {
+                "point": rng.choice(
+                    [
+                        self._id("INF", self.informants, rng),
+                        {"x": round(rng.uniform(-6, 6), 2), "y": round(rng.uniform(-6, 6), 2)},
+                    ]
+                ),
+                "k": rng.randint(1, 3),
+            },
+            "get_informants_by_reliability": lambda: {
+                "reliability_level": rng.choice(list(d.RELIABILITY_LEVELS))
+            },
+            "record_information_received": lambda: {
+                "informant_id": self._id("INF", self.informants, rng),
+                "information_type": rng.choice(list(d.INFORMATION_TYPES)),
+                "content": rng.choice(d.TIP_TEMPLATES["criminal_activity"]).format(
+                    topic=rng.choice(d.TOPICS), place=rng.choice(d.PLACES),
+                    weekday=rng.choice(d.WEEKDAYS), district=rng.choice(d.DISTRICTS),
+                ),
+                "credibility": rng.choice(list(d.CREDIBILITY)),
+                "case_related": self._id("CASE", self.cases, rng),
+            },
+            "get_information_cluster": lambda: {"cluster_id": self._id("INFO", self.information, rng)},
+            "assess_information_credibility": lambda: {
+                "information_id": self._id("INFO", self.information, rng),
+                "verification_method": rng.choice(
+                    ["cross_sources", "physical_verification", "technical_analysis"]
+                ),
+            },
+            "update_informant_reliability": lambda: {
+                "informant_id": self._id("INF", self.informants, rng),
+                "new_level": rng.choice(list(d.RELIABILITY_LEVELS)),
+                "reason": "Periodic review",
+            },
+            "get_informant_history": lambda: {"informant_id": self._id("INF", self.informants, rng)},
+            "get_network_statistics": lambda: {},
+            "get_effectiveness": lambda: {
+                "window_days": rng.choice([7, 30, 90]),
+                "group_by": rng.choice(["informant", "specialty", "network"]),
+            },
+            "get_active_informants_count": lambda: {},
+            "get_case_intelligence": lambda: {"case_id": self._id("CASE", self.cases, rng)},
+        }
+        return builders[tool]()
+
+
+def summarize(samples: List[float], errors: int) -> Dict[str, float]:
+    """Compute the statistics of the latencies of one tool, in microseconds."""
+    values = sorted(seconds * 1e6 for seconds in samples)
+
+    def percentile(q: float) -> float:
+        return round(values[min(int(q * len(values)), len(values) - 1)], 1)
+
+    return {
+        "iterations": len(values),
+        "errors": errors,
+        "mean_us": round(statistics.fmean(values), 1),
+        "stdev_us": round(statistics.pstdev(values), 1),
+        "min_us": round(values[0], 1),
+        "p50_us": percentile(0.50),
+        "p95_us": percentile(0.95),
+        "p99_us": percentile(0.99),
+        "ops_per_second": round(len(values) / (sum(values) / 1e6), 1) if sum(values) else 0.0,
+    }
+
+
+def _is_error(result: Any) -> bool:
+    return isinstance(result, dict) and "error" in result
+
+
+async def tool_names(module: Any) -> List[str]:
+    """Return the names of the tools registered on a server, in registration order."""
+    return [tool.name for tool in await module.mcp.list_tools()]
+
+
+def bench_direct(
+    module: Any, tools: List[str], factory: ArgumentFactory, iterations: int, warmup: int
+) -> Dict[str, Dict[str, float]]:
+    """Time every tool called as a plain function, async tools on an event loop of their own."""
+    results = {}
+    loop = asyncio.new_event_loop()
+    for tool in tools:
+        function = getattr(module, tool)
+        if inspect.iscoroutinefunction(function):
+            function = functools.partial(_run_on, loop, function)
+        for iteration in range(warmup):
+            function(**factory.arguments(tool, iteration))
+        samples, errors = [], 0
+        for iteration in range(warmup, warmup + iterations):
+            arguments = factory.arguments(tool, iteration)
+            started = time.perf_counter()
+            result = function(**arguments)
+            samples.append(time.perf_counter() - started)
+            errors += _is_error(result)
+        results[tool] = summarize(samples, errors)
+    loop.close()
+    return results
+
+
+def _run_on(loop: asyncio.AbstractEventLoop, function: Callable[..., Any], **kwargs: Any) -> Any:
+    return loop.run_until_complete(function(**kwargs))
+
+
+async def bench_http(
+    url: str, tools: List[str], factory: ArgumentFactory, iterations: int, warmup: int
+) -> Dict[str, Dict[str, float]]:
+    """Time every tool called through an MCP client session over streamable-http."""
+    from mcp import ClientSession
+    from mcp.client.streamable_http import streamablehttp_client
+
+    results = {}
+    async with streamablehttp_client(url) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            for tool in tools:
+                for iteration in range(warmup):
+                    await session.call_tool(tool, factory.arguments(tool, iteration))
+                samples, errors = [], 0
+                for iteration in range(warmup, warmup + iterations):
+                    arguments = factory.arguments(tool, iteration)
+                    started = time.perf_counter()
+                    result = await session.call_tool(tool, arguments)
+                    samples.append(time.perf_counter() - started)
+                    errors += result.isError or _is_error(result.structuredContent)
+                results[tool] = summarize(samples, errors)
+    return results
+
+
+async def bench_formats(
+    module: Any, tools: List[str], factory: ArgumentFactory, iterations: int, warmup: int
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Compare the response formats of the tools that have several.
+
+    Every call goes through the MCP server in process, so the timing includes
+    the validation of the structured result and its encoding as text, and the
+    size is the one of the tool result sent over the transport.
+
+    Returns:
+        Dict[str, Dict[str, Dict[str, float]]]: By tool and format, the
+            latency statistics and the mean result size in bytes.
+    """
+    from mcp.types import CallToolResult
+
+    from agent_common.tabular import RESPONSE_FORMATS
+
+    results = {}
+    for tool in tools:
+        if "response_format" not in inspect.signature(getattr(module, tool)).parameters:
+            continue
+        results[tool] = {}
+        for response_format in RESPONSE_FORMATS:
+            for iteration in range(warmup):
+                arguments = {**factory.arguments(tool, iteration), "response_format": response_format}
+                await module.mcp.call_tool(tool, arguments)
+            samples, errors, sizes = [], 0, []
+            for iteration in range(warmup, warmup + iterations):
+                arguments = {**factory.arguments(tool, iteration), "response_format": response_format}
+                started = time.perf_counter()
+                content, structured = await module.mcp.call_tool(tool, arguments)
+                samples.append(time.perf_counter() - started)
+                errors += _is_error(structured.get("result", structured))
+                result = CallToolResult(content=content, structuredContent=structured)
+                sizes.append(len(result.model_dump_json(by_alias=True, exclude_none=True)))
+            stats = summarize(samples, errors)
+            stats["mean_bytes"] = round(statistics.fmean(sizes))
+            results[tool][response_format] = stats
+    return results
+
+
+async def wait_ready(url: str, process: subprocess.Popen, timeout: float = 600) -> None:
+    """Wait until the server subprocess answers HTTP requests.
+
+    Raises:
+        RuntimeError: If the process exits or does not answer in time.
+    """
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(timeout=2) as client:
+        while time.monotonic() < deadline and process.poll() is None:
+            try:
+                await client.get(url)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start")
+
+
+def run_server(name: str, size: int, seed: int, port: int) -> None:
+    """Serve a server loaded with the synthetic dataset over streamable-http."""
+    module = load_server(name, size, seed)
+    module.mcp.settings.host = "127.0.0.1"
+    module.mcp.settings.port = port
+    module.mcp.run(transport="streamable-http")
+
+
+@contextlib.contextmanager
+def serve(name: str, args: argparse.Namespace, port: int) -> Iterator[str]:
+    """Run a server loaded with the synthetic dataset in a subprocess.
+
+    Yields:
+        str: Base URL of the server, once it answers.
+    """
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve", name,
+         "--size", str(args.size), "--seed", str(args.seed), "--port", str(port)],
+        env={**os.environ, "LOG_LEVEL": args.log_level},
+    )
+    try:
+        url = f"http://127.0.0.1:{port}"
+        asyncio.run(wait_ready(f"{url}/mcp", process))
+        yield url
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def bench_server(name: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Benchmark every tool of one server in both modes.
+
+    The case server calls the informant server for `get_case_dossier`, and
+    `find_informants_near` synchronizes its replica of the informant locations
+    from it. Unless INFORMANT_SERVER_URL is set, an informant
+    server with the same dataset is started for it, so both modes time the
+    whole call and not an early error.
+    """
+    with contextlib.ExitStack() as stack:
+        if name == "case" and not os.environ.get("INFORMANT_SERVER_URL"):
+            os.environ["INFORMANT_SERVER_URL"] = stack.enter_context(serve("informant", args, args.port + 2))
+            stack.callback(os.environ.pop, "INFORMANT_SERVER_URL", None)
+
+        factory = ArgumentFactory(args.size, args.seed)
+        started = time.perf_counter()
+        module = load_server(name, args.size, args.seed)
+        load_seconds = time.perf_counter() - started
+        tools = asyncio.run(tool_names(module))
+        if args.tools:
+            tools = [tool for tool in tools if tool in args.tools]
+
+        result = {
+            "load_seconds": round(load_seconds, 2),
+            "direct": bench_direct(module, tools, factory, args.iterations, args.warmup),
+            "formats": asyncio.run(bench_formats(module, tools, factory, args.iterations, args.warmup)),
+        }
+        if args.transport:
+            with serve(name, args, args.port + (name == "informant")) as url:
+                result["streamable_http"] = asyncio.run(
+                    bench_http(f"{url}/mcp", tools, factory, args.iterations, args.warmup)
+                )
+    return result
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Compare the median latencies of a report with a baseline.
+
+    Returns:
+        List[Dict[str, Any]]: Every tool and mode present in both, with the
+            relative change of its p50 and whether it exceeds the threshold.
+    """
+    rows = []
+    for server, modes in report["servers"].items():
+        for mode in ("direct", "streamable_http"):
+            for tool, stats in modes.get(mode, {}).items():
+                before = baseline.get("servers", {}).get(server, {}).get(mode, {}).get(tool)
+                if not before or not before["p50_us"]:
+                    continue
+                change = stats["p50_us"] / before["p50_us"] - 1
+                rows.append(
+                    {
+                        "tool": f"{server}/{tool}",
+                        "mode": mode,
+                        "baseline_p50_us": before["p50_us"],
+                        "p50_us": stats["p50_us"],
+                        "change": round(change, 3),
+                        "regression": change > threshold,
+                    }
+                )
+    return rows
+
+
+def print_report(report: Dict[str, Any], comparison: Optional[List[Dict[str, Any]]]) -> None:
+    """Print a report, and its comparison with a baseline, as tables."""
+    for server, modes in report["servers"].items():
+        print(f"\n{server} server: {report['dataset'][server]} loaded in {modes['load_seconds']}s")
+        print(f"{'tool':34} {'mode':16} {'p50 us':>10} {'p95 us':>10} {'p99 us':>10} {'ops/s':>10} {'errors':>6}")
+        for mode in ("direct", "streamable_http"):
+            for tool, stats in modes.get(mode, {}).items():
+                print(
+                    f"{tool:34} {mode:16} {stats['p50_us']:>10} {stats['p95_us']:>10} "
+                    f"{stats['p99_us']:>10} {stats['ops_per_second']:>10} {stats['errors']:>6}"
+                )
+        if modes.get("formats"):
+            print(f"\n{'tool':34} {'format':16} {'p50 us':>10} {'p95 us':>10} {'bytes':>10} {'errors':>6}")
+            for tool, formats in modes["formats"].items():
+                for response_format, stats in formats.items():
+                    print(
+                        f"{tool:34} {response_format:16} {stats['p50_us']:>10} {stats['p95_us']:>10} "
+                        f"{stats['mean_bytes']:>10} {stats['errors']:>6}"
+                    )
+    if comparison is not None:
+        print(f"\n{'tool':44} {'mode':16} {'baseline':>10} {'now':>10} {'change':>8}")
+        for row in comparison:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(
+                f"{row['tool']:44} {row['mode']:16} {row['baseline_p50_us']:>10} "
+                f"{row['p50_us']:>10} {row['change']:>+8.1%}{flag}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=10000, help="records per server, split between its tables")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the dataset and the arguments")
+    parser.add_argument("--servers", nargs="+", choices=list(SERVERS), default=list(SERVERS))
+    parser.add_argument("--tools", nargs="+", help="only benchmark these tools")
+    parser.add_argument("--iterations", type=int, default=200, help="timed calls per tool and mode")
+    parser.add_argument("--warmup", type=int, default=20, help="untimed calls before the timed ones")
+    parser.add_argument("--no-transport", dest="transport", action="store_false",
+                        help="skip the streamable-http runs")
+    parser.add_argument("--port", type=int, default=18180, help="port of the case server, the next one for the informant server and the one after "
+                        "for the informant server the case server calls")
+    parser.add_argument("--log-level", default="WARNING",
+                        help="log level of the servers; INFO includes the cost of logging every tool call")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results to compare with")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative p50 increase reported as a regression")
+    parser.add_argument("--serve", choices=list(SERVERS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    os.environ["LOG_LEVEL"] = args.log_level
+    if args.serve:
+        run_server(args.serve, args.size, args.seed, args.port)
+        return
+
+    import datagen
+
+    report = {
+        "config": {
+            key: value for key, value in vars(args).items() if key not in ("serve", "output", "baseline")
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        },
+        "dataset": {
+            "case": datagen.table_sizes(datagen.CASE_TABLES, args.size),
+            "informant": datagen.table_sizes(datagen.INFORMANT_TABLES, args.size),
+        },
+        "servers": {name: bench_server(name, args) for name in args.servers},
+    }
+
+    comparison = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            comparison = compare(report, json.load(f), args.threshold)
+        report["comparison"] = comparison
+
+    print_report(report, comparison)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if comparison and any(row["regression"] for row in comparison):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
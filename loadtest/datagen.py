@@ -0,0 +1,630 @@
+"""Seeded synthetic data for the case and informant MCP servers.
+
+Records follow the fields and value distributions of the sample data of each
+server, at any scale from thousands to millions of records. Generated ids
+start at 1000 so they never collide with the sample records, nor with the
+3-character ids given to informants registered at runtime.
+
+Dates are relative to a reference day, today by default, so the activity
+counters and the corroboration window of the informant server see the same
+history whatever the day of the run.
+
+Usage:
+    python loadtest/datagen.py --size 1000000 --seed 0 --out data/
+"""
+
+import argparse
+import datetime
+import json
+import os
+import random
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+FIRST_ID = 1000
+
+# Share of the records of each table in a dataset of a given size
+CASE_TABLES = {"cases": 1 / 3, "evidence": 2 / 3}
+INFORMANT_TABLES = {"informants": 0.02, "meetings": 0.18, "information": 0.80}
+
+# Days of history before the reference day
+HISTORY_DAYS = 730
+# Days ahead filled with scheduled meetings, one meeting per slot at most
+SCHEDULE_HORIZON_DAYS = 90
+# Share of tips rewritten from an earlier tip, caught as near-duplicates
+NEAR_DUPLICATE_RATE = 0.05
+
+DETECTIVES = [
+    "Detective García",
+    "Detective Martínez",
+    "Detective Ruiz",
+    "Detective López",
+    "Detective Fernández",
+    "Detective Sánchez",
+    "Detective Romero",
+    "Detective Navarro",
+]
+
+CASE_TYPES = {"theft": 0.35, "fraud": 0.25, "disappearance": 0.15, "homicide": 0.10, "assault": 0.15}
+CASE_STATUSES = {"open": 0.35, "under_investigation": 0.30, "closed": 0.25, "archived": 0.10}
+PRIORITIES = {"low": 0.15, "medium": 0.35, "high": 0.35, "critical": 0.15}
+
+CASE_TITLES = {
+    "theft": ["{place} Robbery", "Burglary at {place}", "{place} Jewelry Theft"],
+    "fraud": ["{company} Corporate Fraud", "{company} Embezzlement", "Invoice Fraud at {company}"],
+    "disappearance": ["{person} Disappearance", "Missing Person: {person}"],
+    "homicide": ["{person} Homicide", "Death at {place}"],
+    "assault": ["Assault near {place}", "{person} Assault"],
+}
+CASE_DESCRIPTIONS = {
+    "theft": "Nighttime robbery at {place}. Forced entry, {detail}.",
+    "fraud": "Possible embezzlement of funds in {company}, {detail}.",
+    "disappearance": "{age}-year-old missing for {days} days. Last seen at {place}.",
+    "homicide": "Body found at {place}, {detail}.",
+    "assault": "Violent assault reported near {place}, {detail}.",
+}
+DETAILS = [
+    "safe opened",
+    "no witnesses",
+    "security system disabled",
+    "several suspects involved",
+    "vehicle seen leaving the scene",
+    "transfers to offshore accounts",
+    "cash missing from the registers",
+]
+PLACES = [
+    "El Diamante Jewelry Store",
+    "Plaza Norte Shopping Mall",
+    "Central Station",
+    "Harbour Warehouse",
+    "City Museum",
+    "Riverside Park",
+    "Industrial District",
+    "Old Town Bakery",
+    "Grand Hotel",
+    "University Campus",
+]
+STREETS = ["Mayor Street", "Gran Vía", "Harbour Road", "Calle Real", "Avenida Norte", "Park Lane"]
+DISTRICTS = ["Downtown", "Industrial Park", "Old Town", "Financial District", "Suburbs", "Harbour"]
+# Centres on the city map, in km east and north of the city centre, as in the servers
+DISTRICT_COORDINATES = {
+    "Downtown": (0.0, 0.0),
+    "Industrial Park": (5.0, 4.0),
+    "Old Town": (-1.0, -1.0),
+    "Financial District": (1.5, 1.0),
+    "Suburbs": (6.0, -5.0),
+    "Harbour": (-4.0, -3.0),
+}
+# Spread of the records around the centre of their district or area, in km
+LOCATION_SPREAD_KM = 0.8
+COMPANIES = ["TechCorp", "Banco Sur", "Logística Norte", "MediaPlus", "Constructora Este"]
+PEOPLE = ["María González", "Juan Pérez", "Lucía Torres", "Pedro Gil", "Ana Castro", "Luis Vega"]
+SUSPECTS = [
+    "Unknown suspect - fingerprints",
+    "Carlos Mendoza - CFO",
+    "Ana López - Accountant",
+    "Hooded individual",
+    "Former employee",
+    "Known associate of the victim",
+]
+
+EVIDENCE_TYPES = {
+    "theft": ["fingerprints", "security_video", "tool_marks"],
+    "fraud": ["financial_documents", "bank_records", "emails"],
+    "disappearance": ["security_video", "phone_records", "witness_statement"],
+    "homicide": ["dna_sample", "fingerprints", "weapon", "autopsy_report"],
+    "assault": ["security_video", "witness_statement", "medical_report"],
+}
+EVIDENCE_STATUSES = {"pending_analysis": 0.30, "under_analysis": 0.20, "analyzed": 0.50}
+CUSTODIANS = [
+    "Forensic Laboratory",
+    "IT Technician",
+    "Forensic Auditor",
+    "Financial Specialist",
+    "Security Technician",
+]
+ANALYSIS_RESULTS = [
+    "Hooded figure, approximately 1.75m, entry at 02:30",
+    "Discrepancies in transfers for €250,000",
+    "Unauthorized transfers to offshore accounts",
+    "Partial match with a registered offender",
+    "No conclusive findings",
+]
+
+SPECIALTIES = {
+    "drug_trafficking": 0.25,
+    "financial_fraud": 0.20,
+    "jewelry_theft": 0.15,
+    "disappearances": 0.10,
+    "corruption": 0.15,
+    "cybercrime": 0.15,
+}
+RELIABILITY_LEVELS = {"low": 0.25, "medium": 0.45, "high": 0.30}
+CONTACT_METHODS = {"secure_phone": 0.45, "encrypted_email": 0.30, "in_person_contact": 0.25}
+LOCATION_AREAS = [
+    "centro_ciudad",
+    "distrito_financiero",
+    "centro_comercial",
+    "suburbios",
+    "puerto",
+    "zona_industrial",
+]
+AREA_COORDINATES = {
+    "centro_ciudad": (0.0, 0.0),
+    "distrito_financiero": (1.5, 1.0),
+    "centro_comercial": (-2.5, 3.0),
+    "suburbios": (6.0, -5.0),
+    "puerto": (-4.0, -3.0),
+    "zona_industrial": (5.0, 4.0),
+}
+CODE_NAMES = [
+    "Cuervo", "Sombra", "Fantasma", "Eco", "Halcón", "Zorro", "Lince", "Búho",
+    "Niebla", "Trueno", "Viento", "Escorpión", "Coyote", "Pantera", "Gaviota", "Ceniza",
+]
+# Chance that a tip of an informant of each reliability level gets verified
+VERIFICATION_RATE = {"low": 0.3, "medium": 0.55, "high": 0.8}
+
+MEETING_TIMES = ["08:00", "10:00", "12:00", "14:00", "16:00", "18:00", "20:00", "22:00"]
+SAFE_LOCATIONS = [
+    "Café Central - Mesa del fondo",
+    "Parque Municipal - Banco junto al lago",
+    "Biblioteca Pública - Sala de lectura",
+    "Centro Comercial - Food Court",
+    "Estación de Tren - Sala de espera",
+    "Hotel Plaza - Lobby",
+    "Museo de Arte - Sala Medieval",
+]
+MEETING_PURPOSES = [
+    "Information about distribution network",
+    "{case} case follow-up",
+    "Information about {topic}",
+    "Routine check-in",
+    "Handover of documents",
+]
+SECURITY_LEVELS = {"low": 0.15, "medium": 0.50, "high": 0.35}
+
+INFORMATION_TYPES = {
+    "suspect_location": 0.35,
+    "suspicious_transactions": 0.20,
+    "criminal_activity": 0.30,
+    "witness_testimony": 0.15,
+}
+CREDIBILITY = {"low": 0.25, "medium": 0.45, "high": 0.30}
+TIP_TEMPLATES = {
+    "suspect_location": [
+        "{suspect} seen in {district} near {place}",
+        "Suspect of the {topic} case hiding at {place} in {district}",
+        "{suspect} spotted driving a {vehicle} around {district}",
+    ],
+    "suspicious_transactions": [
+        "Anomalous bank movements detected in {company} accounts",
+        "Large cash deposits at {company} every {weekday}",
+        "Transfers from {company} to offshore accounts through {vehicle} dealer",
+    ],
+    "criminal_activity": [
+        "Shipment of {topic} goods expected at {place} on {weekday}",
+        "Gang meeting planned at {place} in {district}",
+        "Stolen jewelry offered for sale near {place}",
+    ],
+    "witness_testimony": [
+        "Witness saw {suspect} leaving {place} on {weekday} night",
+        "Neighbour heard an argument at {place} in {district}",
+    ],
+}
+TOPICS = ["jewelry", "drug", "fraud", "smuggling", "arms", "counterfeit"]
+VEHICLES = ["white van", "black sedan", "motorcycle", "grey pickup", "red hatchback"]
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+def table_sizes(shares: Dict[str, float], size: int) -> Dict[str, int]:
+    """Split a dataset of `size` records between tables, at least one record each."""
+    return {table: max(int(size * share), 1) for table, share in shares.items()}
+
+
+def _record_id(prefix: str, index: int) -> str:
+    return f"{prefix}-{FIRST_ID + index:03d}"
+
+
+def _weighted(rng: random.Random, weights: Dict[str, float]) -> str:
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _day(today: datetime.date, offset: int) -> str:
+    return (today + datetime.timedelta(days=offset)).strftime("%Y-%m-%d")
+
+
+def _past_day(rng: random.Random, today: datetime.date) -> str:
+    # Recent days are more likely, as in a growing system
+    return _day(today, -int(HISTORY_DAYS * rng.random() ** 2))
+
+
+def _coordinates(rng: random.Random, centre: Tuple[float, float]) -> Dict[str, float]:
+    return {
+        "x": round(rng.gauss(centre[0], LOCATION_SPREAD_KM), 3),
+        "y": round(rng.gauss(centre[1], LOCATION_SPREAD_KM), 3),
+    }
+
+
+def case_ids(count: int) -> List[str]:
+    """Return the ids of the first `count` generated cases."""
+    return [_record_id("CASE", index) for index in range(count)]
+
+
+def generate_cases(
+    count: int, seed: int = 0, today: Optional[datetime.date] = None
+) -> Iterator[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+    """Generate cases, each with its evidence.
+
+    Evidence is drawn for each case, 1 to 4 items with 2 on average, so the
+    evidence table ends up about twice the size of the case table.
+
+    Args:
+        count (int): Number of cases.
+        seed (int): Random seed.
+        today (Optional[datetime.date]): Reference day of the dates.
+
+    Yields:
+        Tuple[Dict[str, Any], List[Dict[str, Any]]]: A case and its evidence.
+    """
+    rng = random.Random(f"cases|{seed}")
+    # Drawn apart, so the other fields are the same as without coordinates
+    coordinates_rng = random.Random(f"case-coordinates|{seed}")
+    today = today or datetime.date.today()
+    evidence_index = 0
+    for index in range(count):
+        case_type = _weighted(rng, CASE_TYPES)
+        case_id = _record_id("CASE", index)
+        date_created = _past_day(rng, today)
+        fill = {
+            "place": rng.choice(PLACES),
+            "company": rng.choice(COMPANIES),
+            "person": rng.choice(PEOPLE),
+            "detail": rng.choice(DETAILS),
+            "age": rng.randint(16, 80),
+            "days": rng.randint(1, 14),
+        }
+        detective = rng.choice(DETECTIVES)
+
+        evidence = []
+        for _ in range(rng.choices([1, 2, 3, 4], weights=[0.35, 0.40, 0.15, 0.10])[0]):
+            status = _weighted(rng, EVIDENCE_STATUSES)
+            evidence_type = rng.choice(EVIDENCE_TYPES[case_type])
+            evidence.append(
+                {
+                    "id": _record_id("EVID", evidence_index),
+                    "case_id": case_id,
+                    "type": evidence_type,
+                    "description": f"{evidence_type.replace('_', ' ').capitalize()} collected at {fill['place']}",
+                    "location_found": f"{rng.choice(STREETS)} {rng.randint(1, 200)}",
+                    "date_collected": date_created,
+                    "status": status,
+                    "chain_of_custody": [detective, rng.choice(CUSTODIANS)],
+                    "analysis_results": (
+                        rng.choice(ANALYSIS_RESULTS) if status != "pending_analysis" else None
+                    ),
+                }
+            )
+            evidence_index += 1
+
+        case = {
+            "id": case_id,
+            "title": rng.choice(CASE_TITLES[case_type]).format(**fill),
+            "type": case_type,
+            "status": _weighted(rng, CASE_STATUSES),
+            "description": CASE_DESCRIPTIONS[case_type].format(**fill),
+            "date_created": date_created,
+            "priority": _weighted(rng, PRIORITIES),
+            "assigned_detective": detective,
+            "evidence_ids": [item["id"] for item in evidence],
+            "suspects": rng.sample(SUSPECTS, rng.choices([0, 1, 2], weights=[0.3, 0.5, 0.2])[0]),
+        }
+        street = f"{rng.choice(STREETS)} {rng.randint(1, 200)}"
+        district = rng.choice(DISTRICTS)
+        case["location"] = f"{street}, {district}"
+        case["coordinates"] = _coordinates(coordinates_rng, DISTRICT_COORDINATES[district])
+        yield case, evidence
+
+
+def generate_informants(
+    count: int, seed: int = 0, today: Optional[datetime.date] = None
+) -> List[Dict[str, Any]]:
+    """Generate informants.
+
+    Their counters start at zero; generate_information fills them with the
+    tips it assigns to each informant.
+
+    Args:
+        count (int): Number of informants.
+        seed (int): Random seed.
+        today (Optional[datetime.date]): Reference day of the dates.
+
+    Returns:
+        List[Dict[str, Any]]: The informants.
+    """
+    rng = random.Random(f"informants|{seed}")
+    coordinates_rng = random.Random(f"informant-coordinates|{seed}")
+    today = today or datetime.date.today()
+    informants = []
+    for index in range(count):
+        informant = {
+            "id": _record_id("INF", index),
+            # Code names are unique, as register_new_informant requires
+            "code_name": f"{CODE_NAMES[index % len(CODE_NAMES)]} {FIRST_ID + index}",
+            "specialty": _weighted(rng, SPECIALTIES),
+            "reliability_level": _weighted(rng, RELIABILITY_LEVELS),
+            "contact_method": _weighted(rng, CONTACT_METHODS),
+            "date_registered": _day(today, -rng.randint(HISTORY_DAYS, 3 * HISTORY_DAYS)),
+            "handler": rng.choice(DETECTIVES),
+            "status": "active" if rng.random() < 0.85 else "inactive",
+            "location_area": rng.choice(LOCATION_AREAS),
+            "information_count": 0,
+            "successful_tips": 0,
+        }
+        informant["coordinates"] = _coordinates(
+            coordinates_rng, AREA_COORDINATES[informant["location_area"]]
+        )
+        informants.append(informant)
+    return informants
+
+
+def _pick_informant(rng: random.Random, informants: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # A few informants provide most of the activity
+    return informants[int(len(informants) * rng.random() ** 2)]
+
+
+def generate_meetings(
+    informants: List[Dict[str, Any]],
+    count: int,
+    seed: int = 0,
+    today: Optional[datetime.date] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Generate meetings with the given informants.
+
+    The servers allow one scheduled meeting per date and time, so scheduled
+    meetings fill the free slots of the next SCHEDULE_HORIZON_DAYS days and
+    all other meetings are in the past, completed or cancelled.
+
+    Args:
+        informants (List[Dict[str, Any]]): Informants met.
+        count (int): Number of meetings.
+        seed (int): Random seed.
+        today (Optional[datetime.date]): Reference day of the dates.
+
+    Yields:
+        Dict[str, Any]: A meeting.
+    """
+    rng = random.Random(f"meetings|{seed}")
+    today = today or datetime.date.today()
+    slots = [
+        (_day(today, offset), time)
+        for offset in range(1, SCHEDULE_HORIZON_DAYS + 1)
+        for time in MEETING_TIMES
+    ]
+    rng.shuffle(slots)
+    scheduled = slots[: min(len(slots), count // 10)]
+
+    for index in range(count):
+        informant = _pick_informant(rng, informants)
+        if index % 10 == 0 and scheduled:
+            date, time = scheduled.pop()
+            status = "scheduled"
+        else:
+            date, time = _past_day(rng, today), rng.choice(MEETING_TIMES)
+            status = "completed" if rng.random() < 0.8 else "cancelled"
+        yield {
+            "id": _record_id("MEET", index),
+            "informant_id": informant["id"],
+            "informant_code_name": informant["code_name"],
+            "date": date,
+            "time": time,
+            "location": rng.choice(SAFE_LOCATIONS),
+            "purpose": rng.choice(MEETING_PURPOSES).format(
+                case=rng.choice(COMPANIES), topic=rng.choice(TOPICS)
+            ),
+            "status": status,
+            "handler": informant["handler"],
+            "security_level": _weighted(rng, SECURITY_LEVELS),
+        }
+
+
+def generate_information(
+    informants: List[Dict[str, Any]],
+    count: int,
+    related_cases: int,
+    seed: int = 0,
+    today: Optional[datetime.date] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Generate tips received from the given informants.
+
+    The information_count and successful_tips of every informant are
+    incremented with the tips assigned to it. About NEAR_DUPLICATE_RATE of the
+    tips reword an earlier one, as when several informants report the same
+    event.
+
+    Args:
+        informants (List[Dict[str, Any]]): Informants reporting the tips.
+        count (int): Number of tips.
+        related_cases (int): Number of generated cases tips can refer to.
+        seed (int): Random seed.
+        today (Optional[datetime.date]): Reference day of the dates.
+
+    Yields:
+        Dict[str, Any]: A tip.
+    """
+    rng = random.Random(f"information|{seed}")
+    today = today or datetime.date.today()
+    recent: List[Tuple[str, str]] = []
+    for index in range(count):
+        informant = _pick_informant(rng, informants)
+        if recent and rng.random() < NEAR_DUPLICATE_RATE:
+            information_type, content = rng.choice(recent)
+            content = f"{content} {rng.choice(WEEKDAYS)}"
+        else:
+            information_type = _weighted(rng, INFORMATION_TYPES)
+            content = rng.choice(TIP_TEMPLATES[information_type]).format(
+                suspect=rng.choice(SUSPECTS).split(" - ")[0],
+                district=rng.choice(DISTRICTS),
+                place=rng.choice(PLACES),
+                topic=rng.choice(TOPICS),
+                vehicle=rng.choice(VEHICLES),
+                company=rng.choice(COMPANIES),
+                weekday=rng.choice(WEEKDAYS),
+            )
+            recent.append((information_type, content))
+            if len(recent) > 1000:
+                del recent[rng.randrange(len(recent))]
+
+        date_received = _past_day(rng, today)
+        if rng.random() < 0.3:
+            status = "pending"
+        elif rng.random() < VERIFICATION_RATE[informant["reliability_level"]]:
+            status = rng.choice(["verified", "confirmed"])
+            informant["successful_tips"] += 1
+        else:
+            status = rng.choice(["unconfirmed", "partially_confirmed"])
+        informant["information_count"] += 1
+
+        yield {
+            "id": _record_id("INFO", index),
+            "informant_id": informant["id"],
+            "informant_code_name": informant["code_name"],
+            "information_type": information_type,
+            "content": content,
+            "credibility": _weighted(rng, CREDIBILITY),
+            "date_received": date_received,
+            "case_related": (
+                _record_id("CASE", rng.randrange(related_cases))
+                if related_cases and rng.random() < 0.4
+                else "to_be_determined"
+            ),
+            "verification_status": status,
+            "handler": informant["handler"],
+        }
+
+
+def populate_case_server(server: Any, size: int, seed: int = 0, today: Optional[datetime.date] = None) -> Dict[str, int]:
+    """Add a synthetic dataset to the stores of the case management server.
+
+    Args:
+        server (Any): The imported server module.
+        size (int): Total number of records, split with CASE_TABLES.
+        seed (int): Random seed.
+        today (Optional[datetime.date]): Reference day of the dates.
+
+    Returns:
+        Dict[str, int]: Number of records in every table.
+    """
+    sizes = table_sizes(CASE_TABLES, size)
+    for case, evidence in generate_cases(sizes["cases"], seed, today):
+        server.CASES_DB[case["id"]] = case
+        for item in evidence:
+            server.EVIDENCE_DB[item["id"]] = item
+    return {"cases": len(server.CASES_DB), "evidence": len(server.EVIDENCE_DB)}
+
+
+def populate_informant_server(
+    server: Any, size: int, seed: int = 0, today: Optional[datetime.date] = None
+) -> Dict[str, int]:
+    """Add a synthetic dataset to the stores and indexes of the informant management server.
+
+    Records go through the same indexing as the sample data: availability,
+    location, activity counters, near-duplicate clusters and corroboration indexes.
+
+    Args:
+        server (Any): The imported server module.
+        size (int): Total number of records, split with INFORMANT_TABLES.
+        seed (int): Random seed.
+        today (Optional[datetime.date]): Reference day of the dates.
+
+    Returns:
+        Dict[str, int]: Number of records in every table.
+    """
+    sizes = table_sizes(INFORMANT_TABLES, size)
+    informants = generate_informants(sizes["informants"], seed, today)
+    for informant in informants:
+        server.INFORMANTS_DB[informant["id"]] = informant
+        server.index_informant(informant)
+
+    for meeting in generate_meetings(informants, sizes["meetings"], seed, today):
+        server.MEETINGS_DB[meeting["id"]] = meeting
+        server.index_meeting(meeting)
+        server.count_meeting_activity(meeting)
+
+    related_cases = table_sizes(CASE_TABLES, size)["cases"]
+    for information in generate_information(informants, sizes["information"], related_cases, seed, today):
+        server.INFORMATION_DB[information["id"]] = information
+        server.count_information_activity(information)
+        server.index_information(information)
+
+    return {
+        "informants": len(server.INFORMANTS_DB),
+        "meetings": len(server.MEETINGS_DB),
+        "information": len(server.INFORMATION_DB),
+        "clusters": len(server.INFORMATION_CLUSTERS),
+    }
+
+
+def _write_jsonl(path: str, records) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def write_dataset(out_dir: str, size: int, seed: int = 0, today: Optional[datetime.date] = None) -> Dict[str, int]:
+    """Write the datasets of both servers as one JSON Lines file per table.
+
+    Records are streamed to disk, except informants, which are written last
+    with the counters filled in by their tips.
+
+    Returns:
+        Dict[str, int]: Number of records written to every file.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    counts = {}
+
+    case_sizes = table_sizes(CASE_TABLES, size)
+    evidence_path = os.path.join(out_dir, "evidence.jsonl")
+    with open(evidence_path, "w", encoding="utf-8") as evidence_file:
+
+        def cases():
+            for case, evidence in generate_cases(case_sizes["cases"], seed, today):
+                for item in evidence:
+                    evidence_file.write(json.dumps(item, ensure_ascii=False))
+                    evidence_file.write("\n")
+                    counts["evidence"] = counts.get("evidence", 0) + 1
+                yield case
+
+        counts["cases"] = _write_jsonl(os.path.join(out_dir, "cases.jsonl"), cases())
+
+    sizes = table_sizes(INFORMANT_TABLES, size)
+    informants = generate_informants(sizes["informants"], seed, today)
+    counts["meetings"] = _write_jsonl(
+        os.path.join(out_dir, "meetings.jsonl"),
+        generate_meetings(informants, sizes["meetings"], seed, today),
+    )
+    counts["information"] = _write_jsonl(
+        os.path.join(out_dir, "information.jsonl"),
+        generate_information(informants, sizes["information"], case_sizes["cases"], seed, today),
+    )
+    counts["informants"] = _write_jsonl(os.path.join(out_dir, "informants.jsonl"), informants)
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=10000, help="records per server, split between its tables")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--today", help="reference day of the dates, YYYY-MM-DD (default: today)")
+    parser.add_argument("--out", required=True, help="output directory")
+    args = parser.parse_args()
+
+    today = datetime.datetime.strptime(args.today, "%Y-%m-%d").date() if args.today else None
+    counts = write_dataset(args.out, args.size, args.seed, today)
+    print(json.dumps(counts))
+
+
+if __name__ == "__main__":
+    main()
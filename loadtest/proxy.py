@@ -0,0 +1,104 @@
+"""Recording reverse proxy placed on every hop between the processes under test."""
+
+import contextlib
+import json
+import time
+from typing import AsyncIterator, Dict, List, Tuple
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+
+# Hop-by-hop headers, and those recomputed for the forwarded message. The Host
+# header is kept so redirects issued by the target point back to the proxy.
+_SKIPPED_HEADERS = {"content-length", "transfer-encoding", "connection", "keep-alive"}
+
+
+def _forwarded_headers(headers) -> Dict[str, str]:
+    return {key: value for key, value in headers.items() if key.lower() not in _SKIPPED_HEADERS}
+
+
+class HopRecorder:
+    """Latencies of the requests crossing each hop.
+
+    Attributes:
+        samples (List[Tuple[str, float]]): Hop name and seconds of every request.
+    """
+
+    def __init__(self):
+        self.samples: List[Tuple[str, float]] = []
+
+    def record(self, hop: str, seconds: float) -> None:
+        """Record the latency of one request."""
+        self.samples.append((hop, seconds))
+
+
+def build_proxy(hop: str, target: str, recorder: HopRecorder) -> Starlette:
+    """Build a proxy forwarding every request to a target and timing the POST requests.
+
+    The time of a request runs until the last byte of the response, so
+    streamed answers are timed in full. JSON-RPC requests are recorded under
+    the hop name followed by their method.
+
+    Args:
+        hop (str): Name of the hop, e.g. "manager->case_agent".
+        target (str): Base URL of the proxied server.
+        recorder (HopRecorder): Where latencies are recorded.
+
+    Returns:
+        Starlette: The proxy application.
+    """
+    client = httpx.AsyncClient(base_url=target, timeout=httpx.Timeout(10.0, read=None))
+
+    async def forward(request: Request) -> Response:
+        started = time.perf_counter()
+        body = await request.body()
+        name = hop
+        if request.method == "POST":
+            try:
+                name = f"{hop} {json.loads(body)['method']}"
+            except (ValueError, KeyError, TypeError):
+                pass
+
+        upstream = await client.send(
+            client.build_request(
+                request.method,
+                request.url.path,
+                params=request.query_params,
+                headers=_forwarded_headers(request.headers),
+                content=body,
+            ),
+            stream=True,
+        )
+
+        async def relay():
+            try:
+                async for chunk in upstream.aiter_raw():
+                    yield chunk
+            except httpx.HTTPError:
+                # The target went away mid-stream, e.g. at shutdown; end the response
+                pass
+            finally:
+                await upstream.aclose()
+                if request.method == "POST":
+                    recorder.record(name, time.perf_counter() - started)
+
+        return StreamingResponse(
+            relay(),
+            status_code=upstream.status_code,
+            headers=_forwarded_headers(upstream.headers),
+        )
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncIterator[None]:
+        yield
+        await client.aclose()
+
+    return Starlette(
+        routes=[
+            Route("/{path:path}", forward, methods=["GET", "POST", "DELETE"]),
+        ],
+        lifespan=lifespan,
+    )
@@ -0,0 +1,517 @@
+"""Offline end-to-end load test of the detective agency.
+
+Starts the two MCP servers and the three agents from their entry points, with
+a scripted stand-in model instead of Gemini and a recording proxy on every
+hop, then drives concurrent A2A conversations against the detective manager.
+It reports p50/p95/p99 latency per hop, the time to the first streamed token
+seen by the client, requests per second and the peak memory of every server,
+summed over its worker processes.
+
+With --workers above 1 every agent runs that many worker processes sharing its
+task store. Every request opens a new connection unless --keep-alive is given,
+whatever the number of workers, so the turns of a conversation are spread over
+the workers, and every follow-up turn first looks up the task of the previous
+turn with tasks/get, which only succeeds if the task store is shared.
+
+Usage:
+    python loadtest/run.py --concurrency 8 --conversations 40 --turns 2 --output report.json
+    python loadtest/run.py --workers 4 --concurrency 16 --conversations 80 --turns 2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import uvicorn
+import yaml
+
+from proxy import HopRecorder, build_proxy
+from stub_model import ScriptedModel, build_app
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AGENT_DIR = os.path.join(ROOT, "agent")
+
+# Prompts sent by the conversations, in order; they exercise every delegation path
+PROMPTS = [
+    "Give me the details of CASE-001 and its evidence",
+    "Find informants specialized in drug trafficking",
+    "Review CASE-002 and find an informant for financial fraud",
+    "What is the status of CASE-003?",
+    "Find informants for jewelry theft related to CASE-001",
+    "Show the network statistics of our informants",
+]
+
+MCP_SERVERS = {
+    "case_mcp": "mcp/mcp_case_management/server.py",
+    "informant_mcp": "mcp/mcp_informant_management/server.py",
+}
+SUB_AGENTS = {
+    "case_agent": ("agent/case_agent", "case_mcp"),
+    "informant_agent": ("agent/informant_agent", "informant_mcp"),
+}
+MANAGER = "detective_manager_agent"
+
+# Set by the agents that run several workers, see agent_common.bootstrap
+WORKER_HEADER = "x-agent-worker"
+
+
+def assign_ports(base: int) -> Dict[str, int]:
+    """Return the port of every server and proxy, starting at `base`."""
+    names = [
+        "model",
+        "case_mcp",
+        "informant_mcp",
+        "case_agent",
+        "informant_agent",
+        MANAGER,
+        "case_mcp_proxy",
+        "informant_mcp_proxy",
+        "case_agent_proxy",
+        "informant_agent_proxy",
+    ]
+    return {name: base + offset for offset, name in enumerate(names)}
+
+
+def write_agent_config(
+    name: str, source: str, out_dir: str, ports: Dict[str, int], workers: int = 1
+) -> str:
+    """Write the config of an agent rewritten to run on this host.
+
+    Remote agents and MCP servers are reached through their proxies, data
+    files go to the run directory, the response cache is disabled and the
+    agent runs `workers` worker processes.
+
+    Returns:
+        str: Path of the written config.
+    """
+    with open(os.path.join(ROOT, source, "agent_config.yaml"), "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+
+    if name in SUB_AGENTS:
+        config["service"]["url"] = f"http://127.0.0.1:{ports[name + '_proxy']}"
+        mcp_name = SUB_AGENTS[name][1]
+        for tool in config["agent"].get("tools") or []:
+            if tool.get("type") == "mcp":
+                tool["mcp_config"]["url"] = "127.0.0.1"
+                tool["mcp_config"]["port"] = ports[mcp_name + "_proxy"]
+    else:
+        config["service"]["url"] = f"http://127.0.0.1:{ports[name]}"
+        for remote in config["agent"].get("remote_agents") or []:
+            remote["host"] = "127.0.0.1"
+            remote["port"] = ports[remote["name"] + "_proxy"]
+
+    runtime = config.setdefault("runtime", {})
+    data_dir = os.path.join(out_dir, name)
+    os.makedirs(data_dir, exist_ok=True)
+    if "task_store" in runtime:
+        runtime["task_store"]["path"] = os.path.join(data_dir, "tasks.db")
+    runtime["llm_cache"] = {"enabled": False}
+    runtime["server"] = {**(runtime.get("server") or {}), "workers": workers}
+    # There is no Phoenix next to the harness to receive the spans
+    runtime["tracing"] = {"enabled": False}
+    runtime["logging"] = {
+        **(runtime.get("logging") or {}),
+        "level": "WARNING",
+        "file": os.path.join(data_dir, "agent.log"),
+        "levels": {"aigency": "WARNING"},
+    }
+
+    path = os.path.join(data_dir, "agent_config.yaml")
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(config, f, sort_keys=False)
+    return path
+
+
+def start_process(
+    name: str, script: str, env: Dict[str, str], log_dir: str
+) -> Tuple[subprocess.Popen, str]:
+    """Start a server from its entry point, with its output in a log file."""
+    log_path = os.path.join(log_dir, f"{name}.out")
+    log = open(log_path, "w", encoding="utf-8")
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, script)],
+        cwd=os.path.dirname(os.path.join(ROOT, script)),
+        env=env,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    return process, log_path
+
+
+async def wait_ready(url: str, process: subprocess.Popen, log_path: str, timeout: float = 90) -> None:
+    """Wait until a server answers HTTP requests.
+
+    Raises:
+        RuntimeError: If the process exits or does not answer in time.
+    """
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(timeout=2) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                break
+            try:
+                await client.get(url)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.5)
+    with open(log_path, "r", encoding="utf-8") as f:
+        tail = f.read()[-3000:]
+    raise RuntimeError(f"{url} did not start, see {log_path}:\n{tail}")
+
+
+def _child_pids(pid: int) -> List[int]:
+    """Return the children of a process, from /proc on Linux."""
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r", encoding="utf-8") as f:
+                # The command name is in parentheses and may contain spaces
+                parent = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if parent == pid:
+            children.append(int(entry))
+    return children
+
+
+def _peak_rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def peak_memory_mb(pid: int) -> Optional[Dict[str, Any]]:
+    """Return the peak resident memory of a process and of its descendants, from /proc on Linux.
+
+    With several workers the process started is only the supervisor, so the
+    peak of every worker is listed and the total is their sum. The processes
+    did not necessarily peak at the same time, so the total is an upper bound.
+
+    Returns:
+        Optional[Dict[str, Any]]: `total` and `processes`, the peak of the
+            process then of each descendant in MB, or None if unknown.
+    """
+    pids = [pid]
+    for parent in pids:
+        pids.extend(_child_pids(parent))
+    peaks = [_peak_rss_mb(process) for process in pids]
+    known = [round(peak, 1) for peak in peaks if peak is not None]
+    if not known:
+        return None
+    return {"total": round(sum(known), 1), "processes": known}
+
+
+def summarize(samples: List[Tuple[str, float]]) -> Dict[str, Dict[str, float]]:
+    """Compute count, mean and p50/p95/p99 in milliseconds per hop."""
+    by_hop: Dict[str, List[float]] = {}
+    for hop, seconds in samples:
+        by_hop.setdefault(hop, []).append(seconds * 1000)
+
+    summary = {}
+    for hop, values in sorted(by_hop.items()):
+        values.sort()
+
+        def percentile(q: float) -> float:
+            return values[min(int(q * len(values)), len(values) - 1)]
+
+        summary[hop] = {
+            "count": len(values),
+            "mean_ms": round(sum(values) / len(values), 1),
+            "p50_ms": round(percentile(0.50), 1),
+            "p95_ms": round(percentile(0.95), 1),
+            "p99_ms": round(percentile(0.99), 1),
+        }
+    return summary
+
+
+def _has_text(result: Dict[str, Any]) -> bool:
+    """Tell whether a streamed event carries text for the user."""
+    parts = []
+    if result.get("kind") == "status-update":
+        parts = ((result.get("status") or {}).get("message") or {}).get("parts") or []
+    elif result.get("kind") == "artifact-update":
+        parts = (result.get("artifact") or {}).get("parts") or []
+    return any(part.get("kind") == "text" and part.get("text") for part in parts)
+
+
+async def send_message(
+    client: httpx.AsyncClient, url: str, text: str, context_id: str, client_id: str
+) -> Tuple[bool, Optional[float], Optional[str], Optional[str]]:
+    """Send one message/stream request.
+
+    Returns:
+        Tuple[bool, Optional[float], Optional[str], Optional[str]]: Whether its
+            task completed, the seconds until the first text arrived, the id of
+            the task and the worker that served it, if the agent has several.
+    """
+    payload = {
+        "jsonrpc": "2.0",
+        "id": uuid.uuid4().hex,
+        "method": "message/stream",
+        "params": {
+            "message": {
+                "role": "user",
+                "parts": [{"kind": "text", "text": text}],
+                "messageId": uuid.uuid4().hex,
+                "contextId": context_id,
+            }
+        },
+    }
+    started = time.perf_counter()
+    first_text = state = task_id = None
+    async with client.stream("POST", url, json=payload, headers={"X-Client-Id": client_id}) as response:
+        worker = response.headers.get(WORKER_HEADER)
+        if response.status_code != 200:
+            return False, None, None, worker
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            result = json.loads(line[len("data:"):]).get("result") or {}
+            if first_text is None and _has_text(result):
+                first_text = time.perf_counter() - started
+            state = (result.get("status") or {}).get("state", state)
+            task_id = result.get("taskId") or (result.get("id") if result.get("kind") == "task" else task_id)
+    return state == "completed", first_text, task_id, worker
+
+
+async def get_task(client: httpx.AsyncClient, url: str, task_id: str) -> Tuple[bool, Optional[str]]:
+    """Look up a task with tasks/get.
+
+    Returns:
+        Tuple[bool, Optional[str]]: Whether the task was found, and the worker
+            that served the lookup, if the agent has several.
+    """
+    payload = {"jsonrpc": "2.0", "id": uuid.uuid4().hex, "method": "tasks/get", "params": {"id": task_id}}
+    response = await client.post(url, json=payload)
+    found = response.status_code == 200 and (response.json().get("result") or {}).get("id") == task_id
+    return found, response.headers.get(WORKER_HEADER)
+
+
+async def drive(
+    url: str,
+    concurrency: int,
+    conversations: int,
+    turns: int,
+    recorder: HopRecorder,
+    keep_alive: bool = True,
+) -> Tuple[int, int, float, Dict[str, int]]:
+    """Run the conversations against the manager.
+
+    Args:
+        keep_alive (bool): Whether requests reuse connections. Without, every
+            request is accepted anew by one of the workers of the manager.
+
+    Returns:
+        Tuple[int, int, float, Dict[str, int]]: Completed requests, failed
+            requests, the wall time in seconds, and how the requests were
+            spread over the workers of the manager.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    completed = failed = 0
+    workers = set()
+    routing = {"follow_ups": 0, "follow_ups_on_other_worker": 0, "task_lookups_failed": 0}
+
+    async def conversation(index: int) -> None:
+        nonlocal completed, failed
+        async with semaphore:
+            context_id = uuid.uuid4().hex
+            previous_task = previous_worker = None
+            for turn in range(turns):
+                text = PROMPTS[(index + turn) % len(PROMPTS)]
+                started = time.perf_counter()
+                try:
+                    if previous_task is not None:
+                        found, _ = await get_task(client, url, previous_task)
+                        routing["task_lookups_failed"] += not found
+                    ok, first_text, task_id, worker = await send_message(
+                        client, url, text, context_id, f"loadtest-{index}"
+                    )
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    completed += 1
+                    recorder.record("client->manager message/stream", time.perf_counter() - started)
+                    if first_text is not None:
+                        recorder.record("client->manager first token", first_text)
+                    if worker is not None:
+                        workers.add(worker)
+                        if turn > 0:
+                            routing["follow_ups"] += 1
+                            routing["follow_ups_on_other_worker"] += worker != previous_worker
+                    previous_task, previous_worker = task_id, worker
+                else:
+                    failed += 1
+
+    limits = httpx.Limits() if keep_alive else httpx.Limits(max_keepalive_connections=0)
+    async with httpx.AsyncClient(timeout=httpx.Timeout(10.0, read=600.0), limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(conversation(index) for index in range(conversations)))
+        return completed, failed, time.perf_counter() - started, {"workers_seen": len(workers), **routing}
+
+
+async def serve_in_process(app: Any, port: int) -> Tuple[uvicorn.Server, asyncio.Task]:
+    """Serve an ASGI application in this event loop."""
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+    )
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    return server, task
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Print a report as tables."""
+    print(
+        f"\n{report['completed']} requests in {report['duration_seconds']}s, "
+        f"{report['requests_per_second']} req/s, {report['failed']} failed"
+    )
+    routing = report["routing"]
+    if report["config"]["workers"] > 1:
+        print(
+            f"{routing['workers_seen']} manager workers served requests, "
+            f"{routing['follow_ups_on_other_worker']}/{routing['follow_ups']} follow-ups on another worker "
+            f"than the previous turn, {routing['task_lookups_failed']} task lookups failed"
+        )
+    print()
+    print(f"{'hop':58} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for hop, stats in report["hops"].items():
+        print(
+            f"{hop:58} {stats['count']:>6} {stats['p50_ms']:>9} "
+            f"{stats['p95_ms']:>9} {stats['p99_ms']:>9}"
+        )
+    print(f"\n{'process':24} {'peak RSS MB':>12}  per process")
+    for name, memory in report["peak_memory_mb"].items():
+        if memory is None:
+            print(f"{name:24} {'-':>12}")
+        else:
+            print(f"{name:24} {memory['total']:>12}  {' '.join(map(str, memory['processes']))}")
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Start the stack, run the load and collect the report."""
+    ports = assign_ports(args.base_port)
+    out_dir = args.work_dir or tempfile.mkdtemp(prefix="loadtest-")
+    os.makedirs(out_dir, exist_ok=True)
+    recorder = HopRecorder()
+    model = ScriptedModel(latency_ms=args.model_latency_ms, jitter_ms=args.model_jitter_ms, seed=args.seed)
+
+    servers = [await serve_in_process(build_app(model), ports["model"])]
+    for name, target in (
+        ("case_mcp", "case_agent->case_mcp"),
+        ("informant_mcp", "informant_agent->informant_mcp"),
+        ("case_agent", "manager->case_agent"),
+        ("informant_agent", "manager->informant_agent"),
+    ):
+        proxy = build_proxy(target, f"http://127.0.0.1:{ports[name]}", recorder)
+        servers.append(await serve_in_process(proxy, ports[name + "_proxy"]))
+
+    base_env = {
+        **os.environ,
+        "PYTHONPATH": AGENT_DIR,
+        "GOOGLE_GENAI_USE_VERTEXAI": "FALSE",
+        "GOOGLE_API_KEY": "loadtest",
+        "GEMINI_API_KEY": "loadtest",
+        "GOOGLE_GEMINI_BASE_URL": f"http://127.0.0.1:{ports['model']}",
+        "LOG_LEVEL": "WARNING",
+        "INFORMANT_SERVER_URL": f"http://127.0.0.1:{ports['informant_mcp']}",
+    }
+    processes: Dict[str, subprocess.Popen] = {}
+    try:
+        # Dependencies first: the manager reads the agent cards of its remote agents at startup
+        for name, script in MCP_SERVERS.items():
+            env = {**base_env, "PORT": str(ports[name])}
+            env.pop("INFORMANT_DATA_DIR", None)
+            processes[name], log_path = start_process(name, script, env, out_dir)
+            await wait_ready(f"http://127.0.0.1:{ports[name]}/mcp", processes[name], log_path)
+
+        for name, (source, _) in [*SUB_AGENTS.items(), (MANAGER, ("agent/" + MANAGER, None))]:
+            config_path = write_agent_config(name, source, out_dir, ports, args.workers)
+            env = {
+                **base_env,
+                "PORT": str(ports[name]),
+                "AGENT_CONFIG_PATH": config_path,
+                "AGENT_CACHE_DIR": os.path.join(out_dir, name, "cache"),
+            }
+            processes[name], log_path = start_process(name, f"{source}/__main__.py", env, out_dir)
+            await wait_ready(f"http://127.0.0.1:{ports[name]}/metrics", processes[name], log_path)
+
+        manager_url = f"http://127.0.0.1:{ports[MANAGER]}/"
+        # One conversation warms up the MCP sessions and connection pools
+        await drive(manager_url, 1, 1, 1, HopRecorder())
+        recorder.samples.clear()
+        model.calls.clear()
+
+        completed, failed, duration, routing = await drive(
+            manager_url, args.concurrency, args.conversations, args.turns, recorder,
+            keep_alive=args.keep_alive,
+        )
+        samples = recorder.samples + [
+            (f"{agent}->model generateContent", seconds) for agent, seconds in model.calls
+        ]
+        return {
+            "config": vars(args),
+            "completed": completed,
+            "failed": failed,
+            "duration_seconds": round(duration, 2),
+            "requests_per_second": round(completed / duration, 2) if duration else 0.0,
+            "routing": routing,
+            "hops": summarize(samples),
+            "peak_memory_mb": {name: peak_memory_mb(process.pid) for name, process in processes.items()},
+            "work_dir": out_dir,
+        }
+    finally:
+        for process in processes.values():
+            process.send_signal(signal.SIGINT)
+        for process in processes.values():
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        for server, task in servers:
+            server.should_exit = True
+            await task
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=8, help="conversations running at once")
+    parser.add_argument("--conversations", type=int, default=40, help="conversations to run")
+    parser.add_argument("--turns", type=int, default=2, help="messages per conversation")
+    parser.add_argument("--model-latency-ms", type=float, default=200.0, help="mean latency of the stand-in model")
+    parser.add_argument("--model-jitter-ms", type=float, default=50.0, help="latency jitter of the stand-in model")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the stand-in model latencies")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes of every agent")
+    parser.add_argument(
+        "--keep-alive", action="store_true", help="reuse client connections (the same for every --workers)"
+    )
+    parser.add_argument("--base-port", type=int, default=18080, help="first of the 10 ports used")
+    parser.add_argument("--work-dir", help="directory for configs, data and logs (default: a temporary one)")
+    parser.add_argument("--output", help="write the report as JSON to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
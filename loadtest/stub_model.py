@@ -0,0 +1,213 @@
+"""Deterministic stand-in for the Gemini API used by the load-test harness.
+
+It answers `generateContent` and `streamGenerateContent` with a scripted
+conversation: a user message is answered with a call to one of the declared
+tools, chosen from the text, and a tool result with a short final answer.
+Streamed final answers come in several chunks, the first one after a part of
+the latency, like the tokens of a real model.
+The latency of every answer is derived from the seed, the agent and the user
+text, so two runs with the same seed send the same answers at the same pace.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+CASE_ID_PATTERN = re.compile(r"\bCASE-\d+\b", re.IGNORECASE)
+INFORMANT_ID_PATTERN = re.compile(r"\bINF-\d+\b", re.IGNORECASE)
+
+# Chunks of a streamed final answer, and the share of the latency before the first one
+STREAM_CHUNKS = 4
+FIRST_CHUNK_SHARE = 0.25
+
+SPECIALTIES = {
+    "drug": "drug_trafficking",
+    "fraud": "financial_fraud",
+    "jewel": "jewelry_theft",
+    "disappear": "disappearances",
+}
+
+
+def _user_text(contents: List[Dict[str, Any]]) -> str:
+    for content in reversed(contents):
+        if content.get("role") == "user":
+            texts = [part["text"] for part in content.get("parts", []) if "text" in part]
+            if texts:
+                return " ".join(texts)
+    return ""
+
+
+def _declared_tools(body: Dict[str, Any]) -> List[str]:
+    return [
+        declaration["name"]
+        for tool in body.get("tools") or []
+        for declaration in tool.get("functionDeclarations") or []
+    ]
+
+
+def _manager_call(text: str, tools: List[str]) -> Tuple[str, Dict[str, Any]]:
+    lowered = text.lower()
+    wants_case = "case" in lowered or "evidence" in lowered
+    wants_informant = "informant" in lowered or "meeting" in lowered
+    if wants_case and wants_informant and "send_messages_parallel" in tools:
+        return "send_messages_parallel", {
+            "delegations": [
+                {"agent_name": "case_agent", "task": text},
+                {"agent_name": "informant_agent", "task": text},
+            ]
+        }
+    agent_name = "informant_agent" if wants_informant and not wants_case else "case_agent"
+    return "send_message", {"agent_name": agent_name, "task": text}
+
+
+def _case_call(text: str, tools: List[str]) -> Tuple[str, Dict[str, Any]]:
+    match = CASE_ID_PATTERN.search(text)
+    if match:
+        return "get_case_details", {"case_id": match.group(0).upper()}
+    return "search_cases_by_status", {"status": "open"}
+
+
+def _informant_call(text: str, tools: List[str]) -> Tuple[str, Dict[str, Any]]:
+    match = INFORMANT_ID_PATTERN.search(text)
+    if match:
+        return "get_informant_profile", {"informant_id": match.group(0).upper()}
+    lowered = text.lower()
+    for keyword, specialty in SPECIALTIES.items():
+        if keyword in lowered:
+            return "find_informants_by_specialty", {"specialty": specialty}
+    return "get_network_statistics", {}
+
+
+# Tool that identifies each agent, and how it picks its first call
+SCRIPTS: List[Tuple[str, str, Callable[[str, List[str]], Tuple[str, Dict[str, Any]]]]] = [
+    ("manager", "send_message", _manager_call),
+    ("case_agent", "get_case_details", _case_call),
+    ("informant_agent", "find_informants_by_specialty", _informant_call),
+]
+
+
+class ScriptedModel:
+    """Scripted answers and simulated latency of the stand-in model.
+
+    Attributes:
+        latency_ms (float): Mean latency of an answer.
+        jitter_ms (float): Maximum deviation from the mean latency.
+        seed (int): Seed mixed into the per-request latency.
+        calls (List[Tuple[str, float]]): Agent and service time of every call.
+    """
+
+    def __init__(self, latency_ms: float = 200.0, jitter_ms: float = 50.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.seed = seed
+        self.calls: List[Tuple[str, float]] = []
+
+    def _latency(self, key: str) -> float:
+        digest = hashlib.sha256(f"{self.seed}|{key}".encode()).digest()
+        rng = random.Random(digest)
+        return max(self.latency_ms + rng.uniform(-self.jitter_ms, self.jitter_ms), 0.0) / 1000
+
+    def answer(self, body: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Return the calling agent and the scripted answer to a request."""
+        tools = _declared_tools(body)
+        agent, script = "unknown", None
+        for name, marker, candidate in SCRIPTS:
+            if marker in tools:
+                agent, script = name, candidate
+                break
+
+        contents = body.get("contents") or []
+        last_parts = contents[-1].get("parts", []) if contents else []
+        results = [part["functionResponse"] for part in last_parts if "functionResponse" in part]
+        if results or script is None:
+            summary = json.dumps(results[0].get("response", {}), sort_keys=True)[:400] if results else ""
+            part = {"text": f"Findings: {summary}"}
+        else:
+            name, args = script(_user_text(contents), tools)
+            part = {"functionCall": {"name": name, "args": args}}
+
+        prompt_tokens = len(json.dumps(contents)) // 4
+        return agent, {
+            "candidates": [
+                {
+                    "content": {"role": "model", "parts": [part]},
+                    "finishReason": "STOP",
+                    "index": 0,
+                }
+            ],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": 20,
+                "totalTokenCount": prompt_tokens + 20,
+            },
+            "modelVersion": "stub",
+        }
+
+    async def handle(self, request: Request) -> Response:
+        started = time.perf_counter()
+        body = await request.json()
+        agent, answer = self.answer(body)
+        # Keyed on what the script depends on, not on generated call ids
+        stage = "final" if "text" in answer["candidates"][0]["content"]["parts"][0] else "call"
+        latency = self._latency(f"{agent}|{stage}|{_user_text(body.get('contents') or [])}")
+
+        if request.path_params["method"] == "streamGenerateContent":
+            chunks = _chunks(answer) if stage == "final" else [answer]
+
+            async def events():
+                for index, chunk in enumerate(chunks):
+                    if len(chunks) == 1:
+                        await asyncio.sleep(latency)
+                    elif index == 0:
+                        await asyncio.sleep(latency * FIRST_CHUNK_SHARE)
+                    else:
+                        await asyncio.sleep(latency * (1 - FIRST_CHUNK_SHARE) / (len(chunks) - 1))
+                    yield f"data: {json.dumps(chunk)}\r\n\r\n"
+                self.calls.append((agent, time.perf_counter() - started))
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await asyncio.sleep(latency)
+        self.calls.append((agent, time.perf_counter() - started))
+        return JSONResponse(answer)
+
+
+def _chunks(answer: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Split a text answer into STREAM_CHUNKS streamed responses; the last one ends it."""
+    text = answer["candidates"][0]["content"]["parts"][0]["text"]
+    size = -(-len(text) // STREAM_CHUNKS)
+    pieces = [text[start : start + size] for start in range(0, len(text), size)] or [text]
+    chunks = []
+    for index, piece in enumerate(pieces):
+        last = index == len(pieces) - 1
+        candidate = {"content": {"role": "model", "parts": [{"text": piece}]}, "index": 0}
+        if last:
+            candidate["finishReason"] = "STOP"
+        chunk = {"candidates": [candidate], "modelVersion": answer["modelVersion"]}
+        if last:
+            chunk["usageMetadata"] = answer["usageMetadata"]
+        chunks.append(chunk)
+    return chunks
+
+
+def build_app(model: ScriptedModel) -> Starlette:
+    """Build the ASGI application serving a scripted model."""
+
+    async def generate(request: Request) -> Response:
+        return await model.handle(request)
+
+    return Starlette(
+        routes=[
+            Route("/{version}/models/{model}:{method}", generate, methods=["POST"]),
+        ]
+    )
+
@@ -1,16 +1,44 @@
 # server.py
+import asyncio
 import logging
 from mcp.server.fastmcp import FastMCP
 from mcp.types import PromptMessage, TextContent
 from typing import List, Dict, Any, Optional, Union
 import json
+import os
 import uuid
 import datetime
+import time
+from urllib.parse import quote
+
+import httpx
+
+from agent_common.logs import env_config, setup_logging
+from agent_common.spatial import QuadTree, point_of
+from agent_common.tabular import check_response_format, columnar
+from agent_common.tool_metrics import instrument_tools
+from agent_common.tracing import env_tracing_config, inject_trace_context, setup_tracing
 
 SERVER_HOST = "0.0.0.0"
-SERVER_PORT = 8080
+SERVER_PORT = int(os.getenv("PORT", "8080"))
 SERVER_PATH = "/mcp"
 
+# Informant management server whose case intelligence is joined into the dossiers
+INFORMANT_SERVER_URL = os.getenv("INFORMANT_SERVER_URL")
+INTELLIGENCE_TIMEOUT = 5.0
+
+# Limits of the searches of informants near a case
+DEFAULT_RADIUS_KM = 2.0
+MAX_RADIUS_KM = 50.0
+MAX_NEARBY_INFORMANTS = 50
+# Age of the informant replica after which a search refreshes it in the background
+REPLICA_REFRESH_SECONDS = float(os.getenv("INFORMANT_REPLICA_REFRESH_SECONDS", "5"))
+# The first synchronization sends every informant
+REPLICA_SYNC_TIMEOUT = 60.0
+
+# Set up before FastMCP, which only configures logging when nothing else did
+setup_logging(env_config())
+setup_tracing(env_tracing_config())
 logger = logging.getLogger(__name__)
 
 mcp = FastMCP(
@@ -23,6 +51,36 @@ logger.info("Case Management FastMCP server object created")
 CASES_DB = {}
 EVIDENCE_DB = {}
 REPORTS_DB = {}
+# Reports of every case: case id -> report ids
+REPORTS_BY_CASE = {}
+
+# Columns of the case listings in the columnar response format
+CASE_COLUMNS = (
+    "id",
+    "title",
+    "type",
+    "status",
+    "priority",
+    "date_created",
+    "assigned_detective",
+    "location",
+    "coordinates",
+    "description",
+    "evidence_ids",
+    "suspects",
+)
+
+# Keep-alive connection to the informant management server, opened on first use
+_informant_client = None
+
+# Replica of the informant locations of the informant management server, so the
+# searches near a case are answered here: informant id -> point and summary
+INFORMANT_LOCATIONS = QuadTree()
+INFORMANT_SUMMARIES = {}
+# Position of the replica in the change log of the informant server
+_replica = {"epoch": None, "version": 0, "synced_at": 0.0}
+# Synchronization running in the background, if any
+_replica_sync = None
 
 # Sample data
 SAMPLE_CASES = [
@@ -38,6 +96,8 @@ SAMPLE_CASES = [
         "evidence_ids": ["EVID-001", "EVID-002"],
         "suspects": ["Unknown suspect - fingerprints"],
         "location": "Mayor Street 15, Downtown",
+        # On the city map, in km east (x) and north (y) of the city centre
+        "coordinates": {"x": 0.3, "y": -0.2},
     },
     {
         "id": "CASE-002",
@@ -51,6 +111,7 @@ SAMPLE_CASES = [
         "evidence_ids": ["EVID-003", "EVID-004"],
         "suspects": ["Carlos Mendoza - CFO", "Ana López - Accountant"],
         "location": "TechCorp Offices, Industrial Park",
+        "coordinates": {"x": 5.2, "y": 3.8},
     },
     {
         "id": "CASE-003",
@@ -64,6 +125,7 @@ SAMPLE_CASES = [
         "evidence_ids": ["EVID-005"],
         "suspects": [],
         "location": "Plaza Norte Shopping Mall",
+        "coordinates": {"x": -2.5, "y": 3.2},
     },
 ]
 
@@ -143,7 +205,7 @@ def get_case_details(case_id: str) -> Dict[str, Any]:
     """
     Gets complete details of a specific case by its ID.
     """
-    print(f"Tool call: get_case_details for case ID: {case_id}")
+    logger.info(f"Tool call: get_case_details for case ID: {case_id}")
 
     if case_id not in CASES_DB:
         return {"error": f"Case with ID '{case_id}' not found."}
@@ -161,11 +223,25 @@ def get_case_details(case_id: str) -> Dict[str, Any]:
 
 
 @mcp.tool()
-def search_cases_by_type(case_type: str) -> List[Dict[str, Any]]:
+def search_cases_by_type(
+    case_type: str, response_format: str = "rows"
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Search cases by type (theft, fraud, disappearance, homicide, etc.).
+    With response_format "columns" the cases come as {"columns": [...], "rows": [[...], ...]},
+    one array of values per case in column order, which is more compact.
     """
-    print(f"Tool call: search_cases_by_type for type: {case_type}")
+    logger.info(f"Tool call: search_cases_by_type for type: {case_type}")
+
+    error = check_response_format(response_format)
+    if error:
+        return error
+    if response_format == "columns":
+        case_type = case_type.lower()
+        return columnar(
+            CASE_COLUMNS,
+            (case for case in CASES_DB.values() if case["type"].lower() == case_type),
+        )
 
     matching_cases = []
     for case in CASES_DB.values():
@@ -180,11 +256,25 @@ def search_cases_by_type(case_type: str) -> List[Dict[str, Any]]:
 
 
 @mcp.tool()
-def search_cases_by_status(status: str) -> List[Dict[str, Any]]:
+def search_cases_by_status(
+    status: str, response_format: str = "rows"
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Search cases by status (open, closed, under_investigation, archived).
+    With response_format "columns" the cases come as {"columns": [...], "rows": [[...], ...]},
+    one array of values per case in column order, which is more compact.
     """
-    print(f"Tool call: search_cases_by_status for status: {status}")
+    logger.info(f"Tool call: search_cases_by_status for status: {status}")
+
+    error = check_response_format(response_format)
+    if error:
+        return error
+    if response_format == "columns":
+        status = status.lower()
+        return columnar(
+            CASE_COLUMNS,
+            (case for case in CASES_DB.values() if case["status"].lower() == status),
+        )
 
     matching_cases = []
     for case in CASES_DB.values():
@@ -203,7 +293,7 @@ def get_evidence_details(evidence_id: str) -> Dict[str, Any]:
     """
     Gets details of a specific evidence by its ID.
     """
-    print(f"Tool call: get_evidence_details for evidence ID: {evidence_id}")
+    logger.info(f"Tool call: get_evidence_details for evidence ID: {evidence_id}")
 
     if evidence_id not in EVIDENCE_DB:
         return {"error": f"Evidence with ID '{evidence_id}' not found."}
@@ -217,7 +307,7 @@ def analyze_evidence(evidence_id: str, analysis_type: str) -> Dict[str, Any]:
     Performs specific analysis of evidence.
     Analysis types: forensic, digital, financial, psychological.
     """
-    print(
+    logger.info(
         f"Tool call: analyze_evidence for evidence ID: {evidence_id}, analysis type: {analysis_type}"
     )
 
@@ -269,7 +359,7 @@ def create_case_report(
     """
     Creates an official case report with findings and recommendations.
     """
-    print(f"Tool call: create_case_report for case ID: {case_id}")
+    logger.info(f"Tool call: create_case_report for case ID: {case_id}")
 
     if case_id not in CASES_DB:
         return {"error": f"Case with ID '{case_id}' not found."}
@@ -288,6 +378,7 @@ def create_case_report(
     }
 
     REPORTS_DB[report_id] = report
+    REPORTS_BY_CASE.setdefault(case_id, []).append(report_id)
 
     return {
         "status": "success",
@@ -301,7 +392,7 @@ def get_case_status(case_id: str) -> Dict[str, Any]:
     """
     Checks the current status of a case.
     """
-    print(f"Tool call: get_case_status for case ID: {case_id}")
+    logger.info(f"Tool call: get_case_status for case ID: {case_id}")
 
     if case_id not in CASES_DB:
         return {"error": f"Case with ID '{case_id}' not found."}
@@ -325,7 +416,7 @@ def update_case_status(case_id: str, new_status: str, notes: str) -> Dict[str, A
     Updates the status of a case with explanatory notes.
     Valid statuses: open, under_investigation, closed, archived.
     """
-    print(
+    logger.info(
         f"Tool call: update_case_status for case ID: {case_id} to status: {new_status}"
     )
 
@@ -366,6 +457,168 @@ def update_case_status(case_id: str, new_status: str, notes: str) -> Dict[str, A
     }
 
 
+def informant_client() -> httpx.AsyncClient:
+    """Returns the connection to the informant management server, opening it on first use"""
+    global _informant_client
+    if _informant_client is None:
+        _informant_client = httpx.AsyncClient(
+            base_url=INFORMANT_SERVER_URL,
+            timeout=INTELLIGENCE_TIMEOUT,
+            event_hooks={"request": [inject_trace_context]},
+        )
+    return _informant_client
+
+
+async def fetch_case_intelligence(case_id: str) -> Dict[str, Any]:
+    """Gets the informant intelligence about a case from the informant management server"""
+    if not INFORMANT_SERVER_URL:
+        return {"error": "Informant intelligence is not available: INFORMANT_SERVER_URL not set"}
+
+    try:
+        response = await informant_client().get(f"/cases/{quote(case_id, safe='')}/intelligence")
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPError as e:
+        logger.warning(f"Could not get the informant intelligence of {case_id}: {e!r}")
+        return {"error": f"Informant intelligence is not available: {e}"}
+
+
+@mcp.tool()
+async def get_case_dossier(case_id: str) -> Dict[str, Any]:
+    """
+    Gets the complete dossier of a case in one call: case details, all its evidence,
+    its reports and what the informant network knows about it (tips, informants who
+    gave them and their upcoming meetings). Use it to brief on a case.
+    """
+    logger.info(f"Tool call: get_case_dossier for case ID: {case_id}")
+
+    if case_id not in CASES_DB:
+        return {"error": f"Case with ID '{case_id}' not found."}
+
+    case = CASES_DB[case_id]
+    evidence = [
+        EVIDENCE_DB[evid_id]
+        for evid_id in case.get("evidence_ids", [])
+        if evid_id in EVIDENCE_DB
+    ]
+    reports = [REPORTS_DB[report_id] for report_id in REPORTS_BY_CASE.get(case_id, [])]
+
+    return {
+        "case": case,
+        "evidence": evidence,
+        "evidence_pending_analysis": sum(
+            1 for item in evidence if item["status"] != "analyzed"
+        ),
+        "reports": reports,
+        "informant_intelligence": await fetch_case_intelligence(case_id),
+    }
+
+
+async def sync_informant_locations() -> None:
+    """Applies the informant changes logged by the informant server since the last synchronization"""
+    response = await informant_client().get(
+        "/informants/locations",
+        params={"since": _replica["version"], "epoch": _replica["epoch"] or ""},
+        timeout=REPLICA_SYNC_TIMEOUT,
+    )
+    response.raise_for_status()
+    changes = response.json()
+    if changes["full"]:
+        INFORMANT_SUMMARIES.clear()
+        for informant_id in list(INFORMANT_LOCATIONS.points):
+            INFORMANT_LOCATIONS.remove(informant_id)
+    for informant in changes["informants"]:
+        point = informant.pop("point")
+        if point is None:
+            INFORMANT_LOCATIONS.remove(informant["id"])
+            INFORMANT_SUMMARIES.pop(informant["id"], None)
+        else:
+            INFORMANT_LOCATIONS.add(informant["id"], tuple(point))
+            INFORMANT_SUMMARIES[informant["id"]] = informant
+    _replica.update(epoch=changes["epoch"], version=changes["version"], synced_at=time.monotonic())
+
+
+async def _sync_in_background() -> None:
+    try:
+        await sync_informant_locations()
+    except (httpx.HTTPError, KeyError, ValueError) as e:
+        logger.warning(f"Could not refresh the informant locations: {e!r}")
+
+
+async def informant_locations_ready() -> Optional[str]:
+    """
+    Makes sure the informant replica can answer: the first search waits for it,
+    the next ones refresh it in the background once it is older than
+    REPLICA_REFRESH_SECONDS. Returns why it cannot answer, if it cannot.
+    """
+    global _replica_sync
+    if not INFORMANT_SERVER_URL:
+        return "Informants are not available: INFORMANT_SERVER_URL not set"
+    if _replica["epoch"] is None:
+        # Concurrent first searches wait for the same synchronization
+        if _replica_sync is None or _replica_sync.done():
+            _replica_sync = asyncio.create_task(sync_informant_locations())
+        try:
+            await asyncio.shield(_replica_sync)
+        except (httpx.HTTPError, KeyError, ValueError) as e:
+            logger.warning(f"Could not get the informant locations: {e!r}")
+            return f"Informants are not available: {e}"
+    elif time.monotonic() - _replica["synced_at"] > REPLICA_REFRESH_SECONDS and (
+        _replica_sync is None or _replica_sync.done()
+    ):
+        _replica_sync = asyncio.create_task(_sync_in_background())
+    return None
+
+
+@mcp.tool()
+async def find_informants_near(
+    case_id: str, radius_km: float = DEFAULT_RADIUS_KM, active_only: bool = True
+) -> Dict[str, Any]:
+    """
+    Finds the informants who operate within radius_km kilometres of the location of a case,
+    closest first, with their distance. Only active informants unless active_only is false.
+    At most 50 are returned; `truncated` tells whether there are more.
+    """
+    logger.info(f"Tool call: find_informants_near for case ID: {case_id}, radius: {radius_km} km")
+
+    if case_id not in CASES_DB:
+        return {"error": f"Case with ID '{case_id}' not found."}
+    case = CASES_DB[case_id]
+    point = point_of(case.get("coordinates"))
+    if point is None:
+        return {"error": f"Case {case_id} has no coordinates for its location '{case.get('location')}'"}
+    if not 0 < radius_km <= MAX_RADIUS_KM:
+        return {"error": f"radius_km must be greater than 0 and at most {MAX_RADIUS_KM:g}"}
+    error = await informant_locations_ready()
+    if error is not None:
+        return {"error": error}
+
+    accept = None
+    if active_only:
+        accept = lambda informant_id: INFORMANT_SUMMARIES[informant_id]["status"] == "active"
+    # One more than returned, to tell whether the list is complete
+    found = INFORMANT_LOCATIONS.nearest(point, MAX_NEARBY_INFORMANTS + 1, radius_km, accept)
+    informants = [
+        {**INFORMANT_SUMMARIES[informant_id], "distance_km": round(distance, 2)}
+        for distance, informant_id in found[:MAX_NEARBY_INFORMANTS]
+    ]
+    return {
+        "case_id": case_id,
+        "location": case.get("location"),
+        "point": {"x": point[0], "y": point[1]},
+        "radius_km": radius_km,
+        "informants": informants,
+        "count": len(informants),
+        "truncated": len(found) > MAX_NEARBY_INFORMANTS,
+    }
+
+
+# Calls, errors, latency and response size of every tool above, on /metrics
+instrument_tools(
+    mcp, stores={"cases": CASES_DB, "evidence": EVIDENCE_DB, "reports": REPORTS_DB}
+)
+
+
 # --- SERVER STARTUP SECTION ---
 if __name__ == "__main__":
     logger.info(
@@ -0,0 +1,108 @@
+# activity.py
+"""Rolling daily activity counters for informant effectiveness metrics."""
+import datetime
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+METRICS = ("tips_received", "tips_verified", "meetings_scheduled")
+
+# Number of days of history kept per group
+HISTORY_DAYS = 90
+
+
+class ActivityCounters:
+    """
+    Cumulative daily counters per group, kept in a ring buffer of HISTORY_DAYS + 1
+    days. The bucket of a day holds, for every metric, the number of events of
+    the group up to and including that day, so the total of any window is the
+    difference of two buckets: constant time per group, whatever the window.
+
+    Recording an event adds one to the buckets from its day to the last day
+    filled, a single bucket for an event of the current day. Buckets of days
+    without events are filled with the count of the day before when the group
+    is next written. Events dated in the future, such as meetings scheduled
+    ahead, are held back until their day arrives.
+    """
+
+    def __init__(self, history_days: int = HISTORY_DAYS):
+        self.history_days = history_days
+        # One more bucket than days, for the day before the longest window
+        self.slots = history_days + 1
+        # (kind, name) -> [last day filled, then per metric the cumulative count of every day]
+        self.groups: Dict[Tuple[str, str], List] = {}
+        # group kind -> names of its groups, in order of their first event
+        self.names: Dict[str, Dict[str, None]] = {}
+        self.upcoming: List[Tuple[int, str, Tuple[Tuple[str, str], ...]]] = []
+
+    def record(
+        self,
+        groups: Iterable[Tuple[str, str]],
+        metric: str,
+        day: str,
+        today: Optional[datetime.date] = None,
+    ) -> None:
+        """Counts one event of a metric on a day (YYYY-MM-DD) for every (kind, name) group"""
+        today_ordinal = (today or datetime.date.today()).toordinal()
+        ordinal = datetime.datetime.strptime(day[:10], "%Y-%m-%d").toordinal()
+        groups = tuple(groups)
+
+        if ordinal > today_ordinal:
+            heapq.heappush(self.upcoming, (ordinal, metric, groups))
+            return
+        if ordinal <= today_ordinal - self.history_days:
+            return
+        for kind, name in groups:
+            self._add(kind, name, METRICS.index(metric) + 1, ordinal, today_ordinal)
+
+    def _add(self, kind: str, name: str, column: int, ordinal: int, today_ordinal: int) -> None:
+        key = (kind, name)
+        if key in self.groups:
+            group = self.groups[key]
+        else:
+            # Every day of the ring holds the count before the first event: zero
+            group = [today_ordinal] + [[0] * self.slots for _ in METRICS]
+            self.groups[key] = group
+            self.names.setdefault(kind, {})[name] = None
+
+        last = group[0]
+        if today_ordinal > last:
+            # Days since the last event repeat its count
+            for counts in group[1:]:
+                count = counts[last % self.slots]
+                for filled in range(max(last + 1, today_ordinal - self.slots + 1), today_ordinal + 1):
+                    counts[filled % self.slots] = count
+            group[0] = last = today_ordinal
+
+        counts = group[column]
+        for filled in range(max(ordinal, last - self.slots + 1), last + 1):
+            counts[filled % self.slots] += 1
+
+    def _release_upcoming(self, today_ordinal: int) -> None:
+        while self.upcoming and self.upcoming[0][0] <= today_ordinal:
+            ordinal, metric, groups = heapq.heappop(self.upcoming)
+            if ordinal > today_ordinal - self.history_days:
+                for kind, name in groups:
+                    self._add(kind, name, METRICS.index(metric) + 1, ordinal, today_ordinal)
+
+    def totals(
+        self, kind: str, window_days: int, today: Optional[datetime.date] = None
+    ) -> Dict[str, Dict[str, int]]:
+        """Returns the metric totals of the last window_days days for every group of a kind"""
+        today_ordinal = (today or datetime.date.today()).toordinal()
+        self._release_upcoming(today_ordinal)
+
+        # The window is the difference between today and the day before it starts
+        before = today_ordinal - window_days
+        result = {}
+        for name in self.names.get(kind, {}):
+            group = self.groups.get((kind, name))
+            last = group[0]
+            end_slot = min(today_ordinal, last) % self.slots
+            start_slot = max(min(before, last), last - self.history_days) % self.slots
+            totals = {
+                metric: counts[end_slot] - counts[start_slot]
+                for metric, counts in zip(METRICS, group[1:])
+            }
+            if any(totals.values()):
+                result[name] = totals
+        return result
@@ -0,0 +1,140 @@
+# information_index.py
+"""Secondary indexes over information records for cross-source corroboration."""
+import bisect
+import datetime
+import itertools
+from typing import Any, Dict, Iterable, List
+
+from near_duplicates import tokenize
+
+# Only the rarest tokens of a report are looked up
+MAX_QUERY_TOKENS = 8
+
+# Tokens with more postings than this inside the time window are too common to corroborate
+MAX_TOKEN_POSTINGS = 1000
+
+# Reports about the same case read inside the time window, closest days first
+MAX_CASE_POSTINGS = 1000
+
+# Reports of the same type must share this many tokens to be considered related
+MIN_SHARED_TOKENS = 2
+
+UNKNOWN_CASE = "to_be_determined"
+
+
+class InformationIndex:
+    """
+    Posting lists keyed by case and by (information type, content token). Every
+    posting list is bucketed by date_received, so a time-window lookup only reads
+    the days inside the window instead of the whole history.
+    """
+
+    def __init__(self):
+        self.by_case: Dict[str, Dict[str, List[str]]] = {}
+        # Dates of the postings of every case, in order, to read the most recent first
+        self.case_dates: Dict[str, List[str]] = {}
+        self.by_type_token: Dict[tuple, Dict[str, List[str]]] = {}
+        self.token_counts: Dict[tuple, int] = {}
+        self.tokens: Dict[str, frozenset] = {}
+
+    @staticmethod
+    def _post(index: Dict[Any, Dict[str, List[str]]], key: Any, date: str, info_id: str):
+        index.setdefault(key, {}).setdefault(date, []).append(info_id)
+
+    @staticmethod
+    def _window(
+        index: Dict[Any, Dict[str, List[str]]], key: Any, dates: List[str]
+    ) -> Iterable[str]:
+        postings = index.get(key)
+        if not postings:
+            return
+        for date in dates:
+            yield from postings.get(date, ())
+
+    def add(self, information: Dict[str, Any]) -> None:
+        """Indexes an information record. Records already indexed are skipped."""
+        info_id = information["id"]
+        if info_id in self.tokens:
+            return
+        date = information["date_received"]
+        tokens = frozenset(tokenize(information["content"]))
+        self.tokens[info_id] = tokens
+
+        case = information.get("case_related", UNKNOWN_CASE)
+        if case != UNKNOWN_CASE:
+            if date not in self.by_case.get(case, ()):
+                bisect.insort(self.case_dates.setdefault(case, []), date)
+            self._post(self.by_case, case, date, info_id)
+        for token in tokens:
+            key = (information["information_type"], token)
+            self._post(self.by_type_token, key, date, info_id)
+            self.token_counts[key] = self.token_counts.get(key, 0) + 1
+
+    def recent_case_tips(self, case: str, limit: int) -> List[str]:
+        """Returns the ids of the most recent reports about a case, at most limit."""
+        postings = self.by_case.get(case)
+        if not postings:
+            return []
+        info_ids = (
+            info_id
+            for date in reversed(self.case_dates.get(case, ()))
+            for info_id in reversed(postings[date])
+        )
+        return list(itertools.islice(info_ids, limit))
+
+    def find_related(
+        self, information: Dict[str, Any], window_days: int
+    ) -> Dict[str, float]:
+        """
+        Finds reports about the same case, or of the same type with overlapping
+        content, received within window_days of the given report.
+        Returns information id -> relevance between 0 and 1.
+        """
+        received = datetime.datetime.strptime(information["date_received"], "%Y-%m-%d")
+        dates = [
+            (received + datetime.timedelta(days=offset)).strftime("%Y-%m-%d")
+            for offset in range(-window_days, window_days + 1)
+        ]
+        tokens = self.tokens.get(information["id"]) or frozenset(
+            tokenize(information["content"])
+        )
+
+        related = {}
+        case = information.get("case_related", UNKNOWN_CASE)
+        if case != UNKNOWN_CASE:
+            # Days closest to the report first, so a busy case keeps its nearest reports
+            nearest_dates = [
+                dates[index]
+                for index in sorted(range(len(dates)), key=lambda index: abs(index - window_days))
+            ]
+            for info_id in itertools.islice(
+                self._window(self.by_case, case, nearest_dates), MAX_CASE_POSTINGS
+            ):
+                related[info_id] = 0.5 + 0.5 * self._overlap(tokens, info_id)
+
+        # Reports of the same type sharing the rarest tokens of this one
+        keys = [(information["information_type"], token) for token in tokens]
+        keys.sort(key=lambda key: self.token_counts.get(key, 0))
+        shared = {}
+        for key in keys[:MAX_QUERY_TOKENS]:
+            postings = list(
+                itertools.islice(
+                    self._window(self.by_type_token, key, dates), MAX_TOKEN_POSTINGS + 1
+                )
+            )
+            if len(postings) > MAX_TOKEN_POSTINGS:
+                continue
+            for info_id in postings:
+                shared[info_id] = shared.get(info_id, 0) + 1
+
+        for info_id, count in shared.items():
+            if count >= MIN_SHARED_TOKENS and info_id not in related:
+                related[info_id] = self._overlap(tokens, info_id)
+
+        related.pop(information["id"], None)
+        return related
+
+    def _overlap(self, tokens: frozenset, info_id: str) -> float:
+        other = self.tokens.get(info_id, frozenset())
+        union = len(tokens | other)
+        return len(tokens & other) / union if union else 0.0
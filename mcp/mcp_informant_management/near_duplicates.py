@@ -0,0 +1,111 @@
+# near_duplicates.py
+"""MinHash signatures and an LSH index to detect near-duplicate informant tips."""
+import hashlib
+import re
+from array import array
+from typing import Dict, List, Optional, Tuple, Union
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Common English and Spanish words that carry no meaning for matching tips
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have",
+    "in", "is", "it", "of", "on", "or", "that", "the", "to", "was", "were", "with",
+    "al", "con", "de", "del", "el", "en", "es", "la", "las", "lo", "los", "por",
+    "que", "se", "su", "un", "una", "y",
+}
+
+# 16 bands of 4 rows: pairs above ~0.5 similarity share a bucket with high probability
+NUM_PERMUTATIONS = 64
+NUM_BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // NUM_BANDS
+
+# Estimated Jaccard similarity of the token sets from which two tips are near-duplicates
+DUPLICATE_THRESHOLD = 0.6
+
+# Only the most recent keys of a bucket are kept so lookups stay bounded
+MAX_BUCKET_SIZE = 16
+
+_DIGEST_SIZE = 4 * NUM_PERMUTATIONS
+
+
+def tokenize(text: str) -> set:
+    """Returns the distinct lowercase words of a text, without stopwords"""
+    return {
+        token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS
+    }
+
+
+class MinHashLSH:
+    """
+    Banded locality-sensitive hashing index over MinHash signatures.
+    Keys sharing at least one band bucket are candidates and are confirmed with
+    the similarity estimated from their full signatures.
+    """
+
+    def __init__(self):
+        # Buckets holding a single key store the key itself instead of a list
+        self.buckets: Dict[int, Union[str, List[str]]] = {}
+        self.signatures: Dict[str, array] = {}
+
+    @staticmethod
+    def signature(text: str) -> Optional[array]:
+        """
+        Computes the MinHash signature of a text.
+        Each token is hashed once with SHAKE-128 into NUM_PERMUTATIONS independent
+        32-bit values, and the signature keeps the minimum of every position.
+        A text without tokens (empty or only stopwords) has no signature: it is
+        similar to nothing, not to every other such text.
+        """
+        tokens = tokenize(text)
+        if not tokens:
+            return None
+        hashed = [
+            array("I", hashlib.shake_128(token.encode("utf-8")).digest(_DIGEST_SIZE))
+            for token in tokens
+        ]
+        return array("I", map(min, zip(*hashed)))
+
+    @staticmethod
+    def _band_keys(signature: array) -> List[int]:
+        return [
+            hash((band, *signature[band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND]))
+            for band in range(NUM_BANDS)
+        ]
+
+    @staticmethod
+    def similarity(first: array, second: array) -> float:
+        """Estimates the Jaccard similarity of two signatures"""
+        return sum(1 for a, b in zip(first, second) if a == b) / NUM_PERMUTATIONS
+
+    def query(
+        self, signature: array, threshold: float = DUPLICATE_THRESHOLD
+    ) -> List[Tuple[str, float]]:
+        """Returns (key, similarity) of indexed near-duplicates, most similar first"""
+        candidates = set()
+        for band_key in self._band_keys(signature):
+            bucket = self.buckets.get(band_key)
+            if isinstance(bucket, str):
+                candidates.add(bucket)
+            elif bucket:
+                candidates.update(bucket)
+
+        matches = []
+        for key in candidates:
+            score = self.similarity(signature, self.signatures[key])
+            if score >= threshold:
+                matches.append((key, score))
+        return sorted(matches, key=lambda x: x[1], reverse=True)
+
+    def insert(self, key: str, signature: array) -> None:
+        """Adds a signature to the index"""
+        self.signatures[key] = signature
+        for band_key in self._band_keys(signature):
+            bucket = self.buckets.get(band_key)
+            if bucket is None:
+                self.buckets[band_key] = key
+            elif isinstance(bucket, str):
+                self.buckets[band_key] = [bucket, key]
+            else:
+                # Replaced rather than appended to: the persisted index copies a bucket on write
+                self.buckets[band_key] = (bucket + [key])[-MAX_BUCKET_SIZE:]
@@ -0,0 +1,813 @@
+# persistence.py
+"""Write-ahead log and memory-mapped snapshot persistence for the in-memory stores."""
+import asyncio
+import bisect
+import hashlib
+import itertools
+import logging
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+from array import array
+from collections.abc import ItemsView, MutableMapping, ValuesView
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Every log entry is framed as payload length + CRC32 of the payload
+_FRAME_HEADER = struct.Struct("<II")
+
+# Snapshot files start with a magic number, then log sequence, directory offset and length
+_SNAPSHOT_MAGIC = b"INFSNAP1"
+_SNAPSHOT_HEADER = struct.Struct("<8sQQQ")
+# Every snapshot entry is framed as key length + value length, then both pickles
+_ENTRY_HEADER = struct.Struct("<II")
+
+# Log volume after which a new snapshot is taken
+SNAPSHOT_WAL_BYTES = 16 * 1024 * 1024
+
+_PICKLE_PROTOCOL = pickle.HIGHEST_PROTOCOL
+_MISSING = object()
+
+
+def key_hash(key: Any) -> int:
+    """Returns a 64-bit hash of a key that, unlike hash() of a str, is the same in every process"""
+    digest = hashlib.blake2b(repr(key).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class Section:
+    """
+    The entries of one mapping in a snapshot file, read in place.
+
+    Entries are (key, value) pickles in a data region, listed by two arrays in
+    key hash order: the hashes and the offsets of the entries. A key is found by
+    a binary search of the mapped hashes, so nothing is loaded before it is read.
+    """
+
+    def __init__(self, data: mmap.mmap, info: Tuple[int, ...]):
+        data_offset, data_length, hashes_offset, count, garbage = info
+        view = memoryview(data)
+        self.data = view[data_offset : data_offset + data_length]
+        self.hashes = view[hashes_offset : hashes_offset + 8 * count].cast("Q")
+        self.offsets = view[hashes_offset + 8 * count : hashes_offset + 16 * count].cast("Q")
+        self.count = count
+        # Bytes of the data region held by entries that were replaced or removed
+        self.garbage = garbage
+        self._views = (view, self.data, self.hashes, self.offsets)
+
+    def _bounds(self, index: int) -> Tuple[int, int, int]:
+        offset = self.offsets[index]
+        key_length, value_length = _ENTRY_HEADER.unpack_from(self.data, offset)
+        start = offset + _ENTRY_HEADER.size
+        return start, start + key_length, start + key_length + value_length
+
+    def find(self, key: Any) -> int:
+        """Returns the position of a key, or -1 if the section does not hold it"""
+        hashed = key_hash(key)
+        index = bisect.bisect_left(self.hashes, hashed)
+        while index < self.count and self.hashes[index] == hashed:
+            if self.key(index) == key:
+                return index
+            index += 1
+        return -1
+
+    def key(self, index: int) -> Any:
+        start, key_end, _ = self._bounds(index)
+        return pickle.loads(self.data[start:key_end])
+
+    def value(self, index: int) -> Any:
+        _, key_end, end = self._bounds(index)
+        return pickle.loads(self.data[key_end:end])
+
+    def entry(self, index: int) -> memoryview:
+        """Returns the framed entry at a position, as written in the data region"""
+        offset = self.offsets[index]
+        return self.data[offset : self._bounds(index)[2]]
+
+    def release(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+
+
+class SnapshotFile:
+    """A snapshot file mapped in memory, with its sections and the state of the indexes"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.seq, directory_offset, directory_length = _SNAPSHOT_HEADER.unpack_from(
+            self._data, 0
+        )
+        if magic != _SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a snapshot file")
+        directory = pickle.loads(
+            self._data[directory_offset : directory_offset + directory_length]
+        )
+        self.states: Dict[str, Dict[str, Any]] = directory["states"]
+        self._sections: Dict[tuple, Tuple[int, ...]] = directory["sections"]
+        self._opened: List[Section] = []
+
+    def section(self, name: tuple) -> Optional[Section]:
+        info = self._sections.get(name)
+        if info is None:
+            return None
+        section = Section(self._data, info)
+        self._opened.append(section)
+        return section
+
+    def close(self) -> None:
+        for section in self._opened:
+            section.release()
+        self._data.close()
+
+
+class MappedDict(MutableMapping):
+    """
+    Dict whose entries are read lazily from a section of a snapshot file.
+
+    Entries read or written since the process started are kept in memory; the
+    others stay in the mapped file until they are first read. Without a
+    section it is a plain dict, with the cost of a method call per access.
+
+    A tracked mapping remembers the keys reached with `[]`, `setdefault` or
+    `pop`, or written, since the last snapshot, and while a snapshot is being
+    written it saves the value a key had when the snapshot started before the
+    key is reached again (copy on write). A value reached with `get` or by
+    iterating must therefore not be changed in place.
+    """
+
+    def __init__(self, entries: Optional[Dict[Any, Any]] = None):
+        self._items: Dict[Any, Any] = dict(entries or {})
+        self._section: Optional[Section] = None
+        # Keys of the section removed since, which must not be read from it
+        self._deleted: set = set()
+        # Entries of the section neither read nor removed yet
+        self._unread = 0
+        # Tracking: keys changed since the last snapshot, None if not tracked
+        self._changed: Optional[set] = None
+        # Keys of the snapshot being written, and their saved values
+        self._frozen: Optional[set] = None
+        self._saved: Dict[Any, Optional[bytes]] = {}
+        self._lock: Optional[threading.Lock] = None
+
+    @property
+    def section(self) -> Optional[Section]:
+        return self._section
+
+    def attach(self, section: Section) -> None:
+        """Replaces the content with the entries of a snapshot section"""
+        self._items = {}
+        self._deleted = set()
+        self._section = section
+        self._unread = section.count
+        if self._changed is not None:
+            self._changed = set()
+
+    def track(self, lock: threading.Lock) -> None:
+        """Starts remembering changed keys; all the current ones are changed"""
+        self._lock = lock
+        self._changed = set(self._items)
+
+    # --- Snapshots of tracked mappings ---
+
+    def _encode(self, key: Any) -> Optional[bytes]:
+        # A changed key is in memory, unless it was removed
+        value = self._items.get(key, _MISSING)
+        if value is _MISSING:
+            return None
+        return pickle.dumps(value, protocol=_PICKLE_PROTOCOL)
+
+    def _touch(self, key: Any) -> None:
+        frozen = self._frozen
+        if frozen is not None and key in frozen and key not in self._saved:
+            with self._lock:
+                if key not in self._saved:
+                    self._saved[key] = self._encode(key)
+        self._changed.add(key)
+
+    def freeze(self) -> None:
+        """Starts a snapshot of the keys changed since the last one"""
+        self._frozen, self._changed, self._saved = self._changed, set(), {}
+
+    def frozen_entries(self) -> Iterator[Tuple[Any, Optional[bytes]]]:
+        """Yields every key of the snapshot being written with its value when it started, None if absent"""
+        for key in self._frozen:
+            with self._lock:
+                value = self._saved.get(key, _MISSING)
+                if value is _MISSING:
+                    value = self._saved[key] = self._encode(key)
+            yield key, value
+
+    def thaw(self, written: bool) -> None:
+        """Ends the snapshot; the keys it did not write are still changed"""
+        with self._lock:
+            if not written:
+                self._changed |= self._frozen
+            self._frozen, self._saved = None, {}
+
+    # --- Mapping ---
+
+    def _load(self, key: Any) -> Any:
+        if self._section is None or key in self._deleted:
+            raise KeyError(key)
+        index = self._section.find(key)
+        if index < 0:
+            raise KeyError(key)
+        value = self._items[key] = self._section.value(index)
+        self._unread -= 1
+        return value
+
+    def _peek(self, key: Any) -> Any:
+        try:
+            return self._items[key]
+        except KeyError:
+            return self._load(key)
+
+    def _in_section(self, key: Any) -> bool:
+        return (
+            self._section is not None
+            and key not in self._deleted
+            and self._section.find(key) >= 0
+        )
+
+    def __getitem__(self, key: Any) -> Any:
+        value = self._peek(key)
+        if self._changed is not None:
+            self._touch(key)
+        return value
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        try:
+            return self._peek(key)
+        except KeyError:
+            return default
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._items or self._in_section(key)
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        if self._changed is not None:
+            self._touch(key)
+        if key not in self._items and self._in_section(key):
+            # Replaced before being read: it no longer counts as unread
+            self._unread -= 1
+        self._items[key] = value
+
+    def __delitem__(self, key: Any) -> None:
+        if self._changed is not None:
+            self._touch(key)
+        if key in self._items:
+            del self._items[key]
+            if self._in_section(key):
+                self._deleted.add(key)
+        elif self._in_section(key):
+            self._deleted.add(key)
+            self._unread -= 1
+        else:
+            raise KeyError(key)
+
+    def __len__(self) -> int:
+        return len(self._items) + self._unread
+
+    def __iter__(self) -> Iterator[Any]:
+        yield from self._items
+        if self._unread:
+            for index in range(self._section.count):
+                key = self._section.key(index)
+                if key not in self._items and key not in self._deleted:
+                    yield key
+
+    def items(self) -> ItemsView:
+        return _MappedItems(self)
+
+    def values(self) -> ValuesView:
+        return _MappedValues(self)
+
+    def clear(self) -> None:
+        for key in list(self):
+            del self[key]
+
+    def __repr__(self) -> str:
+        return f"MappedDict({len(self)} entries)"
+
+
+class _MappedItems(ItemsView):
+    # Values reached by iterating are not marked as changed
+    def __iter__(self):
+        for key in self._mapping:
+            yield key, self._mapping._peek(key)
+
+
+class _MappedValues(ValuesView):
+    def __iter__(self):
+        for key in self._mapping:
+            yield self._mapping._peek(key)
+
+
+class _SnapshotWriter:
+    """Writes the sections of a snapshot file, merging a previous snapshot with the changes since"""
+
+    def __init__(self, f):
+        self.f = f
+        self.sections: Dict[tuple, Tuple[int, ...]] = {}
+        f.write(b"\0" * _SNAPSHOT_HEADER.size)
+
+    def _align(self) -> int:
+        padding = -self.f.tell() % 8
+        self.f.write(b"\0" * padding)
+        return self.f.tell()
+
+    def write_section(
+        self,
+        name: tuple,
+        previous: Optional[Section],
+        changes: Iterable[Tuple[Any, Optional[bytes]]],
+    ) -> None:
+        """
+        Writes a section holding the entries of a previous section with changes
+        applied, a None value removing the key. The data region of the previous
+        section is copied as is and new entries are appended to it, so only the
+        changes are encoded; it is rewritten without the replaced entries once
+        these take more space than the live ones.
+        """
+        ordered = sorted(
+            ((key_hash(key), key, value) for key, value in changes), key=lambda change: change[0]
+        )
+        hashes, offsets = array("Q"), array("Q")
+        entries: List[bytes] = []
+        previous_length = len(previous.data) if previous is not None else 0
+        garbage = previous.garbage if previous is not None else 0
+        position = previous_length
+        start = 0
+
+        for hashed, group in itertools.groupby(ordered, key=lambda change: change[0]):
+            group = list(group)
+            if previous is not None:
+                index = bisect.bisect_left(previous.hashes, hashed, start)
+                hashes.frombytes(previous.hashes[start:index].tobytes())
+                offsets.frombytes(previous.offsets[start:index].tobytes())
+                # Entries with the same hash are kept unless their key changed
+                changed_keys = [key for _, key, _ in group]
+                while index < previous.count and previous.hashes[index] == hashed:
+                    if previous.key(index) in changed_keys:
+                        garbage += len(previous.entry(index))
+                    else:
+                        hashes.append(hashed)
+                        offsets.append(previous.offsets[index])
+                    index += 1
+                start = index
+            for _, key, value in group:
+                if value is None:
+                    continue
+                key_bytes = pickle.dumps(key, protocol=_PICKLE_PROTOCOL)
+                entry = _ENTRY_HEADER.pack(len(key_bytes), len(value)) + key_bytes + value
+                hashes.append(hashed)
+                offsets.append(position)
+                entries.append(entry)
+                position += len(entry)
+        if previous is not None:
+            hashes.frombytes(previous.hashes[start:].tobytes())
+            offsets.frombytes(previous.offsets[start:].tobytes())
+
+        data_offset = self._align()
+        if garbage > position - garbage:
+            offsets = self._write_compacted(previous, entries, offsets, previous_length)
+            garbage = 0
+        else:
+            if previous is not None:
+                self.f.write(previous.data)
+            self.f.write(b"".join(entries))
+        data_length = self.f.tell() - data_offset
+
+        hashes_offset = self._align()
+        self.f.write(hashes.tobytes())
+        self.f.write(offsets.tobytes())
+        self.sections[name] = (data_offset, data_length, hashes_offset, len(hashes), garbage)
+
+    def _write_compacted(
+        self,
+        previous: Section,
+        entries: List[bytes],
+        offsets: array,
+        previous_length: int,
+    ) -> array:
+        new_entries = {}
+        position = previous_length
+        for entry in entries:
+            new_entries[position] = entry
+            position += len(entry)
+
+        compacted = array("Q")
+        written = 0
+        for offset in offsets:
+            if offset < previous_length:
+                key_length, value_length = _ENTRY_HEADER.unpack_from(previous.data, offset)
+                entry = previous.data[offset : offset + _ENTRY_HEADER.size + key_length + value_length]
+            else:
+                entry = new_entries[offset]
+            self.f.write(entry)
+            compacted.append(written)
+            written += len(entry)
+        return compacted
+
+    def finish(self, seq: int, states: Dict[str, Dict[str, Any]]) -> None:
+        directory = pickle.dumps(
+            {"sections": self.sections, "states": states}, protocol=_PICKLE_PROTOCOL
+        )
+        directory_offset = self._align()
+        self.f.write(directory)
+        self.f.seek(0)
+        self.f.write(
+            _SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, seq, directory_offset, len(directory))
+        )
+
+
+class PersistentStore:
+    """
+    Persists named in-memory tables and the derived indexes with an append-only
+    write-ahead log and periodic snapshots.
+
+    Every mutation of a table is logged as a full-record upsert, so replaying an
+    entry more than once is harmless. Entries are buffered and a background thread
+    writes and fsyncs them in batches (group commit), so tool calls never wait on
+    the disk; at most the batch being written is lost on a crash.
+
+    Tables are MappedDicts, and so are the dicts of the indexes, which the store
+    converts. A snapshot file holds a section per mapping, laid out to be used in
+    place: at startup the latest snapshot is memory-mapped, every mapping reads
+    its entries from it when they are first needed, and only the log entries
+    written after the snapshot are replayed. Restart time depends on the length
+    of the log tail, not on the size of the stores.
+
+    Snapshots are incremental and written by a background thread. The previous
+    snapshot is copied as is, with the records logged since then and the index
+    entries changed since then merged in. A snapshot starts between tool calls,
+    and the index mappings save the value of an entry before it changes while
+    the snapshot is written, so the snapshot is consistent with its log
+    sequence without pausing the server.
+    """
+
+    def __init__(
+        self,
+        data_dir: str,
+        tables: Dict[str, MappedDict],
+        indexes: Optional[Dict[str, Any]] = None,
+        on_replay: Optional[Callable[[str, str, Any, Any], None]] = None,
+        snapshot_wal_bytes: int = SNAPSHOT_WAL_BYTES,
+    ):
+        self.data_dir = data_dir
+        self.tables = tables
+        self.indexes = indexes or {}
+        self.on_replay = on_replay
+        self.snapshot_wal_bytes = snapshot_wal_bytes
+
+        self._seq = 0
+        self._pending: List[bytes] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._writer: Optional[threading.Thread] = None
+        self._segment = None
+        self._rotate = False
+        self._bytes_since_snapshot = 0
+        self._snapshot_seq = 0
+        self._snapshot_due = False
+        self._snapshotter: Optional[threading.Thread] = None
+        self._mapped: Optional[SnapshotFile] = None
+        # Encoded records logged since the last snapshot: table -> key -> pickle, None if removed
+        self._delta: Dict[str, Dict[str, Optional[bytes]]] = {name: {} for name in tables}
+
+        # Mappings of the indexes by (index name, attribute), "" for an index that is one
+        self._maps: Dict[Tuple[str, str], MappedDict] = {}
+        self._states: Dict[str, Any] = {}
+        capture_lock = threading.Lock()
+        for name, index in self.indexes.items():
+            if isinstance(index, MappedDict):
+                self._maps[(name, "")] = index
+                continue
+            if isinstance(index, dict):
+                raise TypeError(f"Index {name} must be a MappedDict to be restored in place")
+            self._states[name] = index
+            for attribute, value in vars(index).items():
+                if isinstance(value, dict):
+                    value = MappedDict(value)
+                    setattr(index, attribute, value)
+                if isinstance(value, MappedDict):
+                    self._maps[(name, attribute)] = value
+        for mapping in self._maps.values():
+            mapping.track(capture_lock)
+
+        os.makedirs(data_dir, exist_ok=True)
+
+    # --- Files ---
+
+    def _files(self, prefix: str, suffix: str) -> List[Tuple[int, str]]:
+        files = []
+        for name in os.listdir(self.data_dir):
+            if name.startswith(prefix) and name.endswith(suffix):
+                seq = int(name[len(prefix) : -len(suffix)])
+                files.append((seq, os.path.join(self.data_dir, name)))
+        return sorted(files)
+
+    def _segments(self) -> List[Tuple[int, str]]:
+        return self._files("wal-", ".log")
+
+    def _snapshots(self) -> List[Tuple[int, str]]:
+        return self._files("snapshot-", ".snap")
+
+    def _fsync_dir(self) -> None:
+        fd = os.open(self.data_dir, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _read_segment(path: str) -> Iterator[Tuple[int, Tuple[int, str, str, Optional[bytes]]]]:
+        """Yields the end offset and the entry of every frame, up to the first invalid one"""
+        if os.path.getsize(path) == 0:
+            return
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            offset = 0
+            while offset < len(data):
+                if offset + _FRAME_HEADER.size > len(data):
+                    logger.warning(f"Ignoring torn write at offset {offset} of {path}")
+                    return
+                length, checksum = _FRAME_HEADER.unpack_from(data, offset)
+                start = offset + _FRAME_HEADER.size
+                payload = data[start : start + length]
+                if len(payload) < length:
+                    logger.warning(f"Ignoring torn write at offset {offset} of {path}")
+                    return
+                if zlib.crc32(payload) != checksum:
+                    logger.warning(f"Ignoring log entries from offset {offset} of {path}: checksum mismatch")
+                    return
+                offset = start + length
+                yield offset, pickle.loads(payload)
+
+    # --- Recovery ---
+
+    def recover(self) -> Dict[str, Any]:
+        """Maps the latest snapshot and replays the log entries written after it"""
+        started = time.perf_counter()
+        for name in os.listdir(self.data_dir):
+            if name.endswith(".snap.tmp"):
+                os.remove(os.path.join(self.data_dir, name))
+
+        snapshots = self._snapshots()
+        if snapshots:
+            # Kept open for the life of the process: the mappings read from it
+            self._mapped = SnapshotFile(snapshots[-1][1])
+            self._snapshot_seq = self._mapped.seq
+            for name, table in self.tables.items():
+                section = self._mapped.section(("table", name))
+                if section is not None:
+                    table.attach(section)
+            for (name, attribute), mapping in self._maps.items():
+                section = self._mapped.section(("index", name, attribute))
+                if section is not None:
+                    mapping.attach(section)
+            for name, state in self._mapped.states.items():
+                if name in self._states:
+                    vars(self._states[name]).update(state)
+
+        # The records of a table missing from the snapshot all go in the next one
+        for name, table in self.tables.items():
+            if table.section is None:
+                self._delta[name] = {
+                    key: pickle.dumps(record, protocol=_PICKLE_PROTOCOL)
+                    for key, record in table.items()
+                }
+
+        replayed = self._replay()
+        return {
+            "snapshot_seq": self._snapshot_seq,
+            "replayed_entries": replayed,
+            "records": sum(len(table) for table in self.tables.values()),
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+    def _replay(self) -> int:
+        self._seq = self._snapshot_seq
+        replayed = 0
+        segments = self._segments()
+        for position, (_, path) in enumerate(segments):
+            end = 0
+            for end, (seq, table, key, payload) in self._read_segment(path):
+                if seq <= self._snapshot_seq:
+                    continue
+                record = None if payload is None else pickle.loads(payload)
+                previous = self.tables[table].get(key)
+                if record is None:
+                    self.tables[table].pop(key, None)
+                else:
+                    self.tables[table][key] = record
+                self._delta[table][key] = payload
+                if self.on_replay:
+                    self.on_replay(table, key, record, previous)
+                self._seq = max(self._seq, seq)
+                replayed += 1
+
+            if end < os.path.getsize(path):
+                # Cut at the first invalid frame, so that the log can be appended to again.
+                # Later segments would leave a gap in the sequence: they are set aside.
+                os.truncate(path, end)
+                for _, later in segments[position + 1 :]:
+                    logger.error(f"Setting aside {later}: it follows an invalid log entry")
+                    os.replace(later, f"{later}.discarded")
+                segments = segments[: position + 1]
+                break
+
+        # The remaining segments are the log volume written since the snapshot
+        self._bytes_since_snapshot = sum(os.path.getsize(path) for _, path in segments)
+        return replayed
+
+    # --- Logging ---
+
+    def start(self) -> None:
+        """Starts the background log writer"""
+        self._writer = threading.Thread(
+            target=self._writer_loop, name="wal-writer", daemon=True
+        )
+        self._writer.start()
+
+    def put(self, table: str, key: str) -> None:
+        """Logs the current version of a record"""
+        self._append(table, key, self.tables[table][key])
+
+    def delete(self, table: str, key: str) -> None:
+        """Logs the removal of a record"""
+        self._append(table, key, None)
+
+    def _append(self, table: str, key: str, record: Any) -> None:
+        encoded = None if record is None else pickle.dumps(record, protocol=_PICKLE_PROTOCOL)
+        with self._lock:
+            self._seq += 1
+            payload = pickle.dumps((self._seq, table, key, encoded), protocol=_PICKLE_PROTOCOL)
+            self._pending.append(
+                _FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+            )
+            self._delta[table][key] = encoded
+            self._bytes_since_snapshot += len(payload)
+            due = (
+                self._bytes_since_snapshot >= self.snapshot_wal_bytes
+                and not self._snapshot_due
+            )
+            if due:
+                self._snapshot_due = True
+        self._wakeup.set()
+
+        if due:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.snapshot()
+            else:
+                # Once the current tool call is over, when no index change is half done
+                loop.call_soon(self.snapshot)
+
+    def _writer_loop(self) -> None:
+        while True:
+            self._wakeup.wait(timeout=1.0)
+            self._wakeup.clear()
+
+            with self._lock:
+                batch, self._pending = self._pending, []
+                first_seq = self._seq - len(batch) + 1
+                rotate, self._rotate = self._rotate, False
+
+            if rotate or (batch and self._segment is None):
+                self._open_segment(first_seq)
+            if batch:
+                self._segment.write(b"".join(batch))
+                self._segment.flush()
+                os.fsync(self._segment.fileno())
+
+            if self._closed and not self._pending:
+                if self._segment is not None:
+                    self._segment.close()
+                return
+
+    def _open_segment(self, first_seq: int) -> None:
+        if self._segment is not None:
+            self._segment.close()
+        path = os.path.join(self.data_dir, f"wal-{first_seq:020d}.log")
+        self._segment = open(path, "ab")
+        self._fsync_dir()
+
+    def close(self) -> None:
+        """Writes the pending log entries, waits for a snapshot being written and stops the writer"""
+        if self._snapshotter is not None:
+            self._snapshotter.join()
+        self._closed = True
+        self._wakeup.set()
+        if self._writer is not None:
+            self._writer.join()
+
+    # --- Snapshots ---
+
+    def snapshot(self) -> None:
+        """
+        Starts writing a snapshot of the current state in a background thread.
+        Called between tool calls, so that no change of the indexes is half done.
+        """
+        if self._snapshotter is not None and self._snapshotter.is_alive():
+            # Tried again on the next log entry
+            with self._lock:
+                self._snapshot_due = False
+            return
+        with self._lock:
+            seq = self._seq
+            delta, self._delta = self._delta, {name: {} for name in self.tables}
+            self._rotate = True
+            self._bytes_since_snapshot = 0
+            self._snapshot_due = False
+        for mapping in self._maps.values():
+            mapping.freeze()
+        # Plain attributes of the indexes are small: they are copied now
+        states = {
+            name: pickle.loads(
+                pickle.dumps(
+                    {
+                        attribute: value
+                        for attribute, value in vars(index).items()
+                        if not isinstance(value, MappedDict)
+                    },
+                    protocol=_PICKLE_PROTOCOL,
+                )
+            )
+            for name, index in self._states.items()
+        }
+        self._wakeup.set()
+
+        self._snapshotter = threading.Thread(
+            target=self._write_snapshot, args=(seq, delta, states), name="snapshot-writer", daemon=True
+        )
+        self._snapshotter.start()
+        logger.info(f"Snapshot at log sequence {seq} started")
+
+    def _write_snapshot(
+        self, seq: int, delta: Dict[str, Dict[str, Optional[bytes]]], states: Dict[str, Any]
+    ) -> None:
+        started = time.perf_counter()
+        snapshots = self._snapshots()
+        previous = SnapshotFile(snapshots[-1][1]) if snapshots else None
+        path = os.path.join(self.data_dir, f"snapshot-{seq:020d}.snap")
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                writer = _SnapshotWriter(f)
+                for name in self.tables:
+                    writer.write_section(
+                        ("table", name),
+                        previous.section(("table", name)) if previous else None,
+                        delta[name].items(),
+                    )
+                for (name, attribute), mapping in self._maps.items():
+                    writer.write_section(
+                        ("index", name, attribute),
+                        previous.section(("index", name, attribute)) if previous else None,
+                        mapping.frozen_entries(),
+                    )
+                writer.finish(seq, states)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            self._fsync_dir()
+        except Exception:
+            logger.exception(f"Snapshot at log sequence {seq} failed")
+            # Its changes go in the next snapshot
+            with self._lock:
+                for name, entries in delta.items():
+                    for key, value in entries.items():
+                        self._delta[name].setdefault(key, value)
+            for mapping in self._maps.values():
+                mapping.thaw(written=False)
+            return
+        finally:
+            if previous is not None:
+                previous.close()
+
+        for mapping in self._maps.values():
+            mapping.thaw(written=True)
+        self._snapshot_seq = seq
+        self._cleanup(seq)
+        logger.info(
+            f"Snapshot at log sequence {seq} completed in {time.perf_counter() - started:.2f}s"
+        )
+
+    def _cleanup(self, snapshot_seq: int) -> None:
+        # Drop older snapshots and the log segments fully covered by the snapshot.
+        # A snapshot still mapped by the process stays readable until it exits.
+        for seq, path in self._snapshots():
+            if seq < snapshot_seq:
+                os.remove(path)
+        segments = self._segments()
+        for (_, path), (next_first_seq, _) in zip(segments, segments[1:]):
+            if next_first_seq <= snapshot_seq + 1:
+                os.remove(path)
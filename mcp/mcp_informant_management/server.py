@@ -1,17 +1,43 @@
 # server.py
+import bisect
 import logging
 from mcp.server.fastmcp import FastMCP
 from mcp.types import PromptMessage, TextContent
 from typing import List, Dict, Any, Optional, Union
 import json
+import os
 import uuid
 import datetime
 import random
+from collections import OrderedDict
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from activity import HISTORY_DAYS, ActivityCounters
+from information_index import UNKNOWN_CASE, InformationIndex
+from near_duplicates import MinHashLSH
+from persistence import MappedDict, PersistentStore
+
+from agent_common.logs import env_config, setup_logging
+from agent_common.spatial import QuadTree, point_of
+from agent_common.tabular import check_response_format, columnar
+from agent_common.tool_metrics import instrument_tools
+from agent_common.tracing import (
+    TRACER,
+    env_tracing_config,
+    extract_context,
+    setup_tracing,
+    traced,
+)
 
 SERVER_HOST = "0.0.0.0"
-SERVER_PORT = 8080
+SERVER_PORT = int(os.getenv("PORT", "8080"))
 SERVER_PATH = "/mcp"
 
+# Set up before FastMCP, which only configures logging when nothing else did
+setup_logging(env_config())
+setup_tracing(env_tracing_config())
 logger = logging.getLogger(__name__)
 
 mcp = FastMCP(
@@ -23,10 +49,82 @@ mcp = FastMCP(
 
 logger.info("Informant Management FastMCP server object created")
 
-# In-memory database for informants
-INFORMANTS_DB = {}
-MEETINGS_DB = {}
-INFORMATION_DB = {}
+# Directory for the write-ahead log and snapshots. Data is kept in memory only if unset.
+DATA_DIR = os.getenv("INFORMANT_DATA_DIR")
+STORE = None
+
+# In-memory database for informants, read from the latest snapshot as records are needed
+INFORMANTS_DB = MappedDict()
+MEETINGS_DB = MappedDict()
+INFORMATION_DB = MappedDict()
+
+# Availability index of scheduled meetings: (date, time) -> meeting id
+SLOT_INDEX = MappedDict()
+# Location bookings of scheduled meetings: (date, location) -> {hour: meeting id}
+LOCATION_INDEX = MappedDict()
+# Upcoming meetings of every informant: informant id -> [(date, time, meeting id)] in
+# date order, past ones dropped as new ones are scheduled
+INFORMANT_MEETINGS = MappedDict()
+
+# Near-duplicate detection over information content
+TIP_INDEX = MinHashLSH()
+# Near-duplicate clusters: cluster id -> information ids
+INFORMATION_CLUSTERS = MappedDict()
+
+# Case, type and content token indexes for cross-source corroboration
+INFORMATION_INDEX = InformationIndex()
+
+# Days around a report in which reports from other informants can corroborate it
+CORROBORATION_WINDOW_DAYS = 14
+# Initial confidence of a report according to its declared credibility
+CREDIBILITY_PRIOR = {"low": 0.3, "medium": 0.5, "high": 0.7}
+
+# Daily activity counters per informant, specialty and the whole network
+ACTIVITY = ActivityCounters()
+# Verification results that count as a verified tip
+VERIFIED_STATUSES = ("verified", "confirmed")
+
+# Most recent tips of a case included in its intelligence, the rest are only counted
+MAX_CASE_TIPS = 50
+# Tips about every case: case id -> (tip count, verified tip count)
+CASE_TIP_COUNTS = MappedDict()
+# Case intelligence served since the records it was built from last changed:
+# case id -> (day built, intelligence, informant ids), least recently used first
+INTELLIGENCE_CACHE: "OrderedDict[str, tuple]" = OrderedDict()
+# Cases whose cached intelligence names an informant: informant id -> case ids
+INTELLIGENCE_INFORMANTS: Dict[str, set] = {}
+MAX_CACHED_INTELLIGENCE = 1000
+
+# Informants and safe locations on the city map, by id and by name
+INFORMANT_LOCATIONS = QuadTree()
+SAFE_LOCATION_INDEX = QuadTree()
+# Changes of the informants since the process started, for the replica of their
+# locations on the case management server: informant id -> version of its last change,
+# oldest first. The epoch tells a replica built from another process to start over.
+LOCATION_CHANGES: "OrderedDict[str, int]" = OrderedDict()
+LOCATION_VERSION = 0
+LOCATION_EPOCH = uuid.uuid4().hex
+# Fields of an informant sent with its location
+LOCATION_FIELDS = ("code_name", "specialty", "reliability_level", "status", "location_area")
+
+# Limits for batch scheduling
+MAX_BATCH_SIZE = 200
+MAX_BATCH_WINDOW_DAYS = 31
+
+# Columns of the listings in the columnar response format. The success rate of
+# an informant is successful_tips / information_count, left to the reader
+SPECIALTY_COLUMNS = ("id", "code_name", "reliability_level", "status", "information_count", "successful_tips")
+RELIABILITY_COLUMNS = ("id", "code_name", "specialty", "information_count", "successful_tips")
+INFORMATION_HISTORY_COLUMNS = (
+    "id",
+    "information_type",
+    "content",
+    "credibility",
+    "date_received",
+    "case_related",
+    "verification_status",
+)
+MEETING_HISTORY_COLUMNS = ("id", "date", "time", "location", "purpose", "status", "security_level")
 
 # Available meeting times
 MEETING_TIMES = ["08:00", "10:00", "12:00", "14:00", "16:00", "18:00", "20:00", "22:00"]
@@ -42,6 +140,26 @@ SAFE_LOCATIONS = [
     "Museo de Arte - Sala Medieval",
 ]
 
+# Coordinates on the city map, in km east (x) and north (y) of the city centre
+SAFE_LOCATION_COORDINATES = {
+    "Café Central - Mesa del fondo": {"x": 0.2, "y": 0.3},
+    "Parque Municipal - Banco junto al lago": {"x": -1.2, "y": 1.8},
+    "Biblioteca Pública - Sala de lectura": {"x": 0.8, "y": -0.6},
+    "Centro Comercial - Food Court": {"x": -2.4, "y": 3.1},
+    "Estación de Tren - Sala de espera": {"x": 2.0, "y": -1.5},
+    "Hotel Plaza - Lobby": {"x": 1.3, "y": 1.2},
+    "Museo de Arte - Sala Medieval": {"x": -0.7, "y": -1.3},
+}
+# Centre of every area, where informants without coordinates of their own are placed
+AREA_COORDINATES = {
+    "centro_ciudad": {"x": 0.0, "y": 0.0},
+    "distrito_financiero": {"x": 1.5, "y": 1.0},
+    "centro_comercial": {"x": -2.5, "y": 3.0},
+    "suburbios": {"x": 6.0, "y": -5.0},
+    "puerto": {"x": -4.0, "y": -3.0},
+    "zona_industrial": {"x": 5.0, "y": 4.0},
+}
+
 # Sample data
 SAMPLE_INFORMANTS = [
     {
@@ -54,6 +172,7 @@ SAMPLE_INFORMANTS = [
         "handler": "Detective García",
         "status": "active",
         "location_area": "centro_ciudad",
+        "coordinates": {"x": 0.1, "y": 0.4},
         "information_count": 12,
         "successful_tips": 9,
     },
@@ -67,6 +186,7 @@ SAMPLE_INFORMANTS = [
         "handler": "Detective Martínez",
         "status": "active",
         "location_area": "distrito_financiero",
+        "coordinates": {"x": 1.6, "y": 0.9},
         "information_count": 8,
         "successful_tips": 5,
     },
@@ -80,6 +200,7 @@ SAMPLE_INFORMANTS = [
         "handler": "Detective Ruiz",
         "status": "active",
         "location_area": "centro_comercial",
+        "coordinates": {"x": -2.3, "y": 2.8},
         "information_count": 15,
         "successful_tips": 13,
     },
@@ -93,6 +214,7 @@ SAMPLE_INFORMANTS = [
         "handler": "Detective López",
         "status": "inactive",
         "location_area": "suburbios",
+        "coordinates": {"x": 6.2, "y": -4.7},
         "information_count": 3,
         "successful_tips": 1,
     },
@@ -165,19 +287,441 @@ SAMPLE_INFORMATION = [
 ]
 
 
+@traced("store.put")
+def persist(table: str, record_id: str) -> None:
+    """
+    Logs the current version of a record when persistence is enabled, and drops
+    the cached case intelligence built from it
+    """
+    invalidate_intelligence(table, record_id)
+    if table == "informants":
+        record_location_change(record_id)
+    if STORE is not None:
+        STORE.put(table, record_id)
+
+
+def record_location_change(informant_id: str) -> None:
+    """Adds a changed informant to the change log read by the location replicas"""
+    global LOCATION_VERSION
+    LOCATION_VERSION += 1
+    LOCATION_CHANGES.pop(informant_id, None)
+    LOCATION_CHANGES[informant_id] = LOCATION_VERSION
+
+
+def drop_cached_intelligence(case_id: str) -> None:
+    """Removes the cached intelligence of a case"""
+    cached = INTELLIGENCE_CACHE.pop(case_id, None)
+    if cached is None:
+        return
+    for informant_id in cached[2]:
+        cases = INTELLIGENCE_INFORMANTS.get(informant_id)
+        if cases is not None:
+            cases.discard(case_id)
+            if not cases:
+                del INTELLIGENCE_INFORMANTS[informant_id]
+
+
+def invalidate_intelligence(table: str, record_id: str) -> None:
+    """Drops the cached intelligence of the cases a changed record appears in"""
+    if table == "information":
+        drop_cached_intelligence(INFORMATION_DB[record_id].get("case_related"))
+    elif table in ("informants", "meetings"):
+        informant_id = record_id if table == "informants" else MEETINGS_DB[record_id]["informant_id"]
+        for case_id in list(INTELLIGENCE_INFORMANTS.get(informant_id, ())):
+            drop_cached_intelligence(case_id)
+
+
+def index_meeting(meeting: Dict[str, Any]) -> None:
+    """Adds a scheduled meeting to the availability indexes"""
+    if meeting["status"] != "scheduled":
+        return
+    SLOT_INDEX[(meeting["date"], meeting["time"])] = meeting["id"]
+    today = datetime.datetime.now().strftime("%Y-%m-%d")
+    if meeting["date"] >= today:
+        upcoming = INFORMANT_MEETINGS.setdefault(meeting["informant_id"], [])
+        del upcoming[: bisect.bisect_left(upcoming, (today,))]
+        bisect.insort(upcoming, (meeting["date"], meeting["time"], meeting["id"]))
+    LOCATION_INDEX.setdefault((meeting["date"], meeting["location"]), {})[
+        int(meeting["time"][:2])
+    ] = meeting["id"]
+
+
+def index_informant(informant: Dict[str, Any]) -> None:
+    """Places an informant on the map at its coordinates, or at the centre of its area"""
+    point = point_of(informant.get("coordinates")) or point_of(
+        AREA_COORDINATES.get(informant.get("location_area"))
+    )
+    if point is None:
+        INFORMANT_LOCATIONS.remove(informant["id"])
+    else:
+        INFORMANT_LOCATIONS.add(informant["id"], point)
+
+
+def resolve_point(point: Any) -> Optional[tuple]:
+    """
+    Returns the coordinates of a point given as {"x": ..., "y": ...}, an informant ID,
+    an area or a safe location name, or None if it is none of them
+    """
+    if not isinstance(point, str):
+        return point_of(point)
+    if point in INFORMANT_LOCATIONS:
+        return INFORMANT_LOCATIONS.points[point]
+    return point_of(AREA_COORDINATES.get(point) or SAFE_LOCATION_COORDINATES.get(point))
+
+
+def location_conflicts(date: str, time: str, location: str) -> List[str]:
+    """Returns the ids of scheduled meetings at a location less than 2 hours from the given time"""
+    hour = int(time[:2])
+    bookings = LOCATION_INDEX.get((date, location), {})
+    return [
+        meeting_id
+        for booked_hour, meeting_id in bookings.items()
+        if abs(booked_hour - hour) < 2
+    ]
+
+
+def new_record_id(prefix: str, table: Dict[str, Any]) -> str:
+    """Generates a record id with the given prefix that is not already in use"""
+    while True:
+        record_id = f"{prefix}-{uuid.uuid4().hex[:8].upper()}"
+        if record_id not in table:
+            return record_id
+
+
+@traced("index_information")
+def index_information(information: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Adds information to the near-duplicate index and links it to the cluster of
+    its most similar record. Returns the near-duplicates found.
+    """
+    INFORMATION_INDEX.add(information)
+
+    signature = TIP_INDEX.signature(information["content"])
+    if signature is None:
+        return []
+    matches = TIP_INDEX.query(signature)
+    TIP_INDEX.insert(information["id"], signature)
+
+    if not matches:
+        return []
+
+    best_match = INFORMATION_DB[matches[0][0]]
+    cluster_id = best_match.get("cluster_id")
+    if cluster_id is None:
+        cluster_id = new_record_id("CLUSTER", INFORMATION_CLUSTERS)
+        best_match["cluster_id"] = cluster_id
+        INFORMATION_CLUSTERS[cluster_id] = [best_match["id"]]
+        persist("information", best_match["id"])
+
+    information["cluster_id"] = cluster_id
+    INFORMATION_CLUSTERS[cluster_id].append(information["id"])
+    persist("clusters", cluster_id)
+
+    return [
+        {"information_id": info_id, "similarity": round(similarity, 2)}
+        for info_id, similarity in matches
+    ]
+
+
+def assign_batch_slots(candidates: List[List[tuple]]) -> Dict[int, tuple]:
+    """
+    Assigns at most one slot per request and one request per slot.
+    Requests are placed greedily in preference order, most constrained first. When all
+    candidate slots of a request are taken, earlier placements are moved along an
+    augmenting path to make room for it (repair step).
+    """
+    slot_owner = {}
+    assignment = {}
+
+    def augment(index, visited):
+        for slot in candidates[index]:
+            if slot in visited:
+                continue
+            visited.add(slot)
+            owner = slot_owner.get(slot)
+            if owner is None or augment(owner, visited):
+                slot_owner[slot] = index
+                assignment[index] = slot
+                return True
+        return False
+
+    for index in sorted(range(len(candidates)), key=lambda i: len(candidates[i])):
+        free_slot = next((s for s in candidates[index] if s not in slot_owner), None)
+        if free_slot is not None:
+            slot_owner[free_slot] = index
+            assignment[index] = free_slot
+        else:
+            augment(index, set())
+
+    return assignment
+
+
+@traced("corroborate_information")
+def corroborate_information(information: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Looks up reports from other informants about the same case, or of the same type
+    with overlapping content, within the corroboration window. Each informant counts
+    once with its most relevant report, weighted by its success rate.
+    """
+    related = INFORMATION_INDEX.find_related(information, CORROBORATION_WINDOW_DAYS)
+
+    best_by_informant = {}
+    for info_id, relevance in related.items():
+        source_id = INFORMATION_DB[info_id]["informant_id"]
+        if source_id == information["informant_id"]:
+            continue
+        if relevance > best_by_informant.get(source_id, (0.0, None))[0]:
+            best_by_informant[source_id] = (relevance, info_id)
+
+    # Each source independently lowers the chance that the report is wrong
+    disbelief = 1 - CREDIBILITY_PRIOR.get(information["credibility"], 0.5)
+    sources = []
+    for source_id, (relevance, info_id) in best_by_informant.items():
+        source = INFORMANTS_DB.get(source_id)
+        success_rate = (
+            source["successful_tips"] / max(source["information_count"], 1)
+            if source
+            else 0.0
+        )
+        disbelief *= 1 - relevance * success_rate
+        sources.append(
+            {
+                "information_id": info_id,
+                "informant_id": source_id,
+                "informant_code_name": INFORMATION_DB[info_id]["informant_code_name"],
+                "relevance": round(relevance, 2),
+                "success_rate": f"{success_rate * 100:.1f}%",
+            }
+        )
+
+    return {
+        "confidence": 1 - disbelief,
+        "sources": sorted(sources, key=lambda x: x["relevance"], reverse=True),
+    }
+
+
+def case_intelligence(case_id: str) -> Dict[str, Any]:
+    """
+    Gathers what the informant network knows about a case: its most recent tips,
+    the informants who gave them and their upcoming meetings. Built from the
+    indexes at the cost of the answer, whatever the size of the stores, then
+    cached until one of the records it was built from changes.
+    """
+    today = datetime.datetime.now().strftime("%Y-%m-%d")
+    cached = INTELLIGENCE_CACHE.get(case_id)
+    if cached is not None and cached[0] == today:
+        INTELLIGENCE_CACHE.move_to_end(case_id)
+        return cached[1]
+
+    tips = []
+    informant_ids = {}
+    for info_id in INFORMATION_INDEX.recent_case_tips(case_id, MAX_CASE_TIPS):
+        information = INFORMATION_DB.get(info_id)
+        if information is None:
+            continue
+        informant_ids[information["informant_id"]] = None
+        tips.append(
+            {
+                key: information.get(key)
+                for key in (
+                    "id",
+                    "informant_code_name",
+                    "information_type",
+                    "content",
+                    "credibility",
+                    "date_received",
+                    "verification_status",
+                    "cluster_id",
+                )
+            }
+        )
+
+    informants = []
+    meetings = []
+    for informant_id in informant_ids:
+        informant = INFORMANTS_DB.get(informant_id)
+        if informant is None:
+            continue
+        informants.append(
+            {
+                "id": informant_id,
+                "code_name": informant["code_name"],
+                "specialty": informant["specialty"],
+                "reliability_level": informant["reliability_level"],
+                "status": informant["status"],
+                "handler": informant["handler"],
+            }
+        )
+        upcoming = INFORMANT_MEETINGS.get(informant_id, [])
+        for _, _, meeting_id in upcoming[bisect.bisect_left(upcoming, (today,)) :]:
+            meeting = MEETINGS_DB[meeting_id]
+            meetings.append(
+                {
+                    key: meeting[key]
+                    for key in (
+                        "id",
+                        "informant_code_name",
+                        "date",
+                        "time",
+                        "location",
+                        "purpose",
+                        "handler",
+                    )
+                }
+            )
+    meetings.sort(key=lambda meeting: (meeting["date"], meeting["time"]))
+
+    tip_count, verified_tip_count = CASE_TIP_COUNTS.get(case_id, (0, 0))
+    intelligence = {
+        "case_id": case_id,
+        "tip_count": tip_count,
+        "verified_tip_count": verified_tip_count,
+        "tips": tips,
+        "informants": informants,
+        "upcoming_meetings": meetings,
+    }
+
+    drop_cached_intelligence(case_id)
+    INTELLIGENCE_CACHE[case_id] = (today, intelligence, list(informant_ids))
+    for informant_id in informant_ids:
+        INTELLIGENCE_INFORMANTS.setdefault(informant_id, set()).add(case_id)
+    if len(INTELLIGENCE_CACHE) > MAX_CACHED_INTELLIGENCE:
+        drop_cached_intelligence(next(iter(INTELLIGENCE_CACHE)))
+    return intelligence
+
+
+def activity_groups(informant_id: str) -> List[tuple]:
+    """Returns the activity counter groups an informant's events are counted in"""
+    informant = INFORMANTS_DB.get(informant_id, {})
+    return [
+        ("informant", informant_id),
+        ("specialty", informant.get("specialty", "unknown")),
+        ("network", "all"),
+    ]
+
+
+def count_information_activity(
+    information: Dict[str, Any], previous_status: Optional[str] = None, is_new: bool = True
+) -> None:
+    """Counts a received tip and, when it just became verified, a verified tip"""
+    groups = activity_groups(information["informant_id"])
+    if is_new:
+        ACTIVITY.record(groups, "tips_received", information["date_received"])
+    if (
+        information["verification_status"] in VERIFIED_STATUSES
+        and previous_status not in VERIFIED_STATUSES
+    ):
+        verified_on = information.get("verification_details", {}).get(
+            "date_assessed", information["date_received"]
+        )
+        ACTIVITY.record(groups, "tips_verified", verified_on)
+
+
+def count_case_tip(
+    information: Dict[str, Any], previous_status: Optional[str] = None, is_new: bool = True
+) -> None:
+    """Keeps the tip counts of the case of a tip up to date as it is received and verified"""
+    case_id = information.get("case_related")
+    if case_id in (None, UNKNOWN_CASE):
+        return
+    tip_count, verified_tip_count = CASE_TIP_COUNTS.get(case_id, (0, 0))
+    if is_new:
+        tip_count += 1
+    verified_tip_count += (information["verification_status"] in VERIFIED_STATUSES) - (
+        previous_status in VERIFIED_STATUSES
+    )
+    CASE_TIP_COUNTS[case_id] = (tip_count, verified_tip_count)
+
+
+def count_meeting_activity(meeting: Dict[str, Any]) -> None:
+    """Counts a meeting as scheduled on its date, whether it is still upcoming or completed"""
+    if meeting["status"] in ("scheduled", "completed"):
+        ACTIVITY.record(
+            activity_groups(meeting["informant_id"]), "meetings_scheduled", meeting["date"]
+        )
+
+
 def initialize_data():
     """Initialize the database with sample data"""
     for informant in SAMPLE_INFORMANTS:
         INFORMANTS_DB[informant["id"]] = informant
+        index_informant(informant)
+
+    for name, coordinates in SAFE_LOCATION_COORDINATES.items():
+        SAFE_LOCATION_INDEX.add(name, point_of(coordinates))
 
     for meeting in SAMPLE_MEETINGS:
         MEETINGS_DB[meeting["id"]] = meeting
+        index_meeting(meeting)
+        count_meeting_activity(meeting)
 
     for info in SAMPLE_INFORMATION:
         INFORMATION_DB[info["id"]] = info
+        count_information_activity(info)
+        count_case_tip(info)
+        index_information(info)
+
+
+def reindex_record(
+    table: str,
+    record_id: str,
+    record: Optional[Dict[str, Any]],
+    previous: Optional[Dict[str, Any]],
+) -> None:
+    """Updates the derived indexes for a record replayed from the write-ahead log"""
+    if record is None:
+        return
+    if table == "informants":
+        index_informant(record)
+    elif table == "meetings":
+        index_meeting(record)
+        if previous is None:
+            count_meeting_activity(record)
+    elif table == "information":
+        previous_status = previous["verification_status"] if previous else None
+        count_information_activity(record, previous_status=previous_status, is_new=previous is None)
+        count_case_tip(record, previous_status=previous_status, is_new=previous is None)
+        INFORMATION_INDEX.add(record)
+        if record_id not in TIP_INDEX.signatures:
+            signature = TIP_INDEX.signature(record["content"])
+            if signature is not None:
+                TIP_INDEX.insert(record_id, signature)
+
+
+def initialize_persistence():
+    """Restores the stores from the data directory and starts logging mutations"""
+    global STORE
+    if not DATA_DIR:
+        logger.info("INFORMANT_DATA_DIR not set, data is kept in memory only")
+        return
+
+    STORE = PersistentStore(
+        DATA_DIR,
+        tables={
+            "informants": INFORMANTS_DB,
+            "meetings": MEETINGS_DB,
+            "information": INFORMATION_DB,
+            "clusters": INFORMATION_CLUSTERS,
+        },
+        indexes={
+            "slots": SLOT_INDEX,
+            "locations": LOCATION_INDEX,
+            "informant_meetings": INFORMANT_MEETINGS,
+            "case_tip_counts": CASE_TIP_COUNTS,
+            "tips": TIP_INDEX,
+            "information_index": INFORMATION_INDEX,
+            "activity": ACTIVITY,
+            "informant_locations": INFORMANT_LOCATIONS,
+        },
+        on_replay=reindex_record,
+    )
+    stats = STORE.recover()
+    STORE.start()
+    logger.info(f"Recovered informant data from {DATA_DIR}: {stats}")
 
 
 initialize_data()
+initialize_persistence()
 
 
 @mcp.tool()
@@ -245,6 +789,8 @@ def register_new_informant(
     }
 
     INFORMANTS_DB[informant_id] = new_informant
+    index_informant(new_informant)
+    persist("informants", informant_id)
 
     return {
         "status": "success",
@@ -281,16 +827,11 @@ def schedule_informant_meeting(
         }
 
     # Check availability (no two meetings at the same time)
-    for meeting in MEETINGS_DB.values():
-        if (
-            meeting["date"] == date
-            and meeting["time"] == time
-            and meeting["status"] == "scheduled"
-        ):
-            return {"error": f"There is already a meeting scheduled for {date} at {time}"}
+    if (date, time) in SLOT_INDEX:
+        return {"error": f"There is already a meeting scheduled for {date} at {time}"}
 
     informant = INFORMANTS_DB[informant_id]
-    meeting_id = f"MEET-{str(uuid.uuid4().hex[:3]).upper()}"
+    meeting_id = new_record_id("MEET", MEETINGS_DB)
 
     new_meeting = {
         "id": meeting_id,
@@ -307,6 +848,9 @@ def schedule_informant_meeting(
     }
 
     MEETINGS_DB[meeting_id] = new_meeting
+    index_meeting(new_meeting)
+    count_meeting_activity(new_meeting)
+    persist("meetings", meeting_id)
 
     return {
         "status": "success",
@@ -336,18 +880,16 @@ def check_meeting_availability(date: str, time: str, location: str) -> Dict[str,
 
     # Check conflicts
     conflicts = []
-    for meeting in MEETINGS_DB.values():
-        if meeting["status"] == "scheduled":
-            if meeting["date"] == date and meeting["time"] == time:
-                conflicts.append(
-                    f"Meeting with {meeting['informant_code_name']} already scheduled"
-                )
-            if meeting["date"] == date and meeting["location"] == location:
-                time_diff = abs(int(meeting["time"][:2]) - int(time[:2]))
-                if time_diff < 2:  # Less than 2 hours difference
-                    conflicts.append(
-                        f"Location occupied near the time by {meeting['informant_code_name']}"
-                    )
+    if (date, time) in SLOT_INDEX:
+        meeting = MEETINGS_DB[SLOT_INDEX[(date, time)]]
+        conflicts.append(
+            f"Meeting with {meeting['informant_code_name']} already scheduled"
+        )
+    for meeting_id in location_conflicts(date, time, location):
+        meeting = MEETINGS_DB[meeting_id]
+        conflicts.append(
+            f"Location occupied near the time by {meeting['informant_code_name']}"
+        )
 
     if conflicts:
         return {
@@ -367,12 +909,184 @@ def check_meeting_availability(date: str, time: str, location: str) -> Dict[str,
 
 
 @mcp.tool()
-def find_informants_by_specialty(specialty: str) -> List[Dict[str, Any]]:
+def schedule_meetings_batch(
+    requests: List[Dict[str, Any]], date_window: Dict[str, str]
+) -> Dict[str, Any]:
+    """
+    Schedules many informant meetings in a single call.
+    Each request: informant_id, purpose and optionally preferred_dates (YYYY-MM-DD),
+    preferred_times and preferred_locations, in order of preference.
+    Date window: {"start": "YYYY-MM-DD", "end": "YYYY-MM-DD"}, at most 31 days.
+    All placed meetings are reserved together; requests that cannot be placed are returned as unassigned.
+    """
+    logger.info(f"Tool call: schedule_meetings_batch for {len(requests)} requests")
+
+    if len(requests) > MAX_BATCH_SIZE:
+        return {"error": f"Too many requests. Maximum batch size: {MAX_BATCH_SIZE}"}
+
+    try:
+        start = datetime.datetime.strptime(date_window["start"], "%Y-%m-%d").date()
+        end = datetime.datetime.strptime(date_window["end"], "%Y-%m-%d").date()
+    except (KeyError, TypeError, ValueError):
+        return {
+            "error": "Date window must contain 'start' and 'end' dates in format YYYY-MM-DD"
+        }
+
+    window_days = (end - start).days + 1
+    if window_days < 1 or window_days > MAX_BATCH_WINDOW_DAYS:
+        return {
+            "error": f"Date window must span between 1 and {MAX_BATCH_WINDOW_DAYS} days"
+        }
+
+    window_dates = [
+        (start + datetime.timedelta(days=offset)).strftime("%Y-%m-%d")
+        for offset in range(window_days)
+    ]
+
+    # Build the candidate slots of each request in order of preference
+    unassigned = []
+    valid_requests = []
+    candidates = []
+    for request_index, request in enumerate(requests):
+        informant_id = request.get("informant_id")
+        if informant_id not in INFORMANTS_DB:
+            unassigned.append(
+                {
+                    "request_index": request_index,
+                    "informant_id": informant_id,
+                    "reason": f"Informant with ID '{informant_id}' not found",
+                }
+            )
+            continue
+
+        preferred_times = request.get("preferred_times") or MEETING_TIMES
+        invalid_times = [t for t in preferred_times if t not in MEETING_TIMES]
+        if invalid_times:
+            unassigned.append(
+                {
+                    "request_index": request_index,
+                    "informant_id": informant_id,
+                    "reason": f"Times {', '.join(invalid_times)} not available. Valid times: {', '.join(MEETING_TIMES)}",
+                }
+            )
+            continue
+
+        preferred_dates = request.get("preferred_dates")
+        dates = (
+            [d for d in preferred_dates if d in window_dates]
+            if preferred_dates
+            else window_dates
+        )
+
+        valid_requests.append(request_index)
+        candidates.append(
+            [
+                (date, time)
+                for date in dates
+                for time in preferred_times
+                if (date, time) not in SLOT_INDEX
+            ]
+        )
+
+    assignment = assign_batch_slots(candidates)
+
+    # Pick a location for every placed meeting and build the reservations
+    pending_locations = {}
+    new_meetings = []
+    for position, request_index in enumerate(valid_requests):
+        request = requests[request_index]
+        if position not in assignment:
+            unassigned.append(
+                {
+                    "request_index": request_index,
+                    "informant_id": request["informant_id"],
+                    "reason": "No free slot among the preferred dates and times in the date window",
+                }
+            )
+            continue
+
+        date, time = assignment[position]
+        hour = int(time[:2])
+        location = None
+        for option in (request.get("preferred_locations") or []) + SAFE_LOCATIONS:
+            pending_hours = pending_locations.get((date, option), [])
+            if not location_conflicts(date, time, option) and all(
+                abs(h - hour) >= 2 for h in pending_hours
+            ):
+                location = option
+                break
+
+        if location is None:
+            unassigned.append(
+                {
+                    "request_index": request_index,
+                    "informant_id": request["informant_id"],
+                    "reason": f"No free location on {date} at {time}",
+                }
+            )
+            continue
+
+        pending_locations.setdefault((date, location), []).append(hour)
+        informant = INFORMANTS_DB[request["informant_id"]]
+        new_meetings.append(
+            {
+                "id": None,
+                "informant_id": informant["id"],
+                "informant_code_name": informant["code_name"],
+                "date": date,
+                "time": time,
+                "location": location,
+                "purpose": request.get("purpose", ""),
+                "status": "scheduled",
+                "handler": informant["handler"],
+                "security_level": "medium",
+                "created_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M"),
+            }
+        )
+
+    # Reserve all placed meetings together. Tool calls run one at a time on the
+    # server loop, so no other booking can interleave with this block.
+    for meeting in new_meetings:
+        meeting["id"] = new_record_id("MEET", MEETINGS_DB)
+        MEETINGS_DB[meeting["id"]] = meeting
+        index_meeting(meeting)
+        count_meeting_activity(meeting)
+        persist("meetings", meeting["id"])
+
+    return {
+        "status": "success" if not unassigned else "partial",
+        "message": f"{len(new_meetings)} of {len(requests)} meetings scheduled",
+        "scheduled": new_meetings,
+        "unassigned": sorted(unassigned, key=lambda x: x["request_index"]),
+    }
+
+
+@mcp.tool()
+def find_informants_by_specialty(
+    specialty: str, response_format: str = "rows"
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Search informants by area of specialization.
+    With response_format "columns" the informants come as {"columns": [...], "rows": [[...], ...]},
+    one array of values per informant in column order, without the success_rate
+    (successful_tips / information_count), which is more compact.
     """
     logger.info(f"Tool call: find_informants_by_specialty for {specialty}")
 
+    error = check_response_format(response_format)
+    if error:
+        return error
+    if response_format == "columns":
+        specialty = specialty.lower()
+        return columnar(
+            SPECIALTY_COLUMNS,
+            (
+                informant
+                for informant in INFORMANTS_DB.values()
+                if informant["specialty"].lower() == specialty
+            ),
+        )
+
     matching_informants = []
     for informant in INFORMANTS_DB.values():
         if informant["specialty"].lower() == specialty.lower():
@@ -397,6 +1111,37 @@ def find_informants_by_specialty(specialty: str) -> List[Dict[str, Any]]:
     )
 
 
+@mcp.tool()
+def nearest_safe_locations(point: Union[str, Dict[str, float]], k: int = 3) -> Dict[str, Any]:
+    """
+    Finds the k safe meeting locations closest to a point, closest first, with their distance.
+    The point is coordinates {"x": km east, "y": km north of the city centre} (cases have
+    them in their details), an informant ID (e.g. INF-001), an area (e.g. centro_ciudad)
+    or a safe location name.
+    """
+    logger.info(f"Tool call: nearest_safe_locations for {point}, k: {k}")
+
+    coordinates = resolve_point(point)
+    if coordinates is None:
+        return {
+            "error": f"Point '{point}' not valid. Use coordinates {{\"x\": ..., \"y\": ...}}, an informant ID with a known location, an area ({', '.join(AREA_COORDINATES)}) or a safe location name"
+        }
+    if not 1 <= k <= len(SAFE_LOCATIONS):
+        return {"error": f"k must be between 1 and {len(SAFE_LOCATIONS)}"}
+
+    return {
+        "point": {"x": coordinates[0], "y": coordinates[1]},
+        "locations": [
+            {
+                "location": name,
+                "distance_km": round(distance, 2),
+                "coordinates": SAFE_LOCATION_COORDINATES[name],
+            }
+            for distance, name in SAFE_LOCATION_INDEX.nearest(coordinates, k)
+        ],
+    }
+
+
 @mcp.tool()
 def get_informant_profile(informant_id: str) -> Dict[str, Any]:
     """
@@ -428,10 +1173,15 @@ def get_informant_profile(informant_id: str) -> Dict[str, Any]:
 
 
 @mcp.tool()
-def get_informants_by_reliability(reliability_level: str) -> List[Dict[str, Any]]:
+def get_informants_by_reliability(
+    reliability_level: str, response_format: str = "rows"
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Lists informants filtered by reliability level.
     Levels: low, medium, high
+    With response_format "columns" the informants come as {"columns": [...], "rows": [[...], ...]},
+    one array of values per informant in column order, without the success_rate
+    (successful_tips / information_count), which is more compact.
     """
     logger.info(f"Tool call: get_informants_by_reliability for level {reliability_level}")
 
@@ -440,6 +1190,19 @@ def get_informants_by_reliability(reliability_level: str) -> List[Dict[str, Any]
         return {
             "error": f"Reliability level '{reliability_level}' not valid. Valid levels: {', '.join(valid_levels)}"
         }
+    error = check_response_format(response_format)
+    if error:
+        return error
+    if response_format == "columns":
+        return columnar(
+            RELIABILITY_COLUMNS,
+            (
+                informant
+                for informant in INFORMANTS_DB.values()
+                if informant["reliability_level"] == reliability_level
+                and informant["status"] == "active"
+            ),
+        )
 
     matching_informants = []
     for informant in INFORMANTS_DB.values():
@@ -469,12 +1232,17 @@ def get_informants_by_reliability(reliability_level: str) -> List[Dict[str, Any]
 
 @mcp.tool()
 def record_information_received(
-    informant_id: str, information_type: str, content: str, credibility: str
+    informant_id: str,
+    information_type: str,
+    content: str,
+    credibility: str,
+    case_related: str = "to_be_determined",
 ) -> Dict[str, Any]:
     """
     Records information received from an informant.
     Types: suspect_location, suspicious_transactions, criminal_activity, witness_testimony
     Credibility: low, medium, high
+    Case related: ID of the related case (e.g. CASE-001), if known
     """
     logger.info(f"Tool call: record_information_received from {informant_id}")
 
@@ -500,7 +1268,7 @@ def record_information_received(
         }
 
     informant = INFORMANTS_DB[informant_id]
-    info_id = f"INFO-{str(uuid.uuid4().hex[:3]).upper()}"
+    info_id = new_record_id("INFO", INFORMATION_DB)
 
     new_information = {
         "id": info_id,
@@ -510,21 +1278,62 @@ def record_information_received(
         "content": content,
         "credibility": credibility,
         "date_received": datetime.datetime.now().strftime("%Y-%m-%d"),
-        "case_related": "to_be_determined",
+        "case_related": case_related,
         "verification_status": "pending",
         "handler": informant["handler"],
     }
 
     INFORMATION_DB[info_id] = new_information
+    count_information_activity(new_information)
+    count_case_tip(new_information)
+    near_duplicates = index_information(new_information)
 
     # Update informant counter
     INFORMANTS_DB[informant_id]["information_count"] += 1
+    persist("information", info_id)
+    persist("informants", informant_id)
 
-    return {
+    result = {
         "status": "success",
         "message": f"Information recorded from '{informant['code_name']}'",
         "information": new_information,
     }
+    if near_duplicates:
+        result["near_duplicates"] = near_duplicates
+        result["message"] += (
+            f". Possible duplicate of {len(near_duplicates)} previous report(s), "
+            f"linked to cluster {new_information['cluster_id']}"
+        )
+    return result
+
+
+@mcp.tool()
+def get_information_cluster(cluster_id: str) -> Dict[str, Any]:
+    """
+    Gets all information records in a near-duplicate cluster.
+    Accepts a cluster ID (CLUSTER-...) or the ID of any information in the cluster.
+    """
+    logger.info(f"Tool call: get_information_cluster for {cluster_id}")
+
+    if cluster_id in INFORMATION_DB:
+        information_id = cluster_id
+        cluster_id = INFORMATION_DB[information_id].get("cluster_id")
+        if cluster_id is None:
+            return {
+                "message": f"Information '{information_id}' has no near-duplicates"
+            }
+
+    if cluster_id not in INFORMATION_CLUSTERS:
+        return {"error": f"Cluster with ID '{cluster_id}' not found"}
+
+    records = [INFORMATION_DB[info_id] for info_id in INFORMATION_CLUSTERS[cluster_id]]
+
+    return {
+        "cluster_id": cluster_id,
+        "total_records": len(records),
+        "informants": sorted({info["informant_id"] for info in records}),
+        "information": sorted(records, key=lambda x: x["date_received"]),
+    }
 
 
 @mcp.tool()
@@ -559,8 +1368,15 @@ def assess_information_credibility(
 
     # Simplified evaluation logic
     if verification_method == "cross_sources":
-        assessment["verification_result"] = "partially_confirmed"
-        assessment["confidence_level"] = "75%"
+        corroboration = corroborate_information(information)
+        if not corroboration["sources"]:
+            assessment["verification_result"] = "unconfirmed"
+        elif corroboration["confidence"] >= 0.8:
+            assessment["verification_result"] = "confirmed"
+        else:
+            assessment["verification_result"] = "partially_confirmed"
+        assessment["confidence_level"] = f"{corroboration['confidence'] * 100:.0f}%"
+        assessment["corroborating_sources"] = corroboration["sources"]
     elif verification_method == "physical_verification":
         assessment["verification_result"] = "confirmed"
         assessment["confidence_level"] = "90%"
@@ -569,10 +1385,16 @@ def assess_information_credibility(
         assessment["confidence_level"] = "60%"
 
     # Update information
+    previous_status = information["verification_status"]
     INFORMATION_DB[information_id]["verification_status"] = assessment[
         "verification_result"
     ]
     INFORMATION_DB[information_id]["verification_details"] = assessment
+    count_information_activity(
+        information, previous_status=previous_status, is_new=False
+    )
+    count_case_tip(information, previous_status=previous_status, is_new=False)
+    persist("information", information_id)
 
     return assessment
 
@@ -616,6 +1438,7 @@ def update_informant_reliability(
             "reason": reason,
         }
     )
+    persist("informants", informant_id)
 
     return {
         "status": "success",
@@ -628,14 +1451,20 @@ def update_informant_reliability(
 
 
 @mcp.tool()
-def get_informant_history(informant_id: str) -> Dict[str, Any]:
+def get_informant_history(informant_id: str, response_format: str = "rows") -> Dict[str, Any]:
     """
     Gets the complete history of an informant including provided information and meetings.
+    With response_format "columns" the information and the meetings come as
+    {"columns": [...], "rows": [[...], ...]}, one array of values per record in
+    column order, which is more compact.
     """
     logger.info(f"Tool call: get_informant_history for {informant_id}")
 
     if informant_id not in INFORMANTS_DB:
         return {"error": f"Informant with ID '{informant_id}' not found"}
+    error = check_response_format(response_format)
+    if error:
+        return error
 
     informant = INFORMANTS_DB[informant_id]
 
@@ -651,13 +1480,19 @@ def get_informant_history(informant_id: str) -> Dict[str, Any]:
         if meeting["informant_id"] == informant_id:
             meeting_history.append(meeting)
 
+    information_history.sort(key=lambda x: x["date_received"], reverse=True)
+    meeting_history.sort(key=lambda x: x["date"], reverse=True)
     return {
         "informant_profile": informant,
-        "information_provided": sorted(
-            information_history, key=lambda x: x["date_received"], reverse=True
+        "information_provided": (
+            columnar(INFORMATION_HISTORY_COLUMNS, information_history)
+            if response_format == "columns"
+            else information_history
         ),
-        "meeting_history": sorted(
-            meeting_history, key=lambda x: x["date"], reverse=True
+        "meeting_history": (
+            columnar(MEETING_HISTORY_COLUMNS, meeting_history)
+            if response_format == "columns"
+            else meeting_history
         ),
         "total_information_count": len(information_history),
         "total_meetings": len(meeting_history),
@@ -710,6 +1545,52 @@ def get_network_statistics() -> Dict[str, Any]:
     }
 
 
+@mcp.tool()
+def get_effectiveness(window_days: int = 30, group_by: str = "informant") -> Dict[str, Any]:
+    """
+    Gets tips received, tips verified and meetings scheduled (upcoming or completed)
+    in the last window_days days.
+    Window: 1 to 90 days
+    Group by: informant, specialty, network
+    """
+    logger.info(
+        f"Tool call: get_effectiveness for the last {window_days} days by {group_by}"
+    )
+
+    valid_groupings = ["informant", "specialty", "network"]
+    if group_by not in valid_groupings:
+        return {
+            "error": f"Grouping '{group_by}' not valid. Valid groupings: {', '.join(valid_groupings)}"
+        }
+
+    if not 1 <= window_days <= HISTORY_DAYS:
+        return {"error": f"Window must be between 1 and {HISTORY_DAYS} days"}
+
+    groups = []
+    for name, totals in ACTIVITY.totals(group_by, window_days).items():
+        entry = {group_by: name, **totals}
+        entry["verification_rate"] = (
+            f"{(totals['tips_verified'] / max(totals['tips_received'], 1)) * 100:.1f}%"
+        )
+        if group_by == "informant" and name in INFORMANTS_DB:
+            entry["code_name"] = INFORMANTS_DB[name]["code_name"]
+            entry["specialty"] = INFORMANTS_DB[name]["specialty"]
+        groups.append(entry)
+
+    if not groups:
+        return {"message": f"No informant activity recorded in the last {window_days} days"}
+
+    return {
+        "window_days": window_days,
+        "group_by": group_by,
+        "groups": sorted(
+            groups,
+            key=lambda x: (x["tips_verified"], x["tips_received"], x["meetings_scheduled"]),
+            reverse=True,
+        ),
+    }
+
+
 @mcp.tool()
 def get_active_informants_count() -> Dict[str, Any]:
     """
@@ -730,6 +1611,84 @@ def get_active_informants_count() -> Dict[str, Any]:
     }
 
 
+@mcp.tool()
+def get_case_intelligence(case_id: str) -> Dict[str, Any]:
+    """
+    Gets everything the informant network knows about a case (e.g. CASE-001): the most
+    recent tips linked to it, the informants who gave them and their upcoming meetings.
+    """
+    logger.info(f"Tool call: get_case_intelligence for case ID: {case_id}")
+    return case_intelligence(case_id)
+
+
+@mcp.custom_route("/cases/{case_id}/intelligence", methods=["GET"])
+async def case_intelligence_endpoint(request: Request) -> JSONResponse:
+    """Serves the intelligence of a case to the dossiers of the case management server"""
+    with TRACER.start_as_current_span(
+        "GET case intelligence", context=extract_context(request.headers)
+    ):
+        return JSONResponse(case_intelligence(request.path_params["case_id"]))
+
+
+@mcp.custom_route("/informants/locations", methods=["GET"])
+async def informant_locations_endpoint(request: Request) -> JSONResponse:
+    """
+    Serves the informants changed since a version of the change log, so the case
+    management server can keep a replica of their locations. All of them when the
+    epoch is not the current one: on the first call, or after a restart.
+    """
+    with TRACER.start_as_current_span(
+        "GET informant locations", context=extract_context(request.headers)
+    ):
+        try:
+            since = int(request.query_params.get("since", "0"))
+        except ValueError:
+            return JSONResponse({"error": "since must be an integer"}, status_code=400)
+        full = request.query_params.get("epoch") != LOCATION_EPOCH
+        if full:
+            changed = list(INFORMANTS_DB)
+        else:
+            changed = []
+            for informant_id in reversed(LOCATION_CHANGES):
+                if LOCATION_CHANGES[informant_id] <= since:
+                    break
+                changed.append(informant_id)
+        informants = []
+        for informant_id in changed:
+            informant = INFORMANTS_DB.get(informant_id)
+            point = INFORMANT_LOCATIONS.points.get(informant_id)
+            if informant is None or point is None:
+                informants.append({"id": informant_id, "point": None})
+                continue
+            informants.append(
+                {
+                    "id": informant_id,
+                    "point": list(point),
+                    **{key: informant[key] for key in LOCATION_FIELDS},
+                }
+            )
+        return JSONResponse(
+            {
+                "epoch": LOCATION_EPOCH,
+                "version": LOCATION_VERSION,
+                "full": full,
+                "informants": informants,
+            }
+        )
+
+
+# Calls, errors, latency and response size of every tool above, on /metrics
+instrument_tools(
+    mcp,
+    stores={
+        "informants": INFORMANTS_DB,
+        "meetings": MEETINGS_DB,
+        "information": INFORMATION_DB,
+        "clusters": INFORMATION_CLUSTERS,
+    },
+)
+
+
 # --- SERVER STARTUP SECTION ---
 if __name__ == "__main__":
     logger.info(
@@ -741,3 +1700,6 @@ if __name__ == "__main__":
         logger.info("Server stopped by user")
     except Exception as e:
         logger.error(f"An error occurred while starting the server: {e}")
+    finally:
+        if STORE is not None:
+            STORE.close()
@@ -0,0 +1,192 @@
+# test_persistence.py
+"""Recovery tests for the write-ahead log and snapshots."""
+import os
+import pickle
+
+import pytest
+
+from persistence import MappedDict, PersistentStore
+
+
+class Index:
+    def __init__(self):
+        self.by_key = {}
+        self.count = 0
+
+
+def open_store(data_dir, **kwargs):
+    tables = {"records": MappedDict()}
+    index = Index()
+    replayed = []
+
+    def on_replay(table, key, record, previous):
+        replayed.append(key)
+        if record is not None:
+            index.by_key[key] = record["value"]
+
+    store = PersistentStore(
+        str(data_dir), tables, indexes={"index": index}, on_replay=on_replay, **kwargs
+    )
+    stats = store.recover()
+    store.start()
+    return store, tables["records"], index, replayed, stats
+
+
+def write(store, records, key, value):
+    records[key] = {"value": value}
+    store.put("records", key)
+
+
+def wal_segments(data_dir):
+    return sorted(
+        os.path.join(data_dir, name)
+        for name in os.listdir(data_dir)
+        if name.startswith("wal-") and name.endswith(".log")
+    )
+
+
+def test_replays_the_log(tmp_path):
+    store, records, _, _, _ = open_store(tmp_path)
+    for i in range(5):
+        write(store, records, f"R-{i}", i)
+    write(store, records, "R-0", 10)
+    records.pop("R-4")
+    store.delete("records", "R-4")
+    store.close()
+
+    store, records, index, _, stats = open_store(tmp_path)
+    assert stats["replayed_entries"] == 7
+    assert dict(records) == {f"R-{i}": {"value": i} for i in (1, 2, 3)} | {"R-0": {"value": 10}}
+    assert index.by_key["R-0"] == 10
+    store.close()
+
+
+def test_truncates_a_torn_tail(tmp_path):
+    store, records, _, _, _ = open_store(tmp_path)
+    for i in range(3):
+        write(store, records, f"R-{i}", i)
+    store.close()
+    segment = wal_segments(tmp_path)[-1]
+    size = os.path.getsize(segment)
+    # A crash in the middle of the last frame
+    os.truncate(segment, size - 3)
+
+    store, records, _, _, stats = open_store(tmp_path)
+    assert stats["replayed_entries"] == 2
+    assert sorted(records) == ["R-0", "R-1"]
+    assert os.path.getsize(segment) < size - 3
+    write(store, records, "R-3", 3)
+    store.close()
+
+    store, records, _, _, stats = open_store(tmp_path)
+    assert stats["replayed_entries"] == 3
+    assert sorted(records) == ["R-0", "R-1", "R-3"]
+    store.close()
+
+
+def test_stops_at_a_checksum_mismatch(tmp_path):
+    store, records, _, _, _ = open_store(tmp_path)
+    for i in range(3):
+        write(store, records, f"R-{i}", i)
+    store.close()
+    segment = wal_segments(tmp_path)[-1]
+    with open(segment, "r+b") as f:
+        data = bytearray(f.read())
+        # Flip a byte in the payload of the second frame
+        first_length = int.from_bytes(data[:4], "little")
+        data[8 + first_length + 8 + 5] ^= 0xFF
+        f.seek(0)
+        f.write(data)
+
+    store, records, _, replayed, stats = open_store(tmp_path)
+    # The entries after a corrupt one are not replayed either
+    assert stats["replayed_entries"] == 1
+    assert replayed == ["R-0"]
+    assert sorted(records) == ["R-0"]
+    write(store, records, "R-4", 4)
+    store.close()
+
+    store, records, _, _, _ = open_store(tmp_path)
+    assert sorted(records) == ["R-0", "R-4"]
+    store.close()
+
+
+def test_sets_aside_segments_after_a_corrupt_one(tmp_path):
+    store, records, _, _, _ = open_store(tmp_path)
+    write(store, records, "R-0", 0)
+    write(store, records, "R-1", 1)
+    store.close()
+    store, records, _, _, _ = open_store(tmp_path)
+    write(store, records, "R-2", 2)
+    store.close()
+    first, second = wal_segments(tmp_path)
+    os.truncate(first, os.path.getsize(first) - 1)
+
+    store, records, _, _, _ = open_store(tmp_path)
+    assert sorted(records) == ["R-0"]
+    assert os.path.exists(f"{second}.discarded")
+    store.close()
+
+
+def test_restores_from_a_mapped_snapshot(tmp_path):
+    store, records, index, _, _ = open_store(tmp_path)
+    for i in range(100):
+        write(store, records, f"R-{i}", i)
+        index.by_key[f"R-{i}"] = i
+    index.count = 100
+    store.snapshot()
+    write(store, records, "R-100", 100)
+    store.close()
+
+    store, records, index, replayed, stats = open_store(tmp_path)
+    assert stats["snapshot_seq"] == 100
+    assert replayed == ["R-100"]
+    assert len(records) == 101
+    assert isinstance(index.by_key, MappedDict)
+    # Entries stay in the mapped file until they are read
+    assert records.get("R-42") == {"value": 42}
+    assert index.by_key["R-99"] == 99
+    assert index.count == 100
+    assert sorted(records) == sorted(f"R-{i}" for i in range(101))
+
+    # An incremental snapshot keeps the entries of the previous one
+    write(store, records, "R-0", -1)
+    store.snapshot()
+    store.close()
+    store, records, _, replayed, _ = open_store(tmp_path)
+    assert replayed == []
+    assert records["R-0"] == {"value": -1}
+    assert records["R-1"] == {"value": 1}
+    assert len(records) == 101
+    store.close()
+
+
+def test_snapshot_holds_the_values_when_it_started(tmp_path):
+    store, records, index, _, _ = open_store(tmp_path)
+    index.by_key["A"] = [1]
+    write(store, records, "A", 1)
+    # Freeze the index as a snapshot does, then change it before the snapshot is written
+    mapping = index.by_key
+    mapping.freeze()
+    index.by_key["A"].append(2)
+    index.by_key["B"] = [3]
+    frozen = {key: pickle.loads(value) for key, value in mapping.frozen_entries()}
+    assert frozen == {"A": [1]}
+    # Not written: the keys are still changed for the next snapshot
+    mapping.thaw(written=False)
+    store.snapshot()
+    store.close()
+
+    _, _, index, _, _ = open_store(tmp_path)
+    assert index.by_key["A"] == [1, 2]
+    assert index.by_key["B"] == [3]
+
+
+def test_mapped_dict_without_section_behaves_like_a_dict():
+    mapping = MappedDict({"a": 1})
+    mapping["b"] = 2
+    del mapping["a"]
+    assert dict(mapping) == {"b": 2}
+    assert "a" not in mapping
+    with pytest.raises(KeyError):
+        mapping["a"]